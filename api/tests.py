@@ -1,3 +1,184 @@
-from django.test import TestCase
+from datetime import date
+import json
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connections, router
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.v1 import async_views, views
+from config.routers import REPLICA_ALIAS, pin_primary, read_from_replica, replica_configured
+from fires.models import AbandonedWell, DailyReport, Wildfire
+from fires.services.activity import refresh_activity
+from fires.services.well_arrays import refresh_well_arrays
+from fires.tests import WellArraysTestMixin
+
+
+@skipUnless(
+    replica_configured(),
+    "Set DATABASE_REPLICA_URL (e.g. sqlite:///replica.sqlite3) to test replica routing",
+)
+class ReplicaRoutingTests(TestCase):
+    """Routing between the primary and a replica, e.g. two local SQLite databases."""
+
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, path):
+        with CaptureQueriesContext(connections["default"]) as primary:
+            with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica:
+                response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return len(primary), len(replica)
+
+    def test_reads_go_to_the_replica_inside_the_context(self):
+        with read_from_replica() as enabled:
+            self.assertTrue(enabled)
+            self.assertEqual(Wildfire.objects.all().db, REPLICA_ALIAS)
+        self.assertEqual(Wildfire.objects.all().db, "default")
+
+    def test_writes_stay_on_the_primary(self):
+        with read_from_replica():
+            self.assertEqual(router.db_for_write(Wildfire), "default")
+            self.assertEqual(Wildfire.objects.select_for_update().db, "default")
+
+    def test_api_reads_use_the_replica(self):
+        primary, replica = self.get("/api/v1/stats/daily/")
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_pin_sends_api_reads_to_the_primary(self):
+        pin_primary()
+        with read_from_replica() as enabled:
+            self.assertFalse(enabled)
+        primary, replica = self.get("/api/v1/stats/daily/")
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+
+class FireActivityCacheTests(TestCase):
+    """Cached activity responses and their ETags follow the activity generation."""
+
+    url = "/api/v1/fires/activity/"
+
+    def setUp(self):
+        cache.clear()
+        # Keep reads on the primary when a replica is configured; routing has its own tests
+        pin_primary()
+        self.today = timezone.localdate()
+        self.add_fire("F-1")
+
+    def add_fire(self, fire_id):
+        Wildfire.objects.create(
+            fire_id=fire_id,
+            latitude=54.0,
+            longitude=-115.0,
+            detected_date=timezone.now(),
+            region="AB",
+            size_hectares=1.0,
+        )
+        refresh_activity([self.today])
+
+    def detections(self, response):
+        return sum(point["detections"] for point in response.json()["series"])
+
+    def test_bump_invalidates_cached_responses(self):
+        first = self.client.get(self.url)
+        self.assertEqual(self.detections(first), 1)
+        etag = first["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # The cached body is served until the generation moves
+        Wildfire.objects.create(
+            fire_id="F-2", latitude=54.0, longitude=-115.0, detected_date=timezone.now()
+        )
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # refresh_activity bumps the generation, as after an ingestion
+        self.add_fire("F-3")
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second["ETag"], etag)
+        self.assertEqual(self.detections(second), 3)
+
+
+class AsyncWellViewsTests(WellArraysTestMixin, TransactionTestCase):
+    """The async well views answer like the sync ones, whatever the bbox."""
+
+    # The async views query from other threads, so the data must be committed
+    bboxes = [
+        {"south": "51", "west": "-114.2", "north": "51.2", "east": "-113.9"},
+        {"south": "51", "west": "-114.2", "north": "51.2"},
+        {"south": "51", "west": "-114.2", "north": "51.2", "east": "x"},
+        {},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        pin_primary()
+        for index, (latitude, longitude) in enumerate(
+            [(51.05, -114.07), (51.1, -114.0), (50.9, -114.2), (53.5, -113.5)]
+        ):
+            AbandonedWell.objects.create(
+                well_id=f"W-{index}",
+                latitude=latitude,
+                longitude=longitude,
+                licensee=f"Licensee {index % 2}",
+                well_type="Gas",
+            )
+
+    def responses(self, name, params):
+        request = RequestFactory().get("/", params)
+        sync = getattr(views, name).as_view()(request)
+        sync.render()
+        request = RequestFactory().get("/", params)
+        response = async_to_sync(getattr(async_views, name).as_view())(request)
+        sync, response = json.loads(sync.content), json.loads(response.content)
+        if isinstance(sync, dict):
+            sync.pop("last_updated")
+            response.pop("last_updated")
+        return sync, response
+
+    def assert_same(self, name):
+        for params in self.bboxes:
+            with self.subTest(params=params):
+                sync, response = self.responses(name, params)
+                self.assertEqual(response, sync)
+
+    def test_list(self):
+        self.assert_same("AbandonedWellsListView")
+        # A partial bbox lists the Calgary sample, an invalid one every well
+        self.assertEqual(len(self.responses("AbandonedWellsListView", self.bboxes[1])[1]), 3)
+        self.assertEqual(len(self.responses("AbandonedWellsListView", self.bboxes[2])[1]), 4)
+
+    def test_stats(self):
+        self.assert_same("WellStatsView")
+        self.assertEqual(self.responses("WellStatsView", self.bboxes[0])[1]["wells_in_view"], 2)
+
+    def test_stats_from_the_well_arrays(self):
+        refresh_well_arrays()
+        self.assert_same("WellStatsView")
+
+
+class DailyReportListTests(TestCase):
+    def setUp(self):
+        pin_primary()
+        for day in range(1, 5):
+            DailyReport.objects.create(date=date(2026, 7, day), new_fires=day)
+
+    def test_date_range(self):
+        response = self.client.get("/api/v1/stats/daily/", {"start": "2026-07-02", "end": "2026-07-03"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["new_fires"] for row in response.json()], [2, 3])
+
+    def test_unparseable_dates_are_rejected(self):
+        for params in ({"start": "July 2"}, {"end": "2026-13-01"}):
+            with self.subTest(params=params):
+                response = self.client.get("/api/v1/stats/daily/", params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
@@ -1,21 +1,59 @@
+from django.conf import settings
 from django.urls import path
+from api.v1 import async_views
 from api.v1.views import (
     ActiveFiresListView,
     WildFireStatsView,
+    DailyReportListView,
+    FireActivityView,
+    FirePerimetersView,
+    FireChangesView,
+    IngestProgressView,
     PredictRiskView,
+    ProfileListView,
+    ProfileDownloadView,
     AbandonedWellsListView,
     WellStatsView,
-    WellClustersView
+    WellClustersView,
+    WellBatchQueryView,
+    WellAutocompleteView,
+    NearestWellsView,
+    WellsWithinGeometryView,
+    WellsAtRiskView,
+    LicenseeExposureView,
 )
 
 app_name = 'api'
 
+# Under ASGI the read-only map endpoints are served by their async versions
+if settings.ASYNC_API_VIEWS:
+    ActiveFiresListView = async_views.ActiveFiresListView
+    WildFireStatsView = async_views.WildFireStatsView
+    AbandonedWellsListView = async_views.AbandonedWellsListView
+    WellStatsView = async_views.WellStatsView
+    WellClustersView = async_views.WellClustersView
+
 urlpatterns = [
     # v1 API endpoints
     path("v1/fires/active/", ActiveFiresListView.as_view(), name="active-fires"),
     path("v1/stats/today/", WildFireStatsView.as_view(), name="wildfire-stats"),
+    path("v1/stats/daily/", DailyReportListView.as_view(), name="daily-reports"),
+    path("v1/fires/activity/", FireActivityView.as_view(), name="fire-activity"),
+    path("v1/fires/perimeters/", FirePerimetersView.as_view(), name="fire-perimeters"),
+    path("v1/fires/changes/", FireChangesView.as_view(), name="fire-changes"),
+    path("v1/ingest/progress/", IngestProgressView.as_view(), name="ingest-progress"),
+    path("v1/profiles/", ProfileListView.as_view(), name="profiles"),
+    path("v1/profiles/<str:profile_id>/", ProfileDownloadView.as_view(), name="profile-download"),
     path("v1/predict-risk/", PredictRiskView.as_view(), name="predict-risk"),
     path("v1/energy-wells/", AbandonedWellsListView.as_view(), name="abandoned-wells"),
     path("v1/energy-wells/stats/", WellStatsView.as_view(), name="well-stats"),
     path("v1/energy-wells/clusters/", WellClustersView.as_view(), name="well-clusters"),
+    path("v1/energy-wells/nearest/", NearestWellsView.as_view(), name="nearest-wells"),
+    path("v1/energy-wells/within/", WellsWithinGeometryView.as_view(), name="wells-within"),
+    path("v1/energy-wells/batch/", WellBatchQueryView.as_view(), name="well-batch"),
+    path("v1/energy-wells/autocomplete/", WellAutocompleteView.as_view(), name="well-autocomplete"),
+    path("v1/exposures/wells-at-risk/", WellsAtRiskView.as_view(), name="wells-at-risk"),
+    path("v1/exposures/licensees/", LicenseeExposureView.as_view(), name="licensee-exposure"),
+    # Answers 501 unless served under ASGI
+    path("v1/fires/events/", async_views.FireEventsView.as_view(), name="fire-events"),
 ]
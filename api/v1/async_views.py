@@ -0,0 +1,247 @@
+"""
+Async versions of the read-only map endpoints.
+
+These serve the same responses as the views in ``api.v1.views`` but run
+under ASGI without holding a worker while the database answers, and run
+independent aggregates concurrently.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Sum
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
+
+from api.v1.views import (
+    CALGARY_BBOX,
+    bbox_param,
+    filter_bbox_param,
+    grid_clusters,
+    region_param,
+    well_stats_from_arrays,
+)
+from fires.api.serializers import (
+    AbandonedWellListSerializer,
+    WildfireListSerializer,
+    WildfireStatsSerializer,
+)
+from fires.models import AbandonedWell, Wildfire
+from fires.services.events import hub
+from fires.services.reports import day_bounds
+from fires.services.well_arrays import get_well_arrays
+
+
+def _in_own_connection(func):
+    """Wrap a query so it runs on a worker thread with its own DB connection."""
+
+    def run():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def gather_queries(*funcs):
+    """
+    Run independent blocking queries concurrently.
+
+    Django's async ORM methods share one thread per request, so each query
+    gets its own thread (and connection) here to actually overlap.
+    """
+    return await asyncio.gather(*(_in_own_connection(func) for func in funcs))
+
+
+class ActiveFiresListView(View):
+    """Async API endpoint to get all active wildfires (optionally in one ?region=)"""
+
+    async def get(self, request):
+        queryset = Wildfire.objects.filter(status="ACTIVE")
+        region = region_param(request.GET)
+        if region:
+            queryset = queryset.filter(region=region)
+        fires = [fire async for fire in queryset]
+        data = WildfireListSerializer(fires, many=True).data
+        return JsonResponse(data, safe=False)
+
+
+class WildFireStatsView(View):
+    """Async API endpoint for wildfire statistics"""
+
+    async def get(self, request):
+        start, end = day_bounds(timezone.localdate())
+
+        fires = Wildfire.objects.all()
+        region = region_param(request.GET)
+        if region:
+            fires = fires.filter(region=region)
+
+        active, total, today, by_status = await gather_queries(
+            lambda: fires.filter(status="ACTIVE").count(),
+            lambda: fires.aggregate(total=Sum("size_hectares"))["total"] or 0,
+            lambda: fires.filter(
+                detected_date__gte=start, detected_date__lt=end
+            ).count(),
+            lambda: dict(
+                fires.values("status")
+                .annotate(count=Count("id"))
+                .values_list("status", "count")
+            ),
+        )
+
+        stats = {
+            "total_active_fires": active,
+            "total_hectares_burned": total,
+            "fires_today": today,
+            "fires_by_status": by_status,
+            "last_updated": timezone.now(),
+        }
+        return JsonResponse(WildfireStatsSerializer(stats).data)
+
+
+class AbandonedWellsListView(View):
+    """Async API endpoint to get abandoned wells in Alberta."""
+
+    async def get(self, request):
+        # If no bounds specified, return a sample around Calgary
+        bbox = bbox_param(request.GET) or CALGARY_BBOX
+        queryset = filter_bbox_param(AbandonedWell.objects.all(), bbox)
+
+        try:
+            limit = min(int(request.GET.get("limit", 1000)), 5000)  # Max 5000 wells
+        except ValueError:
+            limit = 1000
+
+        wells = [well async for well in queryset[:limit]]
+        data = AbandonedWellListSerializer(wells, many=True).data
+        return JsonResponse(data, safe=False)
+
+
+class WellStatsView(View):
+    """Async API endpoint for abandoned well statistics."""
+
+    async def get(self, request):
+        bbox = bbox_param(request.GET)
+
+        arrays = await sync_to_async(get_well_arrays)()
+        if arrays is not None:
+            return JsonResponse(well_stats_from_arrays(arrays, bbox))
+
+        queryset = AbandonedWell.objects.all()
+        if bbox:
+            queryset = filter_bbox_param(queryset, bbox)
+
+        total, top_licensees, by_type = await gather_queries(
+            queryset.count,
+            lambda: list(
+                queryset.values("licensee")
+                .annotate(count=Count("id"))
+                .order_by("-count")[:5]
+                .values("licensee", "count")
+            ),
+            lambda: dict(
+                queryset.values("well_type")
+                .annotate(count=Count("id"))
+                .values_list("well_type", "count")
+            ),
+        )
+
+        stats = {
+            "total_wells": total,
+            "wells_in_view": total if bbox else 0,
+            "top_licensees": top_licensees,
+            "wells_by_type": by_type,
+            "last_updated": timezone.now(),
+        }
+        return JsonResponse(stats)
+
+
+class WellClustersView(View):
+    """Async API endpoint for clustered well data for map display."""
+
+    async def get(self, request):
+        north = float(request.GET.get("north", 60))
+        south = float(request.GET.get("south", 49))
+        east = float(request.GET.get("east", -110))
+        west = float(request.GET.get("west", -120))
+        zoom = int(request.GET.get("zoom", 8))
+
+        grid_size = 0.5 if zoom < 10 else 0.1  # Degrees
+
+        clusters = await sync_to_async(grid_clusters)(south, west, north, east, grid_size)
+
+        return JsonResponse(
+            {"clusters": clusters, "total_clusters": len(clusters), "zoom": zoom}
+        )
+
+
+class FireEventsView(View):
+    """
+    Server-sent events stream of fire changes (optionally in one ?region=).
+
+    Each ingestion sends one ``fires`` event with its created and updated
+    fires, and each lifecycle run one with its status-changed fires, all
+    serialized like the active fires list. Streams
+    end after FIRE_EVENTS_MAX_AGE seconds, since Django does not notice
+    clients that went away; EventSource reconnects on its own and sends
+    Last-Event-ID, so events published in between are replayed.
+
+    Only served under ASGI: under WSGI a stream would hold a worker for its
+    whole lifetime, so it answers 501 there.
+    """
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {"error": "The events stream needs the ASGI server (config.asgi)"}, status=501
+            )
+        region = region_param(request.GET)
+        try:
+            last_event_id = int(request.headers.get("Last-Event-ID", ""))
+        except ValueError:
+            last_event_id = None
+
+        response = StreamingHttpResponse(
+            self.stream(region, last_event_id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Keep nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, region, last_event_id):
+        queue = hub.subscribe()
+        deadline = asyncio.get_running_loop().time() + settings.FIRE_EVENTS_MAX_AGE
+        try:
+            yield f"retry: {settings.FIRE_EVENTS_RETRY_MS}\n\n"
+            missed = hub.since(last_event_id) if last_event_id is not None else []
+            for event in missed:
+                text = event.for_region(region) if region else event.text
+                if text:
+                    yield text
+
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), min(settings.FIRE_EVENTS_HEARTBEAT, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line, keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                text = event.for_region(region) if region else event.text
+                if text:
+                    yield text
+        finally:
+            hub.unsubscribe(queue)
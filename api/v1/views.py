@@ -1,44 +1,107 @@
 from rest_framework import generics, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.core.cache import cache
+from django.http import FileResponse
 from django.utils import timezone
-from django.db.models import Sum, Count, Avg, Q
+from django.db.models import Sum, Count, Avg, Q, Min, F
+from django.db.models.functions import Floor
 from datetime import datetime, timedelta
+import math
 from rest_framework.decorators import action
 
-from fires.models import Wildfire
+from config.profiling import list_profiles, profile_path
+from fires.models import Wildfire, DailyReport, FireIncident, FirePerimeter
 from fires.api.serializers import (
     WildfireSerializer,
     WildfireListSerializer,
-    WildfireStatsSerializer
+    WildfireStatsSerializer,
+    DailyReportSerializer
 )
-from fires.models import AbandonedWell
-from fires.api.serializers import AbandonedWellListSerializer
+from fires.models import AbandonedWell, FireWellExposure
+from fires.api.serializers import (
+    AbandonedWellListSerializer,
+    FireWellExposureSerializer,
+    WellBatchQuerySerializer,
+    WellGeometryQuerySerializer,
+)
+from fires.services.activity import GENERATION as ACTIVITY_GENERATION
+from fires.services.activity import GRANULARITIES, activity_series
+from fires.services.autocomplete import FIELDS as AUTOCOMPLETE_FIELDS
+from fires.services.autocomplete import autocomplete
+from fires.services.changes import ExpiredCursor, InvalidCursor, changes_since, current_cursor
+from fires.services.generations import RESPONSE_TIMEOUT, etag_for, get_generation, response_key
+from fires.services.geometry_query import parse_geometry, wells_within
+from fires.services.incidents import perimeter_level
+from fires.services.ingest import get_progress
+from fires.services.nearest import MAX_K as MAX_NEAREST_K
+from fires.services.nearest import nearest_wells
+from fires.services.reports import day_bounds
+from fires.services.spatial import filter_bbox
+from fires.services.well_arrays import get_well_arrays
+from fires.services.well_batch import query_viewports
+
+def region_param(params):
+    """Upper-cased ``region`` query param, or None when absent."""
+    region = params.get("region", "").strip().upper()
+    return region or None
+
+
+# Sample of wells listed when no bounds are given
+CALGARY_BBOX = (50.8, -114.3, 51.3, -113.8)
+
+
+def bbox_param(params):
+    """Raw (south, west, north, east) query params, or None when any is missing."""
+    bbox = tuple(params.get(key) for key in ("south", "west", "north", "east"))
+    return bbox if all(bbox) else None
+
+
+def filter_bbox_param(queryset, bbox):
+    """Filter ``queryset`` to a ``bbox_param`` box; no filter if it isn't numbers."""
+    try:
+        south, west, north, east = (float(value) for value in bbox)
+    except ValueError:
+        return queryset
+    return filter_bbox(queryset, south, west, north, east)
+
 
 class ActiveFiresListView(generics.ListAPIView):
-    """API endpoints to get all active wildfires in Alberta"""
+    """API endpoints to get all active wildfires (optionally in one ?region=)"""
 
     serializer_class = WildfireListSerializer
 
     def get_queryset(self):
-        return Wildfire.objects.filter(status='ACTIVE')
+        queryset = Wildfire.objects.filter(status='ACTIVE')
+        region = region_param(self.request.query_params)
+        if region:
+            queryset = queryset.filter(region=region)
+        return queryset
 
 class WildFireStatsView(APIView):
     """API endpoints for wildfire statistics"""
 
     def get(self, request):
-        today = timezone.now().date()
+        start, end = day_bounds(timezone.localdate())
+
+        fires = Wildfire.objects.all()
+        region = region_param(request.query_params)
+        if region:
+            fires = fires.filter(region=region)
 
         # calculate statistics
         stats = {
-            "total_active_fires": Wildfire.objects.filter(status="ACTIVE").count(),
-            "total_hectares_burned": Wildfire.objects.aggregate(
+            "total_active_fires": fires.filter(status="ACTIVE").count(),
+            "total_hectares_burned": fires.aggregate(
                 total=Sum("size_hectares")
             )["total"]
             or 0,
-            "fires_today": Wildfire.objects.filter(detected_date__date=today).count(),
+            "fires_today": fires.filter(
+                detected_date__gte=start, detected_date__lt=end
+            ).count(),
             "fires_by_status": dict(
-                Wildfire.objects.values("status")
+                fires.values("status")
                 .annotate(count=Count("id"))
                 .values_list("status", "count")
             ),
@@ -49,6 +112,250 @@ class WildFireStatsView(APIView):
         return Response(serializer.data)
 
 
+class DailyReportListView(generics.ListAPIView):
+    """API endpoint for the daily report time series."""
+
+    serializer_class = DailyReportSerializer
+
+    def list(self, request, *args, **kwargs):
+        # Default to the last 30 days
+        end = request.query_params.get("end")
+        start = request.query_params.get("start")
+        try:
+            self.end_date = (
+                datetime.strptime(end, "%Y-%m-%d").date() if end else timezone.localdate()
+            )
+            self.start_date = (
+                datetime.strptime(start, "%Y-%m-%d").date()
+                if start
+                else self.end_date - timedelta(days=30)
+            )
+        except ValueError:
+            return Response(
+                {"error": "start and end must be YYYY-MM-DD dates"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return DailyReport.objects.order_by("date").filter(
+            date__gte=self.start_date, date__lte=self.end_date
+        )
+
+
+class FireActivityView(APIView):
+    """
+    API endpoint for per-day or per-hour fire activity in a bbox.
+
+    Served from the incrementally maintained activity buckets. Responses are
+    cached per activity generation and carry it in an ETag, so clients and
+    the cache are invalidated together when an ingestion changes buckets.
+    """
+
+    MAX_DAYS = {"DAY": 400, "HOUR": 31}
+
+    def get(self, request):
+        params = request.query_params
+        granularity = params.get("granularity", "day").upper()
+        if granularity not in GRANULARITIES:
+            return Response(
+                {"error": "granularity must be 'day' or 'hour'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            end_date = (
+                datetime.strptime(params["end"], "%Y-%m-%d").date()
+                if params.get("end")
+                else timezone.localdate()
+            )
+            start_date = (
+                datetime.strptime(params["start"], "%Y-%m-%d").date()
+                if params.get("start")
+                else end_date - timedelta(days=30 if granularity == "DAY" else 1)
+            )
+        except ValueError:
+            return Response(
+                {"error": "start and end must be YYYY-MM-DD dates"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start_date > end_date:
+            return Response(
+                {"error": "start must not be after end"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end_date - start_date).days >= self.MAX_DAYS[granularity]:
+            return Response(
+                {"error": f"{granularity.lower()} series are limited to {self.MAX_DAYS[granularity]} days"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bbox = None
+        if all(params.get(key) for key in ("south", "west", "north", "east")):
+            try:
+                bbox = tuple(float(params[key]) for key in ("south", "west", "north", "east"))
+            except ValueError:
+                pass
+        region = region_param(params)
+
+        key = response_key(
+            ACTIVITY_GENERATION,
+            get_generation(ACTIVITY_GENERATION),
+            {
+                "granularity": granularity,
+                "start": start_date,
+                "end": end_date,
+                "bbox": bbox,
+                "region": region,
+            },
+        )
+        etag = etag_for(key)
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        data = cache.get(key)
+        if data is None:
+            data = {
+                "granularity": granularity.lower(),
+                "start": start_date,
+                "end": end_date,
+                "bbox": bbox,
+                "region": region,
+                "series": activity_series(granularity, start_date, end_date, bbox, region),
+            }
+            cache.set(key, data, RESPONSE_TIMEOUT)
+
+        return Response(data, headers={"ETag": etag})
+
+
+class FirePerimetersView(APIView):
+    """
+    API endpoint for estimated fire incident perimeters as GeoJSON.
+
+    Each incident's perimeter is served at the precomputed simplification
+    suited to ``zoom``. Incidents that are out are left off unless
+    ``include_out`` is set.
+    """
+
+    def get(self, request):
+        try:
+            zoom = int(request.query_params.get("zoom", 8))
+        except ValueError:
+            zoom = 8
+
+        incidents = FireIncident.objects.all()
+        if request.query_params.get("include_out", "").lower() not in ("1", "true"):
+            incidents = incidents.exclude(status="OUT")
+
+        region = region_param(request.query_params)
+        if region:
+            # Incidents with any detection in the region
+            incidents = incidents.filter(
+                pk__in=Wildfire.objects.filter(region=region, incident__isnull=False).values("incident_id")
+            )
+
+        bbox = [request.query_params.get(key) for key in ("south", "west", "north", "east")]
+        if all(bbox):
+            try:
+                south, west, north, east = (float(value) for value in bbox)
+                # Incidents whose extent overlaps the bbox
+                incidents = incidents.filter(
+                    north__gte=south, south__lte=north, east__gte=west, west__lte=east
+                )
+            except ValueError:
+                pass
+
+        perimeters = FirePerimeter.objects.filter(
+            incident__in=incidents, min_zoom=perimeter_level(zoom)
+        ).select_related("incident")
+
+        features = [
+            {
+                "type": "Feature",
+                "id": perimeter.incident_id,
+                "geometry": perimeter.geometry,
+                "properties": {
+                    "incident_id": perimeter.incident_id,
+                    "status": perimeter.incident.status,
+                    "detection_count": perimeter.incident.detection_count,
+                    "first_detected": perimeter.incident.first_detected,
+                    "last_detected": perimeter.incident.last_detected,
+                    "area_hectares": perimeter.incident.area_hectares,
+                    "vertex_count": perimeter.vertex_count,
+                },
+            }
+            for perimeter in perimeters
+        ]
+        return Response({"type": "FeatureCollection", "zoom": zoom, "features": features})
+
+
+class FireChangesView(APIView):
+    """
+    API endpoint for delta sync of the fire table.
+
+    Without ?since= it only returns a cursor to start from; take one before
+    loading the active fires. With ?since=<cursor> it returns the fires
+    created and updated and the fire ids deleted since then, plus the
+    cursor for the next call (call again at once while has_more is true).
+    Optional: ?region=, ?limit= (max 5000). An expired cursor gets a 410.
+    """
+
+    def get(self, request):
+        since = request.query_params.get("since")
+        if not since:
+            return Response({"cursor": current_cursor()})
+        try:
+            limit = int(request.query_params.get("limit", 1000))
+        except ValueError:
+            limit = 1000
+
+        try:
+            changes = changes_since(since, region_param(request.query_params), limit)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_410_GONE)
+        return Response(changes)
+
+
+class IngestProgressView(APIView):
+    """API endpoint for the progress of a fire ingestion job (the latest by default)."""
+
+    def get(self, request):
+        progress = get_progress(request.query_params.get("job_id"))
+        if progress is None:
+            return Response({"error": "Unknown ingestion job"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(progress)
+
+
+class ProfileListView(APIView):
+    """API endpoint listing the stored request profiles (staff only)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"profiles": list_profiles()})
+
+
+class ProfileDownloadView(APIView):
+    """
+    API endpoint for one stored request profile (staff only).
+
+    Returns the pstats file (open with ``python -m pstats`` or snakeviz),
+    or the JSON report with the recorded queries when ?format=json.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        as_json = request.query_params.get("format") == "json"
+        path = profile_path(profile_id, "json" if as_json else "prof")
+        if path is None:
+            return Response({"error": "Unknown profile"}, status=status.HTTP_404_NOT_FOUND)
+        if as_json:
+            return FileResponse(open(path, "rb"), content_type="application/json")
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{profile_id}.prof")
+
+
 class PredictRiskView(APIView):
     """API endpoint for AI-powered wildfire risk prediction"""
 
@@ -77,35 +384,12 @@ class AbandonedWellsListView(generics.ListAPIView):
     serializer_class = AbandonedWellListSerializer
 
     def get_queryset(self):
-        queryset = AbandonedWell.objects.all()
-
-        # Get query parameters
-        north = self.request.query_params.get("north")
-        south = self.request.query_params.get("south")
-        east = self.request.query_params.get("east")
-        west = self.request.query_params.get("west")
+        # Filter by bounding box (required for large dataset); if no bounds
+        # are specified, return a sample around Calgary
+        bbox = bbox_param(self.request.query_params) or CALGARY_BBOX
+        queryset = filter_bbox_param(AbandonedWell.objects.all(), bbox)
         limit = self.request.query_params.get("limit", 1000)
 
-        # Filter by bounding box (required for large dataset)
-        if all([north, south, east, west]):
-            try:
-                queryset = queryset.filter(
-                    latitude__gte=float(south),
-                    latitude__lte=float(north),
-                    longitude__gte=float(west),
-                    longitude__lte=float(east),
-                )
-            except ValueError:
-                pass
-        else:
-            # If no bounds specified, return a sample around Calgary
-            queryset = queryset.filter(
-                latitude__gte=50.8,
-                latitude__lte=51.3,
-                longitude__gte=-114.3,
-                longitude__lte=-113.8,
-            )
-
         # Limit results
         try:
             limit = min(int(limit), 5000)  # Max 5000 wells
@@ -119,30 +403,23 @@ class WellStatsView(APIView):
     """API endpoint for abandoned well statistics."""
 
     def get(self, request):
-        # Get query parameters for filtering
-        north = request.query_params.get("north")
-        south = request.query_params.get("south")
-        east = request.query_params.get("east")
-        west = request.query_params.get("west")
+        bbox = bbox_param(request.query_params)
+
+        arrays = get_well_arrays()
+        if arrays is not None:
+            return Response(well_stats_from_arrays(arrays, bbox))
 
         queryset = AbandonedWell.objects.all()
 
         # Apply bounding box filter if provided
-        if all([north, south, east, west]):
-            try:
-                queryset = queryset.filter(
-                    latitude__gte=float(south),
-                    latitude__lte=float(north),
-                    longitude__gte=float(west),
-                    longitude__lte=float(east),
-                )
-            except ValueError:
-                pass
+        if bbox:
+            queryset = filter_bbox_param(queryset, bbox)
 
         # Calculate stats
+        total = queryset.count()
         stats = {
-            "total_wells": queryset.count(),
-            "wells_in_view": queryset.count() if all([north, south, east, west]) else 0,
+            "total_wells": total,
+            "wells_in_view": total if bbox else 0,
             "top_licensees": list(
                 queryset.values("licensee")
                 .annotate(count=Count("id"))
@@ -160,6 +437,185 @@ class WellStatsView(APIView):
         return Response(stats)
 
 
+class NearestWellsView(APIView):
+    """API endpoint for the k abandoned wells closest to a point."""
+
+    def get(self, request):
+        try:
+            lat = float(request.query_params["lat"])
+            lon = float(request.query_params["lon"])
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "lat and lon are required numbers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return Response(
+                {"error": "lat/lon out of range"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            k = min(max(int(request.query_params.get("k", 20)), 1), MAX_NEAREST_K)
+        except ValueError:
+            k = 20
+
+        nearest = nearest_wells(lat, lon, k)
+        wells = AbandonedWell.objects.in_bulk([pk for pk, _, _ in nearest])
+
+        results = []
+        for pk, distance, bearing in nearest:
+            well = wells.get(pk)
+            if well is None:
+                # Deleted since the snapshot was taken
+                continue
+            data = AbandonedWellListSerializer(well).data
+            data["distance_km"] = round(distance, 3)
+            data["bearing_deg"] = round(bearing, 1)
+            results.append(data)
+
+        return Response({"lat": lat, "lon": lon, "k": k, "wells": results})
+
+
+class WellAutocompleteView(APIView):
+    """API endpoint for licensee or licence number suggestions by prefix."""
+
+    def get(self, request):
+        prefix = request.query_params.get("q", "").strip()
+        field = request.query_params.get("field", "licensee")
+        if field not in AUTOCOMPLETE_FIELDS:
+            return Response(
+                {"error": f"field must be one of {', '.join(AUTOCOMPLETE_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not prefix:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+
+        return Response(
+            {"q": prefix, "field": field, "results": autocomplete(field, prefix, limit)}
+        )
+
+
+class WellsWithinGeometryView(APIView):
+    """
+    API endpoint for wells inside a GeoJSON geometry.
+
+    Body: {"geometry": <GeoJSON geometry>, "buffer_km", "limit", "fields"}.
+    Polygons are used as given; points and lines need a buffer.
+    """
+
+    def post(self, request):
+        serializer = WellGeometryQuerySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        try:
+            geometry = parse_geometry(data["geometry"], data["buffer_km"])
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        count, pks = wells_within(geometry, data["limit"])
+        rows = {
+            row.pop("pk"): row
+            for row in AbandonedWell.objects.filter(pk__in=pks).values("pk", *data["fields"])
+        }
+
+        return Response(
+            {
+                "count": count,
+                "bbox": geometry.bounds,
+                "wells": [rows[pk] for pk in pks if pk in rows],
+            }
+        )
+
+
+class WellBatchQueryView(APIView):
+    """
+    API endpoint answering several map viewports of wells in one request.
+
+    Body: {"viewports": [{"south", "west", "north", "east", "limit",
+    "fields", "stats"}, ...]}. Overlapping viewports share the candidate
+    scan and the row fetch.
+    """
+
+    def post(self, request):
+        serializer = WellBatchQuerySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        results = query_viewports(serializer.validated_data["viewports"])
+        return Response({"results": results, "last_updated": timezone.now()})
+
+
+def well_stats_from_arrays(arrays, bbox):
+    """WellStatsView response computed from the shared well arrays."""
+    mask = None
+    if bbox:
+        try:
+            mask = arrays.bbox_mask(*(float(value) for value in bbox))
+        except ValueError:
+            pass
+
+    summary = arrays.summary(mask)
+    return {
+        "total_wells": summary["total"],
+        "wells_in_view": summary["total"] if bbox else 0,
+        "top_licensees": summary["top_licensees"],
+        "wells_by_type": summary["by_type"],
+        "last_updated": timezone.now(),
+    }
+
+
+def grid_clusters(south, west, north, east, grid_size):
+    """
+    Count wells per grid cell with a single grouped query.
+
+    Cells start at the south-west corner and span ``grid_size`` degrees,
+    so the last row and column may reach past the north and east edges.
+    Served from the shared well arrays when a snapshot is available.
+    """
+    arrays = get_well_arrays()
+    if arrays is not None:
+        return arrays.grid_clusters(south, west, north, east, grid_size)
+
+    rows = math.ceil((north - south) / grid_size)
+    columns = math.ceil((east - west) / grid_size)
+
+    cells = (
+        AbandonedWell.objects.filter(
+            latitude__gte=south,
+            latitude__lt=south + rows * grid_size,
+            longitude__gte=west,
+            longitude__lt=west + columns * grid_size,
+        )
+        .annotate(
+            row=Floor((F("latitude") - south) / grid_size),
+            column=Floor((F("longitude") - west) / grid_size),
+        )
+        .order_by()
+        .values("row", "column")
+        .annotate(count=Count("id"))
+    )
+
+    clusters = []
+    for cell in sorted(cells, key=lambda c: (c["row"], c["column"])):
+        clusters.append(
+            {
+                "center": {
+                    "lat": south + int(cell["row"]) * grid_size + grid_size / 2,
+                    "lng": west + int(cell["column"]) * grid_size + grid_size / 2,
+                },
+                "count": cell["count"],
+            }
+        )
+    return clusters
+
+
 class WellClustersView(APIView):
     """API endpoint for clustered well data for map display."""
 
@@ -172,38 +628,96 @@ class WellClustersView(APIView):
         west = float(request.query_params.get("west", -120))
         zoom = int(request.query_params.get("zoom", 8))
 
-        # For now, return a grid-based aggregation
-        # In production, you might use PostGIS or a clustering algorithm
-
         # Simple grid clustering
         grid_size = 0.5 if zoom < 10 else 0.1  # Degrees
 
-        clusters = []
-        lat = south
-        while lat < north:
-            lon = west
-            while lon < east:
-                count = AbandonedWell.objects.filter(
-                    latitude__gte=lat,
-                    latitude__lt=lat + grid_size,
-                    longitude__gte=lon,
-                    longitude__lt=lon + grid_size,
-                ).count()
-
-                if count > 0:
-                    clusters.append(
-                        {
-                            "center": {
-                                "lat": lat + grid_size / 2,
-                                "lng": lon + grid_size / 2,
-                            },
-                            "count": count,
-                        }
-                    )
-
-                lon += grid_size
-            lat += grid_size
+        clusters = grid_clusters(south, west, north, east, grid_size)
 
         return Response(
             {"clusters": clusters, "total_clusters": len(clusters), "zoom": zoom}
         )
+
+
+class WellsAtRiskView(APIView):
+    """API endpoint for abandoned wells exposed to fires that are not out."""
+
+    def get(self, request):
+        fire_id = request.query_params.get("fire_id")
+        max_distance = request.query_params.get("max_distance")
+        limit = request.query_params.get("limit", 500)
+
+        try:
+            limit = min(int(limit), 5000)
+        except ValueError:
+            limit = 500
+
+        queryset = FireWellExposure.objects.all()
+        if max_distance:
+            try:
+                queryset = queryset.filter(distance_km__lte=float(max_distance))
+            except ValueError:
+                pass
+
+        # Wells around a single fire, closest first
+        if fire_id:
+            exposures = (
+                queryset.filter(fire__fire_id=fire_id)
+                .select_related("fire", "well")
+                .order_by("distance_km")[:limit]
+            )
+            return Response(FireWellExposureSerializer(exposures, many=True).data)
+
+        # Otherwise every exposed well with its closest fire distance
+        wells = list(
+            queryset.values(
+                "well__well_id",
+                "well__latitude",
+                "well__longitude",
+                "well__well_type",
+                "well__licensee",
+            )
+            .annotate(nearest_fire_km=Min("distance_km"), fire_count=Count("fire_id"))
+            .order_by("nearest_fire_km")[:limit]
+        )
+
+        return Response(
+            [
+                {
+                    "well_id": well["well__well_id"],
+                    "latitude": well["well__latitude"],
+                    "longitude": well["well__longitude"],
+                    "well_type": well["well__well_type"],
+                    "licensee": well["well__licensee"],
+                    "nearest_fire_km": well["nearest_fire_km"],
+                    "fire_count": well["fire_count"],
+                }
+                for well in wells
+            ]
+        )
+
+
+class LicenseeExposureView(APIView):
+    """API endpoint summarizing fire exposure per well licensee."""
+
+    def get(self, request):
+        summary = (
+            FireWellExposure.objects.values("well__licensee")
+            .annotate(
+                wells_at_risk=Count("well_id", distinct=True),
+                fires=Count("fire_id", distinct=True),
+                nearest_fire_km=Min("distance_km"),
+            )
+            .order_by("-wells_at_risk")
+        )
+
+        return Response(
+            [
+                {
+                    "licensee": row["well__licensee"],
+                    "wells_at_risk": row["wells_at_risk"],
+                    "fires": row["fires"],
+                    "nearest_fire_km": row["nearest_fire_km"],
+                }
+                for row in summary
+            ]
+        )
@@ -0,0 +1,49 @@
+# Gunicorn configuration, used as: gunicorn -c config/gunicorn.conf.py
+#
+# SERVER_MODE=asgi (the default) runs config.asgi under uvicorn workers, so
+# slow map queries no longer block other requests. SERVER_MODE=wsgi keeps
+# the previous synchronous setup.
+import os
+
+server_mode = os.environ.get("SERVER_MODE", "asgi").lower()
+
+if server_mode == "wsgi":
+    wsgi_app = "config.wsgi:application"
+    worker_class = "sync"
+else:
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+accesslog = "-"
+
+
+def when_ready(server):
+    """Build or refresh the shared well arrays once, before workers fork."""
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+    from django.core import checks
+    from django.db import connections
+
+    from fires.checks import TAG
+    from fires.services.well_arrays import prewarm_well_arrays
+
+    # Warn about state that would not be shared with the Celery workers
+    for message in checks.run_checks(tags=[TAG]):
+        server.log.warning(f"{message.id}: {message.msg} {message.hint}")
+
+    try:
+        arrays = prewarm_well_arrays()
+        if arrays is not None:
+            server.log.info(f"Well arrays {arrays.version} ready ({len(arrays)} wells)")
+    except Exception as e:
+        server.log.warning(f"Could not prewarm well arrays: {e}")
+    finally:
+        # Forked workers must not share the master's connection
+        connections.close_all()
@@ -0,0 +1,202 @@
+import os
+import time
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+
+from config.profiling import HEADER as PROFILE_HEADER
+from config.profiling import Capture, awants_profile, wants_profile
+from config.routers import read_from_replica
+from fires.services.snapshots import MANIFEST as SNAPSHOT_MANIFEST
+from fires.services.snapshots import refresh_stale_snapshots
+
+
+# Seconds between checks of the snapshot manifest against the data generations
+SNAPSHOT_CHECK_INTERVAL = 1.0
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware that also runs natively under ASGI.
+
+    The stock middleware is sync-only, which makes Django run the whole
+    middleware chain, and every async view behind it, on a single thread.
+    Static file lookups are in-memory, so the async path only has to avoid
+    that adaptation.
+
+    It also serves the API snapshots in SNAPSHOT_DIR (see
+    fires.services.snapshots) under SNAPSHOT_URL. Those files appear after
+    startup, so they are looked up on request rather than scanned once.
+    Versioned snapshots are cached forever, the manifest is revalidated.
+    Before serving the manifest the snapshots are rewritten if the data
+    changed since they were written (by a worker on another host, say).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Versioned snapshot files never change, so their lookups are kept
+        self.snapshot_files = {}
+        self.snapshots_checked_at = 0.0
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._snapshots_due(request):
+            refresh_stale_snapshots()
+        static_file = self._static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return self.get_response(request)
+
+    def _snapshots_due(self, request):
+        """True for a manifest request when the snapshots were not checked lately."""
+        manifest_url = settings.SNAPSHOT_URL + SNAPSHOT_MANIFEST
+        if not settings.SNAPSHOT_DIR or request.path_info != manifest_url:
+            return False
+        now = time.monotonic()
+        if now - self.snapshots_checked_at < SNAPSHOT_CHECK_INTERVAL:
+            return False
+        self.snapshots_checked_at = now
+        return True
+
+    def _static_file(self, request):
+        if settings.SNAPSHOT_DIR and request.path_info.startswith(settings.SNAPSHOT_URL):
+            return self._snapshot_file(request.path_info)
+        if self.autorefresh:
+            return self.find_file(request.path_info)
+        return self.files.get(request.path_info)
+
+    def _snapshot_file(self, url):
+        name = url[len(settings.SNAPSHOT_URL) :]
+        if not name or "/" in name or not self.url_is_canonical(url):
+            return None
+        path = os.path.join(settings.SNAPSHOT_DIR, name)
+        static_file = self.snapshot_files.get(url)
+        if static_file is not None:
+            # Old versions get pruned
+            if os.path.exists(path):
+                return static_file
+            del self.snapshot_files[url]
+            return None
+        if self.is_compressed_variant(path):
+            return None
+        try:
+            static_file = self.get_static_file(path, url)
+        except MissingFileError:
+            return None
+        if self.immutable_file_test(path, url):
+            if len(self.snapshot_files) > 100:
+                self.snapshot_files.clear()
+            self.snapshot_files[url] = static_file
+        return static_file
+
+    def immutable_file_test(self, path, url):
+        if settings.SNAPSHOT_DIR and url.startswith(settings.SNAPSHOT_URL):
+            return url != settings.SNAPSHOT_URL + SNAPSHOT_MANIFEST
+        return super().immutable_file_test(path, url)
+
+    def add_cache_headers(self, headers, path, url):
+        super().add_cache_headers(headers, path, url)
+        if url == settings.SNAPSHOT_URL + SNAPSHOT_MANIFEST:
+            headers["Cache-Control"] = "no-cache"
+
+    async def __acall__(self, request):
+        if self._snapshots_due(request):
+            # Rendering the snapshots queries the database
+            await sync_to_async(refresh_stale_snapshots)()
+        static_file = self._static_file(request)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaReadMiddleware:
+    """
+    Serve safe-method API requests from the read replica.
+
+    Requests that can write, and everything outside /api/ (the admin in
+    particular), keep using the primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _use_replica(self, request):
+        return request.method in ("GET", "HEAD", "OPTIONS") and request.path_info.startswith(
+            "/api/"
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._use_replica(request):
+            return self.get_response(request)
+        with read_from_replica():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not self._use_replica(request):
+            return await self.get_response(request)
+        with read_from_replica():
+            return await self.get_response(request)
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that ask for it (see config.profiling).
+
+    The profile id is returned in the X-Profile-Id response header.
+
+    cProfile and the query recorders only see the thread they run in. Under
+    ASGI a profiled request is therefore handed to a worker thread that
+    drives the rest of the chain, and sync views (all DRF views) run back
+    on that thread, so they are profiled as under WSGI. The code of async
+    views runs on the event loop and only shows up as the time awaited.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not wants_profile(request):
+            return self.get_response(request)
+        with Capture(request) as capture:
+            response = self.get_response(request)
+        response[f"{PROFILE_HEADER}-Id"] = capture.save(response)
+        return response
+
+    async def __acall__(self, request):
+        if not await awants_profile(request):
+            return await self.get_response(request)
+        return await sync_to_async(self._profile_in_thread, thread_sensitive=False)(request)
+
+    def _profile_in_thread(self, request):
+        try:
+            with Capture(request) as capture:
+                # Sync code below runs on this thread, where the profiler is
+                response = async_to_sync(self.get_response)(request)
+            response[f"{PROFILE_HEADER}-Id"] = capture.save(response)
+            return response
+        finally:
+            # Connections opened by the view on this thread
+            connections.close_all()
@@ -0,0 +1,208 @@
+"""
+Opt-in profiling of single requests.
+
+A request is profiled when it carries a valid signed X-Profile token (see
+``make_token`` and the ``profile_token`` command) or when a staff user adds
+``?profile=1``. It runs under cProfile while every SQL query is recorded
+with its duration and the project frames that issued it. Each capture is
+written to PROFILE_DIR as a pstats file plus a JSON report, and only the
+newest PROFILE_KEEP captures are kept.
+"""
+from contextlib import ExitStack
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+import traceback
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.utils import timezone
+
+
+HEADER = "X-Profile"
+SIGNING_SALT = "request-profile"
+
+# Frames from these paths are not shown as query origins
+_LIBRARY_MARKERS = (os.sep + "site-packages" + os.sep, os.sep + "lib" + os.sep + "python")
+
+_ID_PATTERN = re.compile(r"^[0-9]{8}-[0-9]{6}-[a-z]+-[a-z0-9_-]*-[0-9a-f]{8}$")
+
+
+def make_token():
+    """Signed token for the X-Profile header, valid for PROFILE_TOKEN_MAX_AGE seconds."""
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign("profile")
+
+
+def token_is_valid(token):
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            token, max_age=settings.PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def _is_staff(request):
+    # request.user is lazy and loads the session user from the database
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+def wants_profile(request):
+    """True when profiling is enabled and the request asked for it with valid credentials."""
+    if not settings.PROFILE_DIR:
+        return False
+    token = request.headers.get(HEADER)
+    if token:
+        return token_is_valid(token)
+    return request.GET.get("profile") == "1" and _is_staff(request)
+
+
+async def awants_profile(request):
+    """wants_profile for the event loop, where the user must be loaded in a thread."""
+    if not settings.PROFILE_DIR:
+        return False
+    token = request.headers.get(HEADER)
+    if token:
+        return token_is_valid(token)
+    return request.GET.get("profile") == "1" and await sync_to_async(_is_staff)(request)
+
+
+def _origin():
+    """Innermost project frames of the current stack."""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename != __file__
+        and not any(marker in frame.filename for marker in _LIBRARY_MARKERS)
+    ]
+    return [f"{frame.filename}:{frame.lineno} in {frame.name}" for frame in frames[-4:]]
+
+
+class QueryRecorder:
+    """execute_wrapper that records each query with its timing and origin."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": self.alias,
+                    "sql": sql,
+                    "params": repr(params)[:500],
+                    "many": many,
+                    "ms": round((time.perf_counter() - started) * 1000, 3),
+                    "origin": _origin(),
+                }
+            )
+
+
+class Capture:
+    """Profiler and query recorders for one request."""
+
+    def __init__(self, request):
+        self.request = request
+        self.profiler = cProfile.Profile()
+        self.recorders = [QueryRecorder(alias) for alias in connections]
+        self.stack = ExitStack()
+        self.started = None
+        self.duration = None
+
+    def __enter__(self):
+        for recorder in self.recorders:
+            self.stack.enter_context(connections[recorder.alias].execute_wrapper(recorder))
+        self.started = time.perf_counter()
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self.started
+        self.stack.close()
+
+    def save(self, response):
+        """Write the capture to PROFILE_DIR and return its id."""
+        now = timezone.now()
+        slug = re.sub(r"[^a-z0-9]+", "-", self.request.path.lower()).strip("-")[:60]
+        profile_id = f"{now:%Y%m%d-%H%M%S}-{self.request.method.lower()}-{slug}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(settings.PROFILE_DIR, profile_id)
+
+        self.profiler.dump_stats(f"{base}.prof")
+        summary = io.StringIO()
+        pstats.Stats(self.profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+
+        queries = [query for recorder in self.recorders for query in recorder.queries]
+        report = {
+            "id": profile_id,
+            "created": now.isoformat(),
+            "method": self.request.method,
+            "path": self.request.get_full_path(),
+            "status": response.status_code,
+            "duration_ms": round(self.duration * 1000, 3),
+            "query_count": len(queries),
+            "query_ms": round(sum(query["ms"] for query in queries), 3),
+            "queries": queries,
+            "top_functions": summary.getvalue(),
+        }
+        with open(f"{base}.json", "w") as f:
+            json.dump(report, f, indent=1)
+
+        prune_profiles()
+        return profile_id
+
+
+def list_profiles():
+    """Reports of the stored captures without their query lists, newest first."""
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(settings.PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(settings.PROFILE_DIR, name)) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        report.pop("queries", None)
+        report.pop("top_functions", None)
+        profiles.append(report)
+    return profiles
+
+
+def profile_path(profile_id, extension):
+    """Path of a stored capture file, or None for unknown or malformed ids."""
+    if not _ID_PATTERN.match(profile_id):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.{extension}")
+    return path if os.path.exists(path) else None
+
+
+def prune_profiles():
+    """Delete all but the newest PROFILE_KEEP captures."""
+    reports = sorted(
+        name for name in os.listdir(settings.PROFILE_DIR) if name.endswith(".json")
+    )
+    keep = settings.PROFILE_KEEP
+    for name in reports[:-keep] if keep else reports:
+        base = os.path.join(settings.PROFILE_DIR, name[: -len(".json")])
+        for extension in ("json", "prof"):
+            try:
+                os.remove(f"{base}.{extension}")
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,67 @@
+"""
+Read replica routing.
+
+Reads only go to the ``replica`` database inside ``read_from_replica()``.
+Read-only API requests and report generation enter that context; ingestion
+and imports never do, so they keep reading and writing the primary. After
+an ingestion writes, reads are pinned to the primary for
+REPLICA_STICKY_SECONDS so clients see their own fresh data even when the
+replica lags. The pin is kept in the default cache, so it only reaches
+the web processes from the Celery worker that did the writing when that
+cache is shared (Redis at REDIS_URL, see CACHES in config.settings).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+REPLICA_ALIAS = "replica"
+PIN_CACHE_KEY = "db:primary-pinned"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def pin_primary():
+    """Send replica reads to the primary for the next REPLICA_STICKY_SECONDS."""
+    if replica_configured() and settings.REPLICA_STICKY_SECONDS > 0:
+        cache.set(PIN_CACHE_KEY, True, settings.REPLICA_STICKY_SECONDS)
+
+
+def primary_pinned():
+    return bool(cache.get(PIN_CACHE_KEY))
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads in this context to the replica, unless the primary is pinned."""
+    enabled = replica_configured() and not primary_pinned()
+    token = _use_replica.set(enabled)
+    try:
+        yield enabled
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Send reads to the replica inside read_from_replica(), everything else to default."""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
@@ -5,6 +5,10 @@ import dj_database_url
 
 # Nasa api key
 FIRMS_API_KEY = config("FIRMS_API_KEY", default="")
+# FIRMS country CSV API; pointed at a local stub for load tests
+FIRMS_BASE_URL = config(
+    "FIRMS_BASE_URL", default="https://firms.modaps.eosdis.nasa.gov/api/country/csv"
+)
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,11 +51,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "config.middleware.WhiteNoiseMiddleware",
+    "config.middleware.ReplicaReadMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "config.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -76,6 +82,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
+# Serve the read-only map endpoints with async views (use with config.asgi)
+ASYNC_API_VIEWS = config("ASYNC_API_VIEWS", default=False, cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -107,6 +116,22 @@ else:
         }
     }
 
+# Optional read replica for the read-only API and report generation
+DATABASE_REPLICA_URL = config("DATABASE_REPLICA_URL", default="")
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=600,
+        ssl_require=not DATABASE_REPLICA_URL.startswith("sqlite"),
+    )
+    # Tests run against the primary's test database for both aliases
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["config.routers.ReplicaRouter"]
+
+# After an ingestion writes, reads stay on the primary for this long
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=10, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -147,6 +172,7 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 # WhiteNoise configuration for serving static files in production
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+WHITENOISE_MIMETYPES = {".geojson": "application/geo+json"}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -197,6 +223,114 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Run tasks (chords included) inline, for tests and local runs without a worker
+CELERY_TASK_ALWAYS_EAGER = config("CELERY_TASK_ALWAYS_EAGER", default=False, cast=bool)
+
+# Cache shared by the web processes and the workers: it holds the fetch
+# lock, ingest progress, response generations and the primary pin, so it
+# lives in Redis. Without REDIS_URL every process gets its own memory cache,
+# which only works when tasks run inline (CELERY_TASK_ALWAYS_EAGER).
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Scheduled fire ingestion: rows per parallel chunk task, and how long the
+# fetch lock is held at most if a pipeline dies without releasing it
+FIRE_INGEST_CHUNK_SIZE = config("FIRE_INGEST_CHUNK_SIZE", default=500, cast=int)
+FIRE_INGEST_LOCK_SECONDS = config("FIRE_INGEST_LOCK_SECONDS", default=1800, cast=int)
+
+# Fire cleanup: old OUT fires are deleted in batches of this size, sleeping
+# between batches so API reads are not starved of the table
+FIRE_CLEANUP_BATCH_SIZE = config("FIRE_CLEANUP_BATCH_SIZE", default=5000, cast=int)
+FIRE_CLEANUP_PAUSE_SECONDS = config("FIRE_CLEANUP_PAUSE_SECONDS", default=0.2, cast=float)
+# Directory for gzip CSV exports of deleted fires (disabled when empty)
+FIRE_ARCHIVE_DIR = config("FIRE_ARCHIVE_DIR", default="")
+# Data sources whose fires are never cleaned up (historical backfills)
+FIRE_CLEANUP_KEEP_SOURCES = config(
+    "FIRE_CLEANUP_KEEP_SOURCES",
+    default="NASA_FIRMS_ARCHIVE",
+    cast=lambda v: [s.strip() for s in v.split(",") if s.strip()],
+)
+# Tombstones of cleaned up fires are kept this many days; change feed
+# cursors older than that have to start over
+FIRE_TOMBSTONE_DAYS = config("FIRE_TOMBSTONE_DAYS", default=30, cast=int)
+# Fires show up in the change feed once their last update is this old
+FIRE_CHANGES_LAG_SECONDS = config("FIRE_CHANGES_LAG_SECONDS", default=5, cast=int)
+
+# Resume state of the backfill_firms command, one JSON file per archive file
+FIRMS_BACKFILL_STATE_DIR = config(
+    "FIRMS_BACKFILL_STATE_DIR", default=os.path.join(BASE_DIR, "var", "backfill")
+)
+
+# Source of the AER abandoned wells shapefile loaded by the bootstrap command
+WELLS_SHAPEFILE_URL = config(
+    "WELLS_SHAPEFILE_URL", default="https://www.aer.ca/data/wells/ABNDWells_SHP.zip"
+)
+
+# GeoJSON FeatureCollection of region boundaries (features with a "code" and
+# "name"), and the region codes whose detections are ingested
+FIRE_REGIONS_FILE = config(
+    "FIRE_REGIONS_FILE", default=os.path.join(BASE_DIR, "fires", "data", "regions.geojson")
+)
+FIRE_REGIONS = config(
+    "FIRE_REGIONS",
+    default="AB",
+    cast=lambda v: [s.strip().upper() for s in v.split(",") if s.strip()],
+)
+
+# Wells within this distance of a fire are recorded as exposed to it
+EXPOSURE_RADIUS_KM = config("EXPOSURE_RADIUS_KM", default=10.0, cast=float)
+
+# Detections closer than this are clustered into the same fire incident
+FIRE_INCIDENT_LINK_KM = config("FIRE_INCIDENT_LINK_KM", default=1.0, cast=float)
+# Concave hull ratio for incident perimeters (1 gives the convex hull)
+FIRE_PERIMETER_CONCAVITY = config("FIRE_PERIMETER_CONCAVITY", default=0.3, cast=float)
+
+# Fire lifecycle: an incident with no new detection for this many hours
+# becomes CONTAINED, then OUT (its detections follow)
+FIRE_CONTAINED_AFTER_HOURS = config("FIRE_CONTAINED_AFTER_HOURS", default=24, cast=int)
+FIRE_OUT_AFTER_HOURS = config("FIRE_OUT_AFTER_HOURS", default=72, cast=int)
+
+# Grid cell size (degrees) of the fire activity aggregates behind the
+# time-series endpoint; bbox filters are matched to whole cells
+FIRE_ACTIVITY_CELL_DEGREES = config("FIRE_ACTIVITY_CELL_DEGREES", default=0.1, cast=float)
+
+# Precompressed snapshots of the hottest API responses, rewritten after each
+# ingestion and served by WhiteNoise under SNAPSHOT_URL (empty disables them)
+SNAPSHOT_DIR = config("SNAPSHOT_DIR", default=os.path.join(BASE_DIR, "var", "snapshots"))
+SNAPSHOT_URL = "/snapshots/"
+
+# Server-sent fire events: published through Redis pub/sub when a URL is
+# set (otherwise only within the ingesting process), with a keepalive
+# comment every FIRE_EVENTS_HEARTBEAT seconds and streams ending after
+# FIRE_EVENTS_MAX_AGE seconds, when clients reconnect
+FIRE_EVENTS_REDIS_URL = config("FIRE_EVENTS_REDIS_URL", default=REDIS_URL)
+FIRE_EVENTS_HEARTBEAT = config("FIRE_EVENTS_HEARTBEAT", default=15, cast=int)
+FIRE_EVENTS_MAX_AGE = config("FIRE_EVENTS_MAX_AGE", default=600, cast=int)
+FIRE_EVENTS_RETRY_MS = config("FIRE_EVENTS_RETRY_MS", default=3000, cast=int)
+
+# Opt-in request profiling: captures are written here (empty disables it),
+# only the newest PROFILE_KEEP are kept, and signed X-Profile tokens expire
+# after PROFILE_TOKEN_MAX_AGE seconds
+PROFILE_DIR = config("PROFILE_DIR", default=os.path.join(BASE_DIR, "var", "profiles"))
+PROFILE_KEEP = config("PROFILE_KEEP", default=50, cast=int)
+PROFILE_TOKEN_MAX_AGE = config("PROFILE_TOKEN_MAX_AGE", default=3600, cast=int)
+
+# Memory-mapped snapshots of the wells shared by all workers on a host
+WELL_ARRAYS_DIR = config(
+    "WELL_ARRAYS_DIR", default=os.path.join(BASE_DIR, "var", "well_arrays")
+)
 
 # Security settings for production
 if not DEBUG:
@@ -1,26 +1,198 @@
 from django.contrib import admin
-from .models import Wildfire
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+
+from .models import AbandonedWell, Wildfire
+from .signals import wells_changed
 
 # Register your models here.
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs an unbounded COUNT(*).
+
+    Unfiltered lists on PostgreSQL use the planner's row estimate. Anything
+    else is counted up to COUNT_CAP rows, so a huge filtered result shows
+    COUNT_CAP / per_page pages; narrow the filters to reach the rest.
+    """
+
+    COUNT_CAP = 100_000
+
+    # Below this the estimate is too rough to be worth it
+    ESTIMATE_MIN_ROWS = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if not queryset.query.where and connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= self.ESTIMATE_MIN_ROWS:
+                return row[0]
+        return queryset.order_by().values("pk")[: self.COUNT_CAP].count()
+
+
+class LeanChangeList(ChangeList):
+    """Change list that only loads the model admin's ``list_only`` columns."""
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.only(*self.model_admin.list_only)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin for tables with millions of rows.
+
+    Counts are bounded, search uses case-insensitive prefix lookups that
+    the UPPER() indexes of migration 0012 answer on PostgreSQL, and list
+    pages only load the displayed columns.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_only = ()
+
+    def get_changelist(self, request, **kwargs):
+        return LeanChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        return super().get_search_results(request, queryset, search_term.strip())
+
+
+class FireDataSourceFilter(admin.SimpleListFilter):
+    """Data source filter with fixed choices, instead of a DISTINCT over the table."""
+
+    title = "data source"
+    parameter_name = "data_source"
+
+    def lookups(self, request, model_admin):
+        return [
+            ("NASA_FIRMS", "NASA FIRMS (live)"),
+            ("NASA_FIRMS_ARCHIVE", "NASA FIRMS (archive backfill)"),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(data_source=self.value())
+        return queryset
+
+
+class RegionFilter(admin.SimpleListFilter):
+    """Region filter listing the regions defined in FIRE_REGIONS_FILE."""
+
+    title = "region"
+    parameter_name = "region"
+
+    def lookups(self, request, model_admin):
+        from fires.services.regions import load_regions
+
+        return [(region.code, region.name) for region in load_regions()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(region=self.value())
+        return queryset
+
+
+class WellTypeFilter(admin.SimpleListFilter):
+    """Well type filter whose choices come from the well arrays snapshot labels."""
+
+    title = "well type"
+    parameter_name = "well_type"
+
+    def lookups(self, request, model_admin):
+        from fires.services.well_arrays import get_well_arrays
+
+        arrays = get_well_arrays()
+        if arrays is not None:
+            well_types = arrays.labels["well_type"]
+        else:
+            well_types = (
+                AbandonedWell.objects.order_by("well_type")
+                .values_list("well_type", flat=True)
+                .distinct()
+            )
+        return [(well_type, well_type or "(blank)") for well_type in well_types]
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return queryset.filter(well_type=self.value())
+        return queryset
+
+
 @admin.register(Wildfire)
-class WildfireAdmin(admin.ModelAdmin):
+class WildfireAdmin(LargeTableAdmin):
     list_display = [
         "fire_id",
         "fire_name",
         "status",
+        "region",
         "size_hectares",
         "detected_date",
         "data_source",
     ]
-    list_filter = ["status", "data_source", "detected_date"]
-    search_fields = ["fire_id", "fire_name", "location_description"]
+    list_only = list_display
+    list_filter = ["status", RegionFilter, FireDataSourceFilter, "detected_date"]
+    search_fields = ["fire_id__istartswith"]
+    sortable_by = ["fire_id", "detected_date"]
+    raw_id_fields = ["incident"]
     readonly_fields = ["created_at", "last_updated"]
 
     fieldsets = (
         ("Identification", {"fields": ("fire_id", "fire_name", "data_source")}),
-        ("Location", {"fields": ("latitude", "longitude", "location_description")}),
-        ("Fire Details", {"fields": ("status", "size_hectares", "cause")}),
+        ("Location", {"fields": ("latitude", "longitude", "region", "location_description")}),
+        ("Fire Details", {"fields": ("status", "size_hectares", "cause", "incident")}),
         ("Timestamps", {"fields": ("detected_date", "created_at", "last_updated")}),
     )
+
+
+@admin.register(AbandonedWell)
+class AbandonedWellAdmin(LargeTableAdmin):
+    list_display = [
+        "well_id",
+        "license_number",
+        "well_name",
+        "licensee",
+        "well_type",
+        "status",
+    ]
+    list_only = list_display
+    list_filter = [WellTypeFilter]
+    search_fields = ["well_id__istartswith", "license_number__istartswith", "licensee__istartswith"]
+    sortable_by = ["well_id", "license_number", "licensee"]
+    readonly_fields = ["spatial_key", "content_hash", "created_at", "updated_at"]
+
+    fieldsets = (
+        ("Identification", {"fields": ("well_id", "license_number", "well_name", "data_source")}),
+        ("Location", {"fields": ("latitude", "longitude", "spatial_key", "surface_location")}),
+        ("Well Details", {"fields": ("well_type", "status", "abandonment_date", "licensee")}),
+        ("Risk Factors", {"fields": ("ground_elevation", "total_depth")}),
+        ("Metadata", {"fields": ("content_hash", "created_at", "updated_at")}),
+    )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self.send_wells_changed(**{"updated" if change else "created": [obj.well_id]})
+
+    def delete_model(self, request, obj):
+        well_id = obj.well_id
+        super().delete_model(request, obj)
+        self.send_wells_changed(removed=[well_id])
+
+    def delete_queryset(self, request, queryset):
+        well_ids = list(queryset.values_list("well_id", flat=True))
+        super().delete_queryset(request, queryset)
+        self.send_wells_changed(removed=well_ids)
+
+    def send_wells_changed(self, **changes):
+        """Refresh the well arrays and exposures, as an import does, once the edit commits."""
+        transaction.on_commit(lambda: wells_changed.send(sender=AbandonedWell, **changes))
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from fires.models import Wildfire, AbandonedWell
+from fires.models import Wildfire, AbandonedWell, DailyReport, FireWellExposure
 
 
 class WildfireSerializer(serializers.ModelSerializer):
@@ -23,6 +23,7 @@ class WildfireListSerializer(serializers.ModelSerializer):
             'longitude',
             'size_hectares',
             'status',
+            'region',
             'detected_date',
             'last_updated'
         ]
@@ -68,3 +69,83 @@ class AbandonedWellListSerializer(serializers.ModelSerializer):
             "well_type",
             "licensee",
         ]
+
+
+class DailyReportSerializer(serializers.ModelSerializer):
+    """Serializer for persisted daily reports."""
+
+    class Meta:
+        model = DailyReport
+        fields = [
+            "date",
+            "active_fires",
+            "total_hectares",
+            "fires_by_status",
+            "new_fires",
+            "new_hectares",
+            "updated_at",
+        ]
+
+
+class FireWellExposureSerializer(serializers.ModelSerializer):
+    """Serializer for a well exposed to a specific fire."""
+
+    fire_id = serializers.CharField(source="fire.fire_id")
+    well_id = serializers.CharField(source="well.well_id")
+    latitude = serializers.FloatField(source="well.latitude")
+    longitude = serializers.FloatField(source="well.longitude")
+    well_type = serializers.CharField(source="well.well_type")
+    licensee = serializers.CharField(source="well.licensee")
+
+    class Meta:
+        model = FireWellExposure
+        fields = [
+            "fire_id",
+            "well_id",
+            "latitude",
+            "longitude",
+            "well_type",
+            "licensee",
+            "distance_km",
+            "bearing_deg",
+        ]
+
+
+class ViewportSerializer(serializers.Serializer):
+    """One bbox of a batch wells query."""
+
+    south = serializers.FloatField(min_value=-90, max_value=90)
+    west = serializers.FloatField(min_value=-180, max_value=180)
+    north = serializers.FloatField(min_value=-90, max_value=90)
+    east = serializers.FloatField(min_value=-180, max_value=180)
+    limit = serializers.IntegerField(min_value=0, max_value=5000, default=1000)
+    fields = serializers.ListField(
+        child=serializers.ChoiceField(choices=AbandonedWellSerializer.Meta.fields),
+        default=lambda: list(AbandonedWellListSerializer.Meta.fields),
+    )
+    stats = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data["south"] > data["north"] or data["west"] > data["east"]:
+            raise serializers.ValidationError("south/west must not exceed north/east")
+        return data
+
+
+class WellBatchQuerySerializer(serializers.Serializer):
+    """Request body of the batch wells endpoint."""
+
+    viewports = serializers.ListField(
+        child=ViewportSerializer(), min_length=1, max_length=20
+    )
+
+
+class WellGeometryQuerySerializer(serializers.Serializer):
+    """Request body of the wells-within-geometry endpoint."""
+
+    geometry = serializers.JSONField()
+    buffer_km = serializers.FloatField(min_value=0, max_value=100, default=0)
+    limit = serializers.IntegerField(min_value=0, max_value=5000, default=1000)
+    fields = serializers.ListField(
+        child=serializers.ChoiceField(choices=AbandonedWellSerializer.Meta.fields),
+        default=lambda: list(AbandonedWellListSerializer.Meta.fields),
+    )
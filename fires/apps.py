@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class FiresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fires'
+
+    def ready(self):
+        # Connect signal receivers
+        from fires import signals  # noqa: F401
+        # Register the deployment checks
+        from fires import checks  # noqa: F401
@@ -0,0 +1,49 @@
+"""
+Deployment checks for state that has to be shared between processes.
+
+The web processes and the Celery workers coordinate through the cache and
+publish fire events through Redis, so per-process fallbacks only work when
+tasks run inline. These checks run with ``manage.py check`` and are logged
+when gunicorn starts (see config/gunicorn.conf.py).
+"""
+from django.conf import settings
+from django.core import checks
+
+
+TAG = "processes"
+
+
+def _per_process_cache():
+    backend = settings.CACHES["default"]["BACKEND"]
+    return backend.endswith(("locmem.LocMemCache", "dummy.DummyCache"))
+
+
+@checks.register(TAG)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.CELERY_TASK_ALWAYS_EAGER or not _per_process_cache():
+        return []
+    return [
+        checks.Warning(
+            "The default cache is local to each process, but tasks run on Celery workers.",
+            hint=(
+                "Set REDIS_URL so the fetch lock, ingest progress, response "
+                "generations and the primary pin are shared, or set "
+                "CELERY_TASK_ALWAYS_EAGER for a single-process setup."
+            ),
+            id="fires.W001",
+        )
+    ]
+
+
+@checks.register(TAG)
+def check_fire_events_channel(app_configs, **kwargs):
+    if settings.CELERY_TASK_ALWAYS_EAGER or settings.FIRE_EVENTS_REDIS_URL:
+        return []
+    return [
+        checks.Warning(
+            "Fire events are published on the Celery workers but only delivered "
+            "within the publishing process, so event stream clients get none.",
+            hint="Set FIRE_EVENTS_REDIS_URL (or REDIS_URL).",
+            id="fires.W002",
+        )
+    ]
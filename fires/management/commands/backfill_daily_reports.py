@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from fires.services.reports import backfill_daily_reports
+
+
+class Command(BaseCommand):
+    help = "Compute daily reports for a date range in a single grouped query"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to compute (YYYY-MM-DD). Defaults to 30 days ago.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to compute (YYYY-MM-DD). Defaults to today.",
+        )
+
+    def handle(self, *args, **options):
+        end_date = options["end"] or timezone.localdate()
+        start_date = options["start"] or end_date - timedelta(days=30)
+
+        if start_date > end_date:
+            raise CommandError("--start must not be after --end")
+
+        count = backfill_daily_reports(start_date, end_date)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfilled {count} daily reports ({start_date} to {end_date})"
+            )
+        )
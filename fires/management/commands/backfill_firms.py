@@ -0,0 +1,75 @@
+import glob
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fires.services.activity import refresh_activity
+from fires.services.backfill import backfill_archives
+from fires.services.generations import bump_generation
+from fires.services.ingest import GENERATION
+
+
+class Command(BaseCommand):
+    help = (
+        "Load historical detections from local FIRMS archive CSVs (unzipped). "
+        "Files already loaded are skipped and interrupted files resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", type=str, help="Directory containing the archive .csv files")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Parser processes. Defaults to the number of CPUs.",
+        )
+        parser.add_argument(
+            "--range-mb",
+            type=int,
+            default=32,
+            help="Size of the file slices handed to each parser, in MB (default 32)",
+        )
+        parser.add_argument(
+            "--skip-activity",
+            action="store_true",
+            help="Do not rebuild the fire activity buckets of the loaded days",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["directory"]
+        if not os.path.isdir(directory):
+            raise CommandError(f"Directory not found: {directory}")
+
+        paths = sorted(glob.glob(os.path.join(directory, "*.csv")))
+        if not paths:
+            raise CommandError(f"No .csv files in {directory}")
+
+        def progress(path, offset, size, read, loaded):
+            self.stdout.write(
+                f"{os.path.basename(path)}: {offset / size:.0%} "
+                f"({read} rows read, {loaded} loaded)"
+            )
+
+        self.stdout.write(f"Backfilling {len(paths)} archive files...")
+        try:
+            result = backfill_archives(
+                paths, workers=options["workers"], range_mb=options["range_mb"], progress=progress
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if result["days"] and not options["skip_activity"]:
+            self.stdout.write(f"Rebuilding activity buckets for {len(result['days'])} days...")
+            refresh_activity(result["days"])
+        bump_generation(GENERATION)
+
+        rate = result["rows_read"] / result["seconds"] * 60 if result["seconds"] else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nBackfill complete:\n"
+                f"- Files: {result['files']} ({result['skipped']} already loaded)\n"
+                f"- Archive rows read: {result['rows_read']}\n"
+                f"- Fires loaded: {result['rows_loaded']}\n"
+                f"- Throughput: {rate:,.0f} rows/minute"
+            )
+        )
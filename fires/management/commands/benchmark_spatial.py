@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from fires.models import AbandonedWell, Wildfire
+from fires.services.spatial import filter_bbox
+
+
+class Command(BaseCommand):
+    help = "Benchmark spatial_key bbox filtering against plain latitude/longitude filters"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=["wells", "fires"],
+            default="wells",
+            help="Table to query",
+        )
+        parser.add_argument(
+            "--runs", type=int, default=50, help="Random bounding boxes to query"
+        )
+        parser.add_argument(
+            "--sizes",
+            type=str,
+            default="0.1,0.5,2",
+            help="Comma-separated bbox sizes in degrees",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=1000, help="Rows fetched per list query"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        model = AbandonedWell if options["model"] == "wells" else Wildfire
+        rng = random.Random(options["seed"])
+        limit = options["limit"]
+
+        def plain(queryset, south, west, north, east):
+            return queryset.filter(
+                latitude__gte=south,
+                latitude__lte=north,
+                longitude__gte=west,
+                longitude__lte=east,
+            )
+
+        strategies = {"lat/lon": plain, "spatial_key": filter_bbox}
+
+        self.stdout.write(
+            f"{model.__name__}: {model.objects.count()} rows, {options['runs']} runs per size"
+        )
+
+        for size in [float(s) for s in options["sizes"].split(",")]:
+            # Random boxes inside Alberta, shared by every strategy
+            boxes = []
+            for _ in range(options["runs"]):
+                south = rng.uniform(49.0, 60.0 - size)
+                west = rng.uniform(-120.0, -110.0 - size)
+                boxes.append((south, west, south + size, west + size))
+
+            for name, strategy in strategies.items():
+                count_times = []
+                list_times = []
+                for box in boxes:
+                    queryset = strategy(model.objects.all(), *box)
+
+                    started = time.perf_counter()
+                    queryset.count()
+                    count_times.append(time.perf_counter() - started)
+
+                    started = time.perf_counter()
+                    list(queryset.values_list("id", "latitude", "longitude")[:limit])
+                    list_times.append(time.perf_counter() - started)
+
+                self.stdout.write(
+                    f"  {size:>5}° {name:<12} "
+                    f"count median {statistics.median(count_times) * 1000:7.2f} ms, "
+                    f"list median {statistics.median(list_times) * 1000:7.2f} ms"
+                )
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import requests
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+from fires.models import AbandonedWell, Wildfire
+
+
+# Written next to the collected files; holds the fingerprint of the sources
+STATIC_FINGERPRINT_FILE = ".static-fingerprint"
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare the app for serving in one process: migrate, collect static "
+        "files, load initial fire and wells data when missing and write the "
+        "API snapshots"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fire-days",
+            type=int,
+            default=3,
+            help="Days of FIRMS data to fetch when the fires table is empty",
+        )
+        parser.add_argument(
+            "--skip-data",
+            action="store_true",
+            help="Skip the initial fire and wells imports",
+        )
+
+    def handle(self, *args, **options):
+        self.timings = []
+        started = time.perf_counter()
+
+        self.step("Migrations", self.migrate)
+        self.step("Static files", self.collect_static)
+        if not options["skip_data"]:
+            self.step("Fire data", lambda: self.load_fires(options["fire_days"]))
+            self.step("Wells data", self.load_wells)
+        self.step("API snapshots", self.write_snapshots)
+
+        self.stdout.write("=== Bootstrap timings ===")
+        for name, elapsed in self.timings:
+            self.stdout.write(f"- {name}: {elapsed:.2f}s")
+        self.stdout.write(
+            self.style.SUCCESS(f"Bootstrap finished in {time.perf_counter() - started:.2f}s")
+        )
+
+    def step(self, name, func):
+        """Run one step, timing it. Failures are reported but do not stop startup."""
+        self.stdout.write(f"=== {name} ===")
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"{name} failed but continuing: {e}"))
+        self.timings.append((name, time.perf_counter() - started))
+
+    def migrate(self):
+        connection = connections[DEFAULT_DB_ALIAS]
+        executor = MigrationExecutor(connection)
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            self.stdout.write("No migrations to apply")
+            return
+        call_command("migrate", interactive=False, verbosity=1)
+
+    def static_fingerprint(self):
+        """Hash the name, size and mtime of every source static file."""
+        digest = hashlib.sha256()
+        for finder in finders.get_finders():
+            for path, storage in finder.list(None):
+                stat = os.stat(storage.path(path))
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def collect_static(self):
+        fingerprint_path = os.path.join(settings.STATIC_ROOT, STATIC_FINGERPRINT_FILE)
+        manifest_path = os.path.join(settings.STATIC_ROOT, "staticfiles.json")
+        fingerprint = self.static_fingerprint()
+
+        try:
+            with open(fingerprint_path) as f:
+                previous = f.read().strip()
+        except OSError:
+            previous = None
+
+        if previous == fingerprint and os.path.exists(manifest_path):
+            self.stdout.write("Static files unchanged, skipping collectstatic")
+            return
+
+        call_command("collectstatic", interactive=False, verbosity=0)
+        with open(fingerprint_path, "w") as f:
+            f.write(fingerprint)
+        self.stdout.write("Collected static files")
+
+    def load_fires(self, days):
+        if Wildfire.objects.exists():
+            self.stdout.write("Fires present, skipping initial import")
+            return
+        self.stdout.write("No fires found, importing initial data")
+        call_command("fetch_firms_data", days=days)
+
+    def load_wells(self):
+        if AbandonedWell.objects.exists():
+            self.stdout.write("Wells present, skipping initial import")
+            return
+
+        self.stdout.write(f"No wells found, downloading {settings.WELLS_SHAPEFILE_URL}")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = os.path.join(temp_dir, "ABNDWells_SHP.zip")
+            with requests.get(settings.WELLS_SHAPEFILE_URL, stream=True, timeout=300) as response:
+                response.raise_for_status()
+                with open(zip_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        f.write(chunk)
+
+            # geopandas is only imported by this command, so it loads only here
+            call_command("import_abandoned_wells", zip_path)
+
+    def write_snapshots(self):
+        from fires.services.snapshots import write_snapshots
+
+        # Written by this container, so they exist even when the workers
+        # write theirs to another host's SNAPSHOT_DIR
+        manifest = write_snapshots()
+        if manifest is None:
+            self.stdout.write("SNAPSHOT_DIR is empty, snapshots are disabled")
+        else:
+            self.stdout.write(f"Wrote {len(manifest['snapshots'])} snapshots")
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from fires.services.firms_services import FIRMSService
+from fires.services.ingest import run_post_ingest, save_fire_detections
 from fires.models import Wildfire
 import logging
 
@@ -55,41 +56,19 @@ class Command(BaseCommand):
         )
 
         # Transform and save data
-        created_count = 0
-        updated_count = 0
-        error_count = 0
+        result = save_fire_detections(service, firms_data)
 
-        for fire_data in firms_data:
-            transformed = service.transform_to_wildfire_model(fire_data)
-
-            if not transformed:
-                error_count += 1
-                continue
-
-            try:
-                # Use update_or_create to avoid duplicates
-                wildfire, created = Wildfire.objects.update_or_create(
-                    fire_id=transformed["fire_id"], defaults=transformed
-                )
-
-                if created:
-                    created_count += 1
-                    self.stdout.write(f"Created: {wildfire.fire_id}")
-                else:
-                    updated_count += 1
-                    self.stdout.write(f"Updated: {wildfire.fire_id}")
-
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Error saving fire {transformed.get('fire_id')}: {e}")
+        # Update exposures and other derived data for what changed
+        run_post_ingest([result])
 
         # Summary
         self.stdout.write(
             self.style.SUCCESS(
                 f"\nSummary:\n"
-                f"- Created: {created_count} new fires\n"
-                f"- Updated: {updated_count} existing fires\n"
-                f"- Errors: {error_count}\n"
+                f"- Created: {result['created']} new fires\n"
+                f"- Updated: {result['updated']} existing fires\n"
+                f"- Unchanged: {result['unchanged']} existing fires\n"
+                f"- Errors: {result['errors']}\n"
                 f"- Total active fires in DB: {Wildfire.objects.filter(status='ACTIVE').count()}"
             )
         )
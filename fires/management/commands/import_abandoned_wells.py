@@ -1,10 +1,10 @@
 import os
 import zipfile
 import tempfile
-import geopandas as gpd
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from fires.models import AbandonedWell
+from fires.signals import wells_changed
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,24 +20,35 @@ class Command(BaseCommand):
         parser.add_argument(
             "--clear",
             action="store_true",
-            help="Clear existing well data before importing",
+            help=(
+                "Rewrite every stored well from the shapefile, not only the changed "
+                "ones (wells missing from it are removed either way)"
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the diff against the database without writing it",
         )
 
     def handle(self, *args, **options):
+        # Heavy geo/dataframe libraries are only loaded when an import runs
+        import geopandas as gpd
+        from fires.services.well_import import (
+            apply_well_diff,
+            build_well_frame,
+            diff_wells,
+            existing_well_frame,
+        )
+
         shapefile_path = options["shapefile_path"]
         clear_existing = options["clear"]
+        dry_run = options["dry_run"]
 
         if not os.path.exists(shapefile_path):
             self.stdout.write(self.style.ERROR(f"File not found: {shapefile_path}"))
             return
 
-        # Clear existing data if requested
-        if clear_existing:
-            deleted_count = AbandonedWell.objects.all().delete()[0]
-            self.stdout.write(
-                self.style.WARNING(f"Cleared {deleted_count} existing well records")
-            )
-
         # Extract and process shapefile
         with tempfile.TemporaryDirectory() as temp_dir:
             self.stdout.write("Extracting shapefile...")
@@ -66,76 +77,51 @@ class Command(BaseCommand):
                 self.stdout.write("Converting coordinates to WGS84...")
                 gdf = gdf.to_crs("EPSG:4326")
 
-            # Process and save wells
+            # Build model fields for every well and diff against the database
             self.stdout.write(f"Processing {len(gdf)} wells...")
-            created_count = 0
-            updated_count = 0
-            error_count = 0
+            frame, error_count = build_well_frame(gdf)
+            existing = existing_well_frame()
+            if clear_existing:
+                # Forget the stored hashes so every well that is still
+                # published counts as changed; the rest are removed in the
+                # same transaction and reported like any other removal
+                existing["content_hash"] = ""
+            new, changed, removed = diff_wells(frame, existing)
+            unchanged_count = len(frame) - len(new) - len(changed)
+
+            self.stdout.write(
+                f"Diff: {len(new)} new, {len(changed)} changed, "
+                f"{len(removed)} removed, {unchanged_count} unchanged"
+            )
 
+            if dry_run:
+                self.stdout.write(self.style.WARNING("Dry run, no changes written"))
+                return
+
+            # Write only the delta
             with transaction.atomic():
-                for idx, row in gdf.iterrows():
-                    try:
-                        # Extract coordinates
-                        geom = row.geometry
-                        if geom is None:
-                            error_count += 1
-                            continue
-
-                        lon = geom.x
-                        lat = geom.y
-
-                        # Map shapefile fields to model fields
-                        # Adjust these based on actual shapefile columns
-                        well_data = {
-                            "well_id": str(row.get("WELL_ID", f"UNK-{idx}")),
-                            "license_number": str(row.get("LICENCE_NO", "")),
-                            "well_name": str(row.get("WELL_NAME", "")),
-                            "latitude": lat,
-                            "longitude": lon,
-                            "well_type": str(row.get("WELL_TYPE", "")),
-                            "status": "ABANDONED",
-                            "licensee": str(row.get("LICENSEE", "")),
-                            "surface_location": str(row.get("SURFACE_LO", "")),
-                            "ground_elevation": (
-                                float(row.get("GROUND_ELE", 0))
-                                if row.get("GROUND_ELE")
-                                else None
-                            ),
-                            "total_depth": (
-                                float(row.get("TOTAL_DEPT", 0))
-                                if row.get("TOTAL_DEPT")
-                                else None
-                            ),
-                        }
-
-                        # Remove empty strings
-                        well_data = {k: v for k, v in well_data.items() if v != ""}
-
-                        # Create or update well
-                        well, created = AbandonedWell.objects.update_or_create(
-                            well_id=well_data["well_id"], defaults=well_data
-                        )
-
-                        if created:
-                            created_count += 1
-                        else:
-                            updated_count += 1
-
-                        if (created_count + updated_count) % 1000 == 0:
-                            self.stdout.write(
-                                f"Progress: {created_count + updated_count} wells processed..."
-                            )
-
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"Error processing well at index {idx}: {e}")
+                apply_well_diff(new, changed, removed)
+
+                # Tell caches and indexes which wells changed once committed
+                created_ids = new["well_id"].tolist()
+                updated_ids = changed["well_id"].tolist()
+                transaction.on_commit(
+                    lambda: wells_changed.send(
+                        sender=AbandonedWell,
+                        created=created_ids,
+                        updated=updated_ids,
+                        removed=removed,
+                    )
+                )
 
             # Summary
             self.stdout.write(
                 self.style.SUCCESS(
                     f"\nImport complete:\n"
-                    f"- Created: {created_count} new wells\n"
-                    f"- Updated: {updated_count} existing wells\n"
+                    f"- Created: {len(new)} new wells\n"
+                    f"- Updated: {len(changed)} changed wells\n"
+                    f"- Removed: {len(removed)} wells no longer published\n"
+                    f"- Unchanged: {unchanged_count} wells\n"
                     f"- Errors: {error_count}\n"
                     f"- Total wells in database: {AbandonedWell.objects.count()}"
                 )
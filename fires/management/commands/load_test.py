@@ -0,0 +1,174 @@
+import json
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fires.services.load_replay import (
+    FirmsStubServer,
+    Recorder,
+    compare,
+    ingest_loop,
+    read_trace,
+    replay,
+    same_workload,
+    synthetic_sessions,
+    write_trace,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay map sessions (pan/zoom sequences) against a running server, "
+        "optionally with ingestion from a local FIRMS stub, and report latency "
+        "percentiles and throughput per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url", default="http://127.0.0.1:8000", help="Server to test"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=20, help="Sessions replayed at once"
+        )
+        parser.add_argument(
+            "--sessions", type=int, default=50, help="Synthetic sessions to generate"
+        )
+        parser.add_argument(
+            "--steps", type=int, default=20, help="Pan/zoom moves per synthetic session"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--trace", help="Replay sessions from this JSON lines file instead of generating them"
+        )
+        parser.add_argument(
+            "--record", help="Write the sessions that are replayed to this JSON lines file"
+        )
+        parser.add_argument(
+            "--think-scale",
+            type=float,
+            default=0.0,
+            help="Multiplier for the pauses between steps (0 replays back to back, 1 at user pace)",
+        )
+        parser.add_argument(
+            "--ingest-every",
+            type=float,
+            default=0,
+            help="Seconds between ingestions from the local FIRMS stub during the run (0 disables)",
+        )
+        parser.add_argument(
+            "--stub-detections", type=int, default=500, help="Detections per FIRMS stub response"
+        )
+        parser.add_argument("--output", help="Write the JSON summary to this file")
+        parser.add_argument(
+            "--save-baseline", help="Save the summary as a baseline for later runs"
+        )
+        parser.add_argument(
+            "--baseline", help="Compare against this baseline and fail on regressions"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed p95 growth / throughput drop against the baseline (default 0.2)",
+        )
+        parser.add_argument(
+            "--slack-ms",
+            type=float,
+            default=5.0,
+            help="Extra p95 milliseconds allowed per endpoint, for noise on fast endpoints",
+        )
+
+    def handle(self, *args, **options):
+        if options["trace"]:
+            sessions = read_trace(options["trace"])
+            source = options["trace"]
+        else:
+            sessions = synthetic_sessions(options["sessions"], options["steps"], options["seed"])
+            source = f"synthetic seed={options['seed']} sessions={options['sessions']} steps={options['steps']}"
+        if not sessions:
+            raise CommandError("No sessions to replay")
+        if options["record"]:
+            write_trace(options["record"], sessions)
+
+        recorder = Recorder()
+        stop = threading.Event()
+        stub = None
+        ingester = None
+        if options["ingest_every"]:
+            stub = FirmsStubServer(detections=options["stub_detections"], seed=options["seed"])
+            stub.__enter__()
+            ingester = threading.Thread(
+                target=ingest_loop,
+                args=(stub, options["ingest_every"], stop, recorder),
+                daemon=True,
+            )
+            ingester.start()
+            self.stdout.write(f"FIRMS stub at {stub.base_url}")
+
+        steps = sum(len(session) for session in sessions)
+        self.stdout.write(
+            f"Replaying {len(sessions)} sessions ({steps} requests) from {source} "
+            f"at concurrency {options['concurrency']}..."
+        )
+        started = time.perf_counter()
+        try:
+            replay(
+                options["base_url"],
+                sessions,
+                options["concurrency"],
+                think_scale=options["think_scale"],
+                recorder=recorder,
+            )
+        finally:
+            stop.set()
+            if ingester:
+                ingester.join()
+            if stub:
+                stub.__exit__(None, None, None)
+        summary = recorder.summary(time.perf_counter() - started)
+        summary["workload"] = {
+            "source": source,
+            "concurrency": options["concurrency"],
+            "think_scale": options["think_scale"],
+            "ingest_every": options["ingest_every"],
+        }
+
+        self.stdout.write(
+            f"{summary['requests']} requests in {summary['duration_s']:.2f}s "
+            f"({summary['throughput']:.1f} req/s), {summary['errors']} errors"
+        )
+        for endpoint, stats in summary["endpoints"].items():
+            if stats["p50_ms"] is None:
+                self.stdout.write(f"  {endpoint:<32} all {stats['errors']} requests failed")
+                continue
+            self.stdout.write(
+                f"  {endpoint:<32} n={stats['requests']:<5} err={stats['errors']:<3} "
+                f"{stats['throughput']:7.1f} req/s  "
+                f"p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  "
+                f"p99 {stats['p99_ms']:8.1f} ms"
+            )
+
+        for path in (options["output"], options["save_baseline"]):
+            if path:
+                with open(path, "w") as f:
+                    json.dump(summary, f, indent=2)
+        if options["save_baseline"]:
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['save_baseline']}"))
+
+        if options["baseline"]:
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            if not same_workload(summary, baseline):
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Workload differs from the baseline ({baseline.get('workload')}), "
+                        f"comparison may be meaningless"
+                    )
+                )
+            problems = compare(summary, baseline, options["tolerance"], options["slack_ms"])
+            if problems:
+                raise CommandError(
+                    "Performance regressions against the baseline:\n  " + "\n  ".join(problems)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from config.profiling import HEADER, make_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed token that makes a request profiled when sent in the X-Profile header"
+
+    def handle(self, *args, **options):
+        if not settings.PROFILE_DIR:
+            self.stderr.write(self.style.WARNING("PROFILE_DIR is empty, profiling is disabled"))
+        self.stdout.write(f"{HEADER}: {make_token()}")
+        self.stderr.write(f"Valid for {settings.PROFILE_TOKEN_MAX_AGE} seconds")
@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from fires.services.activity import refresh_activity
+
+
+class Command(BaseCommand):
+    help = "Rebuild the fire activity buckets behind the time-series endpoint for a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to rebuild (YYYY-MM-DD). Defaults to 30 days ago.",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to rebuild (YYYY-MM-DD). Defaults to today.",
+        )
+
+    def handle(self, *args, **options):
+        end_date = options["end"] or timezone.localdate()
+        start_date = options["start"] or end_date - timedelta(days=30)
+
+        if start_date > end_date:
+            raise CommandError("--start must not be after --end")
+
+        days = [start_date + timedelta(days=n) for n in range((end_date - start_date).days + 1)]
+        count = refresh_activity(days)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {count} activity buckets ({start_date} to {end_date})"
+            )
+        )
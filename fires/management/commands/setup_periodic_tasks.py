@@ -15,6 +15,18 @@ class Command(BaseCommand):
             period=IntervalSchedule.HOURS,
         )
 
+        # Every 5 minutes
+        five_minute_schedule, _ = IntervalSchedule.objects.get_or_create(
+            every=5,
+            period=IntervalSchedule.MINUTES,
+        )
+
+        # Every hour
+        hourly_schedule, _ = IntervalSchedule.objects.get_or_create(
+            every=1,
+            period=IntervalSchedule.HOURS,
+        )
+
         # Daily at 2 AM Mountain Time
         daily_schedule, _ = CrontabSchedule.objects.get_or_create(
             minute=0,
@@ -48,6 +60,28 @@ class Command(BaseCommand):
             },
         )
 
+        # Age fires that are no longer detected every hour
+        lifecycle_task, created = PeriodicTask.objects.update_or_create(
+            name="Update fire lifecycle",
+            defaults={
+                "task": "update_fire_lifecycle",
+                "interval": hourly_schedule,
+                "enabled": True,
+                "kwargs": json.dumps({}),
+            },
+        )
+
+        # Catch well changes that did not rebuild the well arrays
+        well_arrays_task, created = PeriodicTask.objects.update_or_create(
+            name="Refresh well arrays",
+            defaults={
+                "task": "refresh_well_arrays",
+                "interval": five_minute_schedule,
+                "enabled": True,
+                "kwargs": json.dumps({}),
+            },
+        )
+
         # Cleanup old fires daily
         cleanup_task, created = PeriodicTask.objects.update_or_create(
             name="Cleanup old fires",
@@ -74,6 +108,8 @@ class Command(BaseCommand):
             self.style.SUCCESS(
                 f"Successfully set up periodic tasks:\n"
                 f"- Fetch fires: every 3 hours\n"
+                f"- Update fire lifecycle: every hour\n"
+                f"- Refresh well arrays: every 5 minutes\n"
                 f"- Cleanup old fires: daily at 2 AM MT\n"
                 f"- Generate report: daily at 8 AM MT"
             )
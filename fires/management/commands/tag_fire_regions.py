@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from fires.models import Wildfire
+from fires.services.activity import refresh_activity
+from fires.services.regions import load_regions, tag_regions
+
+
+class Command(BaseCommand):
+    help = (
+        "Tag stored fires with the region they fall in, after adding regions "
+        "or changing FIRE_REGIONS_FILE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50000,
+            help="Fires read per batch (default 50000)",
+        )
+
+    def handle(self, *args, **options):
+        # Every defined region, not just the ingested ones
+        regions = load_regions()
+        batch_size = options["batch_size"]
+
+        changed = 0
+        days = set()
+        last_pk = 0
+        while True:
+            rows = list(
+                Wildfire.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "latitude", "longitude", "region", "detected_date")[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            codes = tag_regions([row[1] for row in rows], [row[2] for row in rows], regions)
+            moves = {}
+            for (pk, _, _, region, detected), code in zip(rows, codes.tolist()):
+                if code != region:
+                    moves.setdefault(code, []).append(pk)
+                    days.add(timezone.localdate(detected))
+
+            now = timezone.now()
+            with transaction.atomic():
+                for code, pks in moves.items():
+                    for start in range(0, len(pks), 900):
+                        changed += Wildfire.objects.filter(pk__in=pks[start : start + 900]).update(
+                            region=code, last_updated=now
+                        )
+
+        if days:
+            refresh_activity(days)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Retagged {changed} fires across {len(regions)} regions "
+                f"({', '.join(region.code for region in regions)})"
+            )
+        )
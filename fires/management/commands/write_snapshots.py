@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from fires.services.snapshots import write_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the precompressed API snapshots served under SNAPSHOT_URL "
+        "(bootstrap writes the first set, ingestions and the web rewrite them)"
+    )
+
+    def handle(self, *args, **options):
+        manifest = write_snapshots()
+        if manifest is None:
+            raise CommandError("SNAPSHOT_DIR is empty, snapshots are disabled")
+        for dataset, snapshot in manifest["snapshots"].items():
+            self.stdout.write(f"{dataset}: {snapshot['url']} ({snapshot['bytes']} bytes)")
+        self.stdout.write(self.style.SUCCESS(f"Snapshots written to {settings.SNAPSHOT_DIR}"))
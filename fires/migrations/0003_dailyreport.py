@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0002_abandonedwell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Local (Mountain Time) date the report covers.', unique=True)),
+                ('active_fires', models.IntegerField(blank=True, null=True)),
+                ('total_hectares', models.FloatField(blank=True, help_text='Hectares of active fires.', null=True)),
+                ('fires_by_status', models.JSONField(blank=True, default=dict)),
+                ('new_fires', models.IntegerField(default=0)),
+                ('new_hectares', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+    ]
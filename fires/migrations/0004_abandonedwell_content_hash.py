@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0003_dailyreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abandonedwell',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='Hash of the source attributes, used to diff re-imports.', max_length=16),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:49
+
+import numpy as np
+from django.db import migrations, models
+
+
+# Frozen copy of fires.services.spatial.morton_keys as of this migration:
+# 24 bits per axis, longitude bits in the even positions
+KEY_BITS = 24
+
+
+def _to_cells(values, low, high):
+    values = np.asarray(values, dtype=np.float64)
+    cells = np.floor((values - low) / (high - low) * (1 << KEY_BITS))
+    return np.clip(cells, 0, (1 << KEY_BITS) - 1).astype(np.uint64)
+
+
+def _spread_bits(cells):
+    x = np.asarray(cells, dtype=np.uint64)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x3333333333333333)
+    x = (x | (x << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return x
+
+
+def morton_keys(latitudes, longitudes):
+    x_cells = _to_cells(longitudes, -180.0, 180.0)
+    y_cells = _to_cells(latitudes, -90.0, 90.0)
+    return (_spread_bits(x_cells) | (_spread_bits(y_cells) << np.uint64(1))).astype(np.int64)
+
+
+def backfill_spatial_keys(apps, schema_editor):
+    """Compute spatial keys for existing rows in primary-key batches."""
+    for model_name in ("Wildfire", "AbandonedWell"):
+        model = apps.get_model("fires", model_name)
+        last_pk = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "latitude", "longitude")[:5000]
+            )
+            if not rows:
+                break
+            pks, latitudes, longitudes = zip(*rows)
+            keys = morton_keys(latitudes, longitudes).tolist()
+            model.objects.bulk_update(
+                [model(pk=pk, spatial_key=key) for pk, key in zip(pks, keys)],
+                ["spatial_key"],
+                batch_size=1000,
+            )
+            last_pk = pks[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0004_abandonedwell_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='abandonedwell',
+            name='spatial_key',
+            field=models.BigIntegerField(blank=True, help_text='Z-order key of the coordinates for bbox range scans.', null=True),
+        ),
+        migrations.AddField(
+            model_name='wildfire',
+            name='spatial_key',
+            field=models.BigIntegerField(blank=True, help_text='Z-order key of the coordinates for bbox range scans.', null=True),
+        ),
+        migrations.RunPython(backfill_spatial_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='abandonedwell',
+            index=models.Index(fields=['spatial_key', 'latitude', 'longitude'], name='fires_aband_spatial_607417_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wildfire',
+            index=models.Index(fields=['spatial_key', 'latitude', 'longitude'], name='fires_wildf_spatial_fc7ed6_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0005_spatial_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FireWellExposure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('distance_km', models.FloatField(help_text='Great-circle distance from the fire to the well.')),
+                ('bearing_deg', models.FloatField(help_text='Bearing from the fire to the well, clockwise from north.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('fire', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exposures', to='fires.wildfire')),
+                ('well', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exposures', to='fires.abandonedwell')),
+            ],
+            options={
+                'ordering': ['distance_km'],
+                'indexes': [models.Index(fields=['well', 'distance_km'], name='fires_firew_well_id_d4b20f_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='firewellexposure',
+            constraint=models.UniqueConstraint(fields=('fire', 'well'), name='unique_fire_well_exposure'),
+        ),
+    ]
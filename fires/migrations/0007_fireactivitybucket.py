@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0006_firewellexposure'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FireActivityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('HOUR', 'Hour'), ('DAY', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField(help_text='Start of the hour, or of the local (Mountain Time) day.')),
+                ('cell_row', models.IntegerField(help_text='Latitude cell index on the FIRE_ACTIVITY_CELL_DEGREES grid.')),
+                ('cell_column', models.IntegerField(help_text='Longitude cell index on the FIRE_ACTIVITY_CELL_DEGREES grid.')),
+                ('detections', models.IntegerField(default=0)),
+                ('hectares', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['granularity', 'bucket_start'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='fireactivitybucket',
+            constraint=models.UniqueConstraint(fields=('granularity', 'bucket_start', 'cell_row', 'cell_column'), name='unique_fire_activity_bucket'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0007_fireactivitybucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FireIncident',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('CONTAINED', 'Contained'), ('UNDER_CONTROL', 'Under Control'), ('OUT', 'Out')], default='ACTIVE', max_length=50)),
+                ('first_detected', models.DateTimeField()),
+                ('last_detected', models.DateTimeField()),
+                ('detection_count', models.IntegerField(default=0)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('south', models.FloatField()),
+                ('west', models.FloatField()),
+                ('north', models.FloatField()),
+                ('east', models.FloatField()),
+                ('area_hectares', models.FloatField(default=0, help_text='Area of the estimated perimeter.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-last_detected'],
+            },
+        ),
+        migrations.AddField(
+            model_name='wildfire',
+            name='scan_km',
+            field=models.FloatField(blank=True, help_text='Along-scan size of the detection pixel in km.', null=True),
+        ),
+        migrations.AddField(
+            model_name='wildfire',
+            name='track_km',
+            field=models.FloatField(blank=True, help_text='Along-track size of the detection pixel in km.', null=True),
+        ),
+        migrations.CreateModel(
+            name='FirePerimeter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_zoom', models.PositiveSmallIntegerField(help_text='Smallest map zoom this version is served at.')),
+                ('tolerance_km', models.FloatField(help_text='Simplification tolerance used.')),
+                ('geometry', models.JSONField(help_text='GeoJSON polygon or multipolygon.')),
+                ('vertex_count', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='perimeters', to='fires.fireincident')),
+            ],
+            options={
+                'ordering': ['incident', '-min_zoom'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='fireincident',
+            index=models.Index(fields=['status', 'last_detected'], name='fires_firei_status_548109_idx'),
+        ),
+        migrations.AddField(
+            model_name='wildfire',
+            name='incident',
+            field=models.ForeignKey(blank=True, help_text='Incident this detection was clustered into.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='detections', to='fires.fireincident'),
+        ),
+        migrations.AddConstraint(
+            model_name='fireperimeter',
+            constraint=models.UniqueConstraint(fields=('incident', 'min_zoom'), name='unique_fire_perimeter_zoom'),
+        ),
+    ]
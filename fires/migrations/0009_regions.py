@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0008_fire_incidents'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='fireactivitybucket',
+            name='unique_fire_activity_bucket',
+        ),
+        migrations.AddField(
+            model_name='fireactivitybucket',
+            name='region',
+            field=models.CharField(blank=True, help_text='Region code of the detections counted.', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='wildfire',
+            name='region',
+            field=models.CharField(blank=True, db_index=True, help_text='Code of the region (province) the detection falls in.', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='fireactivitybucket',
+            constraint=models.UniqueConstraint(fields=('granularity', 'bucket_start', 'region', 'cell_row', 'cell_column'), name='unique_fire_activity_bucket'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0009_regions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='abandonedwell',
+            name='license_number',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='abandonedwell',
+            name='licensee',
+            field=models.CharField(blank=True, db_index=True, max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='wildfire',
+            index=models.Index(fields=['detected_date', 'id'], name='fires_wildf_detecte_e4c719_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:37
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fires', '0010_admin_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WildfireTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fire_id', models.CharField(max_length=100)),
+                ('region', models.CharField(blank=True, max_length=10)),
+                ('deleted_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='wildfire',
+            index=models.Index(fields=['last_updated', 'id'], name='fires_wildf_last_up_f5ce0e_idx'),
+        ),
+    ]
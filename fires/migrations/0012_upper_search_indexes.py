@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+# Admin search and the licensee autocomplete match case-insensitive
+# prefixes, which Django compiles to UPPER(column::text) LIKE UPPER(...) on
+# PostgreSQL. These indexes answer that; other backends do without.
+INDEXES = [
+    ("fires_abandonedwell", "well_id", "fires_aband_well_id_upper_like"),
+    ("fires_abandonedwell", "license_number", "fires_aband_licence_upper_like"),
+    ("fires_abandonedwell", "licensee", "fires_aband_licensee_upper_like"),
+    ("fires_wildfire", "fire_id", "fires_wildf_fire_id_upper_like"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, column, name in INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+            f"ON {table} (UPPER({column}::text) text_pattern_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, _, name in INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction, and keeps the
+    # tables writable while the indexes build
+    atomic = False
+
+    dependencies = [
+        ('fires', '0011_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
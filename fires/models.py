@@ -1,8 +1,86 @@
 from django.db import models
 from django.utils import timezone
 
+from fires.services.spatial import morton_key, morton_keys
 
-class Wildfire(models.Model):
+
+class SpatialQuerySet(models.QuerySet):
+    """QuerySet that keeps ``spatial_key`` in step with coordinates on bulk writes."""
+
+    def _fill_spatial_keys(self, objs):
+        if objs:
+            keys = morton_keys(
+                [obj.latitude for obj in objs], [obj.longitude for obj in objs]
+            )
+            for obj, key in zip(objs, keys.tolist()):
+                obj.spatial_key = key
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self._fill_spatial_keys(objs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = [*update_fields, "spatial_key"]
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if {"latitude", "longitude"} & set(fields):
+            self._fill_spatial_keys(objs)
+            fields = [*fields, "spatial_key"]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
+class SpatialKeyMixin:
+    """Recompute ``spatial_key`` from the coordinates whenever a row is saved."""
+
+    def save(self, *args, **kwargs):
+        self.spatial_key = morton_key(self.latitude, self.longitude)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "spatial_key"}
+        super().save(*args, **kwargs)
+
+
+FIRE_STATUS_CHOICES = [
+    ('ACTIVE', 'Active'),
+    ('CONTAINED', 'Contained'),
+    ('UNDER_CONTROL', 'Under Control'),
+    ('OUT', 'Out')
+]
+
+
+class FireIncident(models.Model):
+    """A group of nearby detections that belong to the same fire."""
+
+    status = models.CharField(max_length=50, choices=FIRE_STATUS_CHOICES, default="ACTIVE")
+    first_detected = models.DateTimeField()
+    last_detected = models.DateTimeField()
+    detection_count = models.IntegerField(default=0)
+
+    # Centroid and extent of the detections
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    south = models.FloatField()
+    west = models.FloatField()
+    north = models.FloatField()
+    east = models.FloatField()
+
+    area_hectares = models.FloatField(default=0, help_text="Area of the estimated perimeter.")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-last_detected"]
+        indexes = [
+            models.Index(fields=["status", "last_detected"]),
+        ]
+
+    def __str__(self):
+        return f"Incident {self.pk} ({self.detection_count} detections, {self.status})"
+
+
+class Wildfire(SpatialKeyMixin, models.Model):
     """Model to store wildfire incident data for Alberta, Canada."""
 
     # Fire identification
@@ -13,20 +91,27 @@ class Wildfire(models.Model):
     latitude = models.FloatField(help_text="Latitude of the wildfire incident location.")
     longitude = models.FloatField(help_text="Longitude of the wildfire incident location.")
     location_description = models.TextField(blank=True, help_text="Description of the wildfire incident location.")
+    spatial_key = models.BigIntegerField(null=True, blank=True, help_text="Z-order key of the coordinates for bbox range scans.")
+    region = models.CharField(max_length=10, blank=True, db_index=True, help_text="Code of the region (province) the detection falls in.")
 
     # Fire metrics
     size_hectares = models.FloatField(default=0, help_text="Size of the wildfire incident in hectares.")
     status = models.CharField(
         max_length=50,
-        choices=[
-            ('ACTIVE', 'Active'),
-            ('CONTAINED', 'Contained'),
-            ('UNDER_CONTROL', 'Under Control'),
-            ('OUT', 'Out')
-        ],
+        choices=FIRE_STATUS_CHOICES,
         default='ACTIVE',
         help_text="Current status of the wildfire incident."
     )
+    scan_km = models.FloatField(null=True, blank=True, help_text="Along-scan size of the detection pixel in km.")
+    track_km = models.FloatField(null=True, blank=True, help_text="Along-track size of the detection pixel in km.")
+    incident = models.ForeignKey(
+        FireIncident,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="detections",
+        help_text="Incident this detection was clustered into.",
+    )
 
     # Timestaps
     detected_date = models.DateTimeField(default=timezone.now, help_text="Date and time when the wildfire incident was detected.")
@@ -37,27 +122,52 @@ class Wildfire(models.Model):
     cause = models.CharField(max_length=100, blank=True)
     data_source = models.CharField(max_length=50, default='NASA FIRMS')
 
+    objects = SpatialQuerySet.as_manager()
+
     class Meta:
         ordering = ['-detected_date']
         indexes = [
-            models.Index(fields=['status', 'detected_date'])
+            models.Index(fields=['status', 'detected_date']),
+            # Newest-first listings and date range filters
+            models.Index(fields=['detected_date', 'id']),
+            # Covers bbox queries: key ranges plus the exact coordinate check
+            models.Index(fields=['spatial_key', 'latitude', 'longitude']),
+            # Keyset scans of the change feed
+            models.Index(fields=['last_updated', 'id']),
         ]
 
     def __str__(self):
         return f"{self.fire_id} - {self.fire_name or 'Unnamed'} ({self.status})"
 
 
-class AbandonedWell(models.Model):
+class WildfireTombstone(models.Model):
+    """A fire removed by the cleanup task, so change feed clients can drop it too."""
+
+    fire_id = models.CharField(max_length=100)
+    region = models.CharField(max_length=10, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"{self.fire_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class AbandonedWell(SpatialKeyMixin, models.Model):
     """Model to store abandoned oil/gas well data for Alberta."""
 
     # Well identification
     well_id = models.CharField(max_length=100, unique=True, db_index=True)
-    license_number = models.CharField(max_length=100, blank=True)
+    license_number = models.CharField(max_length=100, blank=True, db_index=True)
     well_name = models.CharField(max_length=200, blank=True)
 
     # Location data
     latitude = models.FloatField(db_index=True)
     longitude = models.FloatField(db_index=True)
+    spatial_key = models.BigIntegerField(
+        null=True, blank=True, help_text="Z-order key of the coordinates for bbox range scans."
+    )
 
     # Well details
     well_type = models.CharField(max_length=50, blank=True)
@@ -65,7 +175,7 @@ class AbandonedWell(models.Model):
     abandonment_date = models.DateField(null=True, blank=True)
 
     # Company info
-    licensee = models.CharField(max_length=200, blank=True)
+    licensee = models.CharField(max_length=200, blank=True, db_index=True)
 
     # Risk factors
     surface_location = models.CharField(max_length=200, blank=True)
@@ -76,13 +186,117 @@ class AbandonedWell(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     data_source = models.CharField(max_length=50, default="AER")
+    content_hash = models.CharField(
+        max_length=16, blank=True, help_text="Hash of the source attributes, used to diff re-imports."
+    )
+
+    objects = SpatialQuerySet.as_manager()
 
     class Meta:
         ordering = ["well_id"]
         indexes = [
             models.Index(fields=["latitude", "longitude"]),
             models.Index(fields=["status", "well_type"]),
+            # Covers bbox queries: key ranges plus the exact coordinate check
+            models.Index(fields=["spatial_key", "latitude", "longitude"]),
         ]
 
     def __str__(self):
         return f"{self.well_id} - {self.well_name or 'Unnamed'}"
+
+
+class DailyReport(models.Model):
+    """Daily wildfire statistics, persisted so the history can be charted."""
+
+    date = models.DateField(unique=True, help_text="Local (Mountain Time) date the report covers.")
+
+    # Snapshot of the fire table when the report was generated. Left empty for
+    # days filled in by the backfill, since past statuses are not known.
+    active_fires = models.IntegerField(null=True, blank=True)
+    total_hectares = models.FloatField(null=True, blank=True, help_text="Hectares of active fires.")
+    fires_by_status = models.JSONField(default=dict, blank=True)
+
+    # Detections made during the day
+    new_fires = models.IntegerField(default=0)
+    new_hectares = models.FloatField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"Report {self.date} ({self.new_fires} new fires)"
+
+
+class FireWellExposure(models.Model):
+    """An abandoned well within the exposure radius of a fire detection."""
+
+    fire = models.ForeignKey(Wildfire, on_delete=models.CASCADE, related_name="exposures")
+    well = models.ForeignKey(AbandonedWell, on_delete=models.CASCADE, related_name="exposures")
+    distance_km = models.FloatField(help_text="Great-circle distance from the fire to the well.")
+    bearing_deg = models.FloatField(help_text="Bearing from the fire to the well, clockwise from north.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["distance_km"]
+        constraints = [
+            models.UniqueConstraint(fields=["fire", "well"], name="unique_fire_well_exposure"),
+        ]
+        indexes = [
+            models.Index(fields=["well", "distance_km"]),
+        ]
+
+    def __str__(self):
+        return f"{self.fire_id} -> {self.well_id} ({self.distance_km:.1f} km)"
+
+
+class FireActivityBucket(models.Model):
+    """Detections and hectares for one time bucket and grid cell, kept up to date by ingestion."""
+
+    GRANULARITY_CHOICES = [
+        ("HOUR", "Hour"),
+        ("DAY", "Day"),
+    ]
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField(help_text="Start of the hour, or of the local (Mountain Time) day.")
+    cell_row = models.IntegerField(help_text="Latitude cell index on the FIRE_ACTIVITY_CELL_DEGREES grid.")
+    cell_column = models.IntegerField(help_text="Longitude cell index on the FIRE_ACTIVITY_CELL_DEGREES grid.")
+    region = models.CharField(max_length=10, blank=True, help_text="Region code of the detections counted.")
+    detections = models.IntegerField(default=0)
+    hectares = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["granularity", "bucket_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["granularity", "bucket_start", "region", "cell_row", "cell_column"],
+                name="unique_fire_activity_bucket",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start} ({self.cell_row}, {self.cell_column}): {self.detections}"
+
+
+class FirePerimeter(models.Model):
+    """Estimated perimeter of an incident, simplified for one range of zoom levels."""
+
+    incident = models.ForeignKey(FireIncident, on_delete=models.CASCADE, related_name="perimeters")
+    min_zoom = models.PositiveSmallIntegerField(help_text="Smallest map zoom this version is served at.")
+    tolerance_km = models.FloatField(help_text="Simplification tolerance used.")
+    geometry = models.JSONField(help_text="GeoJSON polygon or multipolygon.")
+    vertex_count = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["incident", "-min_zoom"]
+        constraints = [
+            models.UniqueConstraint(fields=["incident", "min_zoom"], name="unique_fire_perimeter_zoom"),
+        ]
+
+    def __str__(self):
+        return f"Perimeter of incident {self.incident_id} from zoom {self.min_zoom} ({self.vertex_count} vertices)"
@@ -0,0 +1,138 @@
+from datetime import date, timedelta
+import logging
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from fires.models import FireActivityBucket, Wildfire
+from fires.services.generations import bump_generation
+from fires.services.reports import day_bounds
+
+
+logger = logging.getLogger(__name__)
+
+# Generation name bumped whenever buckets change
+GENERATION = "fire-activity"
+
+GRANULARITIES = ("HOUR", "DAY")
+
+
+def cell_index(value):
+    """Index of the grid cell containing a latitude or longitude."""
+    return math.floor(value / settings.FIRE_ACTIVITY_CELL_DEGREES)
+
+
+def _hour_start(detected):
+    return detected.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def refresh_activity(days):
+    """
+    Recompute the activity buckets of the given local days from the fire table.
+
+    Each day is rebuilt from its detections in one query, so updates to
+    sizes or positions are reflected and re-running is harmless. Days not
+    listed are left untouched.
+
+    Args:
+        days (iterable): ``datetime.date`` or ISO date strings.
+
+    Returns:
+        int: Number of buckets written.
+    """
+    written = 0
+    for day in sorted({date.fromisoformat(str(day)) for day in days}):
+        start, end = day_bounds(day)
+        rows = Wildfire.objects.filter(detected_date__gte=start, detected_date__lt=end).values_list(
+            "detected_date", "latitude", "longitude", "region", "size_hectares"
+        )
+
+        totals = {}
+        for detected, lat, lon, region, hectares in rows.iterator(chunk_size=5000):
+            cell = (region, cell_index(lat), cell_index(lon))
+            for key in (("HOUR", _hour_start(detected), *cell), ("DAY", start, *cell)):
+                bucket = totals.setdefault(key, [0, 0.0])
+                bucket[0] += 1
+                bucket[1] += hectares or 0
+
+        buckets = [
+            FireActivityBucket(
+                granularity=granularity,
+                bucket_start=bucket_start,
+                region=region,
+                cell_row=row,
+                cell_column=column,
+                detections=detections,
+                hectares=hectares,
+            )
+            for (granularity, bucket_start, region, row, column), (detections, hectares) in totals.items()
+        ]
+        with transaction.atomic():
+            FireActivityBucket.objects.filter(bucket_start__gte=start, bucket_start__lt=end).delete()
+            FireActivityBucket.objects.bulk_create(buckets, batch_size=1000)
+        written += len(buckets)
+
+    bump_generation(GENERATION)
+    logger.info(f"Refreshed {written} fire activity buckets")
+    return written
+
+
+def activity_series(granularity, start_date, end_date, bbox=None, region=None):
+    """
+    Detections and hectares per bucket between two local dates (inclusive),
+    optionally limited to one region.
+
+    The bbox is matched on FIRE_ACTIVITY_CELL_DEGREES cells, so cells that
+    overlap its edges are counted whole. Buckets without detections are
+    included with zeros so the series is continuous.
+    """
+    start, _ = day_bounds(start_date)
+    _, end = day_bounds(end_date)
+
+    buckets = FireActivityBucket.objects.filter(
+        granularity=granularity, bucket_start__gte=start, bucket_start__lt=end
+    )
+    if bbox:
+        south, west, north, east = bbox
+        buckets = buckets.filter(
+            cell_row__gte=cell_index(south),
+            cell_row__lte=cell_index(north),
+            cell_column__gte=cell_index(west),
+            cell_column__lte=cell_index(east),
+        )
+    if region:
+        buckets = buckets.filter(region=region)
+
+    totals = {
+        row["bucket_start"]: row
+        for row in buckets.order_by()
+        .values("bucket_start")
+        .annotate(detections=Sum("detections"), hectares=Sum("hectares"))
+    }
+
+    if granularity == "HOUR":
+        starts = []
+        current = _hour_start(start)
+        while current < end:
+            starts.append(current)
+            current += timedelta(hours=1)
+    else:
+        starts = [
+            day_bounds(start_date + timedelta(days=offset))[0]
+            for offset in range((end_date - start_date).days + 1)
+        ]
+
+    series = []
+    for bucket_start in starts:
+        row = totals.get(bucket_start, {})
+        series.append(
+            {
+                "bucket": bucket_start,
+                "detections": row.get("detections", 0),
+                "hectares": round(row.get("hectares") or 0, 2),
+            }
+        )
+    return series
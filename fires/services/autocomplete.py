@@ -0,0 +1,119 @@
+"""
+Prefix autocomplete over well licensees and licence numbers.
+
+Both fields are served from the well arrays snapshot: licensee names are
+its dictionary-encoding labels, and licence numbers are stored there as a
+sorted array of distinct values with their well counts. A prefix is a
+contiguous run of a sorted array, found with two binary searches, so a
+lookup costs the same however many wells there are. The indexes follow
+the snapshot, which is rebuilt whenever the wells change.
+"""
+import logging
+import threading
+
+import numpy as np
+from django.db.models import Count
+
+from fires.models import AbandonedWell
+from fires.services.well_arrays import get_well_arrays
+
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("licensee", "license_number")
+
+MAX_LIMIT = 50
+
+# Sorts after every character, so prefix + SENTINEL bounds the prefix run
+SENTINEL = "\U0010ffff"
+
+
+class PrefixIndex:
+    """Sorted upper-case keys with the display value and well count of each."""
+
+    def __init__(self, keys, values, counts):
+        self.keys = keys
+        self.values = values
+        self.counts = counts
+
+    @classmethod
+    def from_labels(cls, labels, codes):
+        """Index dictionary-encoding labels, counting the rows using each code."""
+        labels = np.array(labels, dtype=str)
+        counts = np.bincount(codes, minlength=len(labels))
+        keys = np.char.upper(labels)
+        order = np.argsort(keys, kind="stable")
+        return cls(keys[order], labels[order], counts[order])
+
+    def search(self, prefix, limit):
+        """Entries starting with ``prefix``, most wells first."""
+        prefix = prefix.upper()
+        start = np.searchsorted(self.keys, prefix, side="left")
+        end = np.searchsorted(self.keys, prefix + SENTINEL, side="left")
+        if start == end:
+            return []
+
+        counts = np.asarray(self.counts[start:end])
+        if len(counts) > limit:
+            top = np.argpartition(-counts, limit - 1)[:limit]
+        else:
+            top = np.arange(len(counts))
+        # Most wells first, then alphabetical
+        top = top[np.lexsort((top, -counts[top]))]
+        return [
+            {"value": str(self.values[start + i]), "well_count": int(counts[i])}
+            for i in top.tolist()
+        ]
+
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def _snapshot_index(arrays, field):
+    key = (arrays.version, field)
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            if field == "licensee":
+                index = PrefixIndex.from_labels(arrays.labels["licensee"], arrays.licensee)
+            elif arrays.license_keys is not None:
+                # Stored upper-case, so keys and display values are the same array
+                index = PrefixIndex(arrays.license_keys, arrays.license_keys, arrays.license_counts)
+            else:
+                # Snapshot from before licence numbers were stored
+                return None
+            for stale in [k for k in _indexes if k[0] != arrays.version]:
+                del _indexes[stale]
+            _indexes[key] = index
+    return index
+
+
+def _database_matches(field, prefix, limit):
+    rows = (
+        AbandonedWell.objects.filter(**{f"{field}__istartswith": prefix})
+        .values(field)
+        .annotate(well_count=Count("id"))
+        .order_by("-well_count", field)[:limit]
+    )
+    return [{"value": row[field], "well_count": row["well_count"]} for row in rows]
+
+
+def autocomplete(field, prefix, limit=10):
+    """
+    Licensees or licence numbers starting with ``prefix`` (case-insensitive).
+
+    Returns:
+        list: Up to ``limit`` dicts with the value and its number of wells,
+        most wells first. Falls back to a case-insensitive prefix query
+        when no snapshot is loaded.
+    """
+    limit = min(max(limit, 1), MAX_LIMIT)
+    arrays = get_well_arrays()
+    index = _snapshot_index(arrays, field) if arrays is not None else None
+    if index is None:
+        return _database_matches(field, prefix, limit)
+    return index.search(prefix, limit)
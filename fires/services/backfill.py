@@ -0,0 +1,346 @@
+"""
+Bulk loading of local FIRMS archive CSVs into the fire table.
+
+Archive files (the yearly country or region downloads, unzipped) are split
+into byte ranges that end on line boundaries. A process pool parses each
+range with pandas, keeps the rows inside the active regions and turns them
+into fire table rows with vectorized operations. The parent process inserts
+the finished ranges in file order with a multi-row INSERT (COPY on
+PostgreSQL), skipping fire_ids that already exist. Archive rows are dated
+by their detection, including last_updated, so clients of the change feed
+do not download a whole backfill as new changes.
+
+Only a bounded number of ranges are in flight at once, so memory does not
+grow with the file size. After every inserted range the next byte offset
+is written to a small state file, so an interrupted run resumes where it
+stopped.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import io
+import json
+import logging
+import os
+import time
+
+import django
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from fires.models import Wildfire
+from fires.services.regions import load_regions, tag_regions
+from fires.services.spatial import morton_keys
+
+
+logger = logging.getLogger(__name__)
+
+# Stored on archive rows; cleanup keeps them (see FIRE_CLEANUP_KEEP_SOURCES)
+ARCHIVE_SOURCE = "NASA_FIRMS_ARCHIVE"
+
+# Same nominal pixel area as FIRMSService.transform_to_wildfire_model
+PIXEL_SIZE_HECTARES = 0.14
+
+ARCHIVE_COLUMNS = ["latitude", "longitude", "scan", "track", "acq_date", "acq_time", "confidence"]
+
+# Fire table fields the loader leaves empty: clustering assigns incidents later
+LEFT_EMPTY = {"incident"}
+
+# Fire table fields written by the loader, in insert order
+INSERT_FIELDS = [
+    field.name
+    for field in Wildfire._meta.concrete_fields
+    if not field.primary_key and field.name not in LEFT_EMPTY
+]
+INSERT_COLUMNS = [Wildfire._meta.get_field(name).column for name in INSERT_FIELDS]
+
+
+def ordered_rows(values):
+    """
+    Zip per-field columns into row tuples in INSERT_FIELDS order.
+
+    Raises:
+        ValueError: If the values do not cover exactly INSERT_FIELDS, e.g.
+        after a field was added to Wildfire without updating the loader.
+    """
+    missing = set(INSERT_FIELDS) - set(values)
+    unknown = set(values) - set(INSERT_FIELDS)
+    if missing or unknown:
+        raise ValueError(
+            f"Archive rows do not match the fire table: missing {sorted(missing)}, "
+            f"unknown {sorted(unknown)}"
+        )
+    return list(zip(*(np.asarray(values[name]).tolist() for name in INSERT_FIELDS)))
+
+
+def split_ranges(path, range_bytes, start=None):
+    """
+    Byte ranges of a CSV file that each end on a line boundary.
+
+    Returns:
+        tuple: (header line, list of (start, end) offsets after the header).
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        offset = max(start or 0, f.tell())
+        ranges = []
+        while offset < size:
+            f.seek(min(offset + range_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((offset, end))
+            offset = end
+    return header.decode("utf-8").strip(), ranges
+
+
+def transform_frame(frame, time_zone):
+    """
+    Turn raw archive rows into fire table rows, vectorized.
+
+    Mirrors FIRMSService.transform_to_wildfire_model, including the fire_id
+    built from the raw coordinate text, so archive rows and live rows of the
+    same detection collide instead of being stored twice.
+
+    Returns:
+        tuple: (list of row tuples in INSERT_FIELDS order, set of local
+        ISO dates the rows fall on).
+    """
+    latitude = pd.to_numeric(frame["latitude"], errors="coerce")
+    longitude = pd.to_numeric(frame["longitude"], errors="coerce")
+    regions = tag_regions(latitude.to_numpy(), longitude.to_numpy())
+    inside = regions != ""
+    frame = frame[inside]
+    latitude = latitude[inside]
+    longitude = longitude[inside]
+    regions = regions[inside]
+
+    detected = pd.to_datetime(
+        frame["acq_date"] + " " + frame["acq_time"].str.zfill(4),
+        format="%Y-%m-%d %H%M",
+        errors="coerce",
+        utc=True,
+    )
+    valid = detected.notna()
+    if not valid.all():
+        frame, latitude, longitude, detected = frame[valid], latitude[valid], longitude[valid], detected[valid]
+        regions = regions[valid.to_numpy()]
+    if frame.empty:
+        return [], set()
+
+    scan = pd.to_numeric(frame["scan"], errors="coerce").fillna(1.0)
+    track = pd.to_numeric(frame["track"], errors="coerce").fillna(1.0)
+    fire_id = (
+        "FIRMS-" + frame["acq_date"] + "-" + frame["latitude"].str[:6] + "-" + frame["longitude"].str[:7]
+    )
+    fire_name = (
+        "Fire near " + latitude.map("{:.2f}".format) + "N " + longitude.abs().map("{:.2f}".format) + "W"
+    )
+    confidence = frame["confidence"] if "confidence" in frame else pd.Series("nominal", index=frame.index)
+    # Naive UTC text is what the database connections (USE_TZ, UTC) expect
+    detected_text = detected.dt.strftime("%Y-%m-%d %H:%M:%S")
+    now_text = timezone.now().astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    count = len(frame)
+
+    rows = ordered_rows(
+        {
+            "fire_id": fire_id,
+            "fire_name": fire_name,
+            "latitude": latitude,
+            "longitude": longitude,
+            "location_description": "Confidence: " + confidence,
+            "spatial_key": morton_keys(latitude.to_numpy(), longitude.to_numpy()).astype(np.int64),
+            "region": regions,
+            "size_hectares": (PIXEL_SIZE_HECTARES * scan * track).round(2),
+            "status": ["OUT"] * count,
+            "scan_km": scan,
+            "track_km": track,
+            "detected_date": detected_text,
+            # Dated by the detection, so the change feed does not replay the archive
+            "last_updated": detected_text,
+            "created_at": [now_text] * count,
+            "cause": ["Unknown"] * count,
+            "data_source": [ARCHIVE_SOURCE] * count,
+        }
+    )
+    days = set(detected.dt.tz_convert(time_zone).dt.strftime("%Y-%m-%d").unique().tolist())
+    return rows, days
+
+
+def parse_range(path, header, start, end, time_zone):
+    """Read one byte range of an archive file and transform it (runs in a worker)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    frame = pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=header.split(","),
+        usecols=lambda name: name in ARCHIVE_COLUMNS,
+        dtype=str,
+        na_filter=False,
+    )
+    rows, days = transform_frame(frame, time_zone)
+    return len(frame), rows, days
+
+
+def insert_rows(rows):
+    """
+    Insert fire rows, skipping fire_ids that already exist.
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    if not rows:
+        return 0
+    table = Wildfire._meta.db_table
+    columns = ", ".join(INSERT_COLUMNS)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            staging = f"{table}_backfill"
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {staging} "
+                f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            buffer = io.StringIO()
+            pd.DataFrame(rows).to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH CSV", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                f"ON CONFLICT (fire_id) DO NOTHING"
+            )
+            inserted = cursor.rowcount
+        else:
+            placeholders = ", ".join(["%s"] * len(INSERT_COLUMNS))
+            cursor.executemany(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT (fire_id) DO NOTHING",
+                rows,
+            )
+            inserted = cursor.rowcount
+    return inserted
+
+
+class BackfillState:
+    """Progress of one archive file, kept as JSON in FIRMS_BACKFILL_STATE_DIR."""
+
+    def __init__(self, path):
+        stat = os.stat(path)
+        # Size and mtime in the name, so a replaced file starts over
+        name = f"{os.path.basename(path)}-{stat.st_size}-{int(stat.st_mtime)}.json"
+        os.makedirs(settings.FIRMS_BACKFILL_STATE_DIR, exist_ok=True)
+        self.path = os.path.join(settings.FIRMS_BACKFILL_STATE_DIR, name)
+        self.size = stat.st_size
+        self.data = {"offset": 0, "rows_read": 0, "rows_loaded": 0, "days": []}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.data = json.load(f)
+
+    @property
+    def done(self):
+        return self.data["offset"] >= self.size
+
+    def advance(self, offset, rows_read, rows_loaded, days):
+        self.data["offset"] = offset
+        self.data["rows_read"] += rows_read
+        self.data["rows_loaded"] += rows_loaded
+        self.data["days"] = sorted(set(self.data["days"]) | days)
+        temp = f"{self.path}.tmp"
+        with open(temp, "w") as f:
+            json.dump(self.data, f)
+        os.replace(temp, self.path)
+
+
+def backfill_file(path, executor, range_bytes, in_flight, progress=None):
+    """
+    Load one archive file, resuming from its saved offset.
+
+    Returns:
+        dict: Rows read and loaded by this run, and the local days touched
+        by the whole file.
+    """
+    state = BackfillState(path)
+    if state.done:
+        return {"rows_read": 0, "rows_loaded": 0, "days": state.data["days"], "skipped": True}
+
+    header, ranges = split_ranges(path, range_bytes, start=state.data["offset"])
+    missing = set(ARCHIVE_COLUMNS[:-1]) - set(header.split(","))
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+
+    submitted = []
+    read = loaded = 0
+    next_range = 0
+
+    def submit():
+        nonlocal next_range
+        start, end = ranges[next_range]
+        submitted.append(
+            (end, executor.submit(parse_range, path, header, start, end, settings.TIME_ZONE))
+        )
+        next_range += 1
+
+    while next_range < len(ranges) and len(submitted) < in_flight:
+        submit()
+
+    # Ranges are inserted in file order so the saved offset is always safe
+    while submitted:
+        end, future = submitted.pop(0)
+        rows_read, rows, days = future.result()
+        if next_range < len(ranges):
+            submit()
+        inserted = insert_rows(rows)
+        state.advance(end, rows_read, inserted, days)
+        read += rows_read
+        loaded += inserted
+        if progress:
+            progress(path, end, state.size, read, loaded)
+
+    return {"rows_read": read, "rows_loaded": loaded, "days": state.data["days"], "skipped": False}
+
+
+def worker_pool(workers, mp_context=None):
+    """
+    Process pool for parse_range.
+
+    Workers set Django up before their first task, since this module imports
+    the models. Forked workers already inherit a configured Django, but
+    spawned ones (the default on macOS and Windows) start from scratch.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=django.setup)
+
+
+def backfill_archives(paths, workers=None, range_mb=32, progress=None):
+    """
+    Load several archive files with a shared worker pool.
+
+    Returns:
+        dict: Totals plus the sorted local days touched by the files.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    totals = {"files": 0, "skipped": 0, "rows_read": 0, "rows_loaded": 0}
+    days = set()
+
+    # Forked workers inherit the parsed regions but must not inherit open
+    # database connections
+    load_regions()
+    connections.close_all()
+    with worker_pool(workers) as executor:
+        for path in paths:
+            result = backfill_file(path, executor, range_mb * 1024 * 1024, workers * 2, progress)
+            totals["files"] += 1
+            totals["skipped"] += result["skipped"]
+            totals["rows_read"] += result["rows_read"]
+            totals["rows_loaded"] += result["rows_loaded"]
+            days.update(result["days"])
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        f"Backfilled {totals['rows_loaded']} fire rows from {totals['rows_read']} archive rows "
+        f"in {totals['files']} files in {elapsed:.1f}s"
+    )
+    return {**totals, "days": sorted(days), "seconds": elapsed}
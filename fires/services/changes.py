@@ -0,0 +1,133 @@
+"""
+Change feed of the fire table for delta sync.
+
+A cursor marks a position in two streams: fires ordered by
+(last_updated, id), and the tombstones the cleanup task leaves for the
+fires it deletes, ordered by id. Each call returns what comes after the
+cursor and the cursor to send next time, so a client that keeps its
+cursor downloads only the fires that changed since its last sync.
+
+Rows are only returned once they are FIRE_CHANGES_LAG_SECONDS old, which
+leaves writes that were in flight when a page was read time to commit
+before the cursor moves past their timestamp.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from fires.api.serializers import WildfireListSerializer
+from fires.models import Wildfire, WildfireTombstone
+
+
+MAX_LIMIT = 5000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ExpiredCursor(Exception):
+    """The cursor is older than the tombstones kept, so deletions may have been missed."""
+
+
+def _to_micros(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def encode_cursor(updated, fire_pk, tombstone_pk):
+    return f"{_to_micros(updated)}-{fire_pk}-{tombstone_pk}"
+
+
+def decode_cursor(cursor):
+    """Return (last_updated, fire pk, tombstone pk) from a cursor string."""
+    try:
+        micros, fire_pk, tombstone_pk = (int(part) for part in cursor.split("-"))
+    except ValueError:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+    return _from_micros(micros), fire_pk, tombstone_pk
+
+
+def current_cursor():
+    """Cursor from which a client follows changes made from now on."""
+    horizon = timezone.now() - timedelta(seconds=settings.FIRE_CHANGES_LAG_SECONDS)
+    last_tombstone = WildfireTombstone.objects.order_by("-id").values_list("id", flat=True).first()
+    return encode_cursor(horizon, 0, last_tombstone or 0)
+
+
+def record_tombstones(queryset):
+    """Leave a tombstone for each fire of a queryset that is about to be deleted."""
+    now = timezone.now()
+    WildfireTombstone.objects.bulk_create(
+        WildfireTombstone(fire_id=fire_id, region=region, deleted_at=now)
+        for fire_id, region in queryset.values_list("fire_id", "region").iterator()
+    )
+
+
+def prune_tombstones():
+    """Delete tombstones older than FIRE_TOMBSTONE_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.FIRE_TOMBSTONE_DAYS)
+    return WildfireTombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
+
+
+def changes_since(cursor, region=None, limit=1000):
+    """
+    Fires changed and deleted after a cursor.
+
+    Returns:
+        dict: ``created`` and ``updated`` fires (serialized like the active
+        fires list), ``deleted`` fire ids, the next ``cursor`` and
+        ``has_more``, true when a page limit was hit and the client should
+        call again straight away.
+
+    Raises:
+        InvalidCursor: The cursor could not be parsed.
+        ExpiredCursor: The cursor is older than FIRE_TOMBSTONE_DAYS.
+    """
+    limit = min(max(limit, 1), MAX_LIMIT)
+    updated_after, fire_pk, tombstone_pk = decode_cursor(cursor)
+    now = timezone.now()
+    if updated_after < now - timedelta(days=settings.FIRE_TOMBSTONE_DAYS):
+        raise ExpiredCursor("Cursor expired, reload the active fires and start a new cursor")
+    horizon = now - timedelta(seconds=settings.FIRE_CHANGES_LAG_SECONDS)
+
+    fires = Wildfire.objects.filter(last_updated__lt=horizon).filter(
+        last_updated__gte=updated_after
+    ).exclude(last_updated=updated_after, id__lte=fire_pk)
+    tombstones = WildfireTombstone.objects.filter(id__gt=tombstone_pk)
+    if region:
+        fires = fires.filter(region=region)
+        tombstones = tombstones.filter(region=region)
+
+    fields = [*WildfireListSerializer.Meta.fields, "created_at"]
+    page = list(fires.order_by("last_updated", "id").only(*fields)[:limit])
+    deleted = list(tombstones.order_by("id").values("id", "fire_id", "deleted_at")[:limit])
+    fires_more = len(page) == limit
+    deleted_more = len(deleted) == limit
+
+    # Fires created after the previous cursor are new to the client
+    created = [fire for fire in page if fire.created_at >= updated_after]
+    updated = [fire for fire in page if fire.created_at < updated_after]
+
+    if fires_more:
+        next_updated, next_pk = page[-1].last_updated, page[-1].pk
+    else:
+        # Every fire changed before the horizon has been returned
+        next_updated, next_pk = max(horizon, updated_after), 0
+    next_tombstone = deleted[-1]["id"] if deleted else tombstone_pk
+
+    return {
+        "created": WildfireListSerializer(created, many=True).data,
+        "updated": WildfireListSerializer(updated, many=True).data,
+        "deleted": [
+            {"fire_id": row["fire_id"], "deleted_at": row["deleted_at"]} for row in deleted
+        ],
+        "cursor": encode_cursor(next_updated, next_pk, next_tombstone),
+        "has_more": fires_more or deleted_more,
+    }
@@ -0,0 +1,113 @@
+import csv
+import gzip
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+def archive_path_for(prefix):
+    """
+    Build a timestamped .csv.gz path inside FIRE_ARCHIVE_DIR.
+
+    An archive asked for explicitly while FIRE_ARCHIVE_DIR is empty goes to
+    var/archive under the project directory.
+    """
+    archive_dir = settings.FIRE_ARCHIVE_DIR or os.path.join(settings.BASE_DIR, "var", "archive")
+    os.makedirs(archive_dir, exist_ok=True)
+    filename = f"{prefix}-{timezone.now():%Y%m%d-%H%M%S}.csv.gz"
+    return os.path.join(archive_dir, filename)
+
+
+def delete_in_batches(queryset, batch_size=None, pause=None, archive_path=None, before_delete=None):
+    """
+    Delete the rows of a queryset in bounded primary-key ranges.
+
+    Each batch runs in its own short transaction so readers are never blocked
+    behind one huge delete, and the collector never has to load the whole
+    result set. When nothing cascades from the model the batch is removed
+    with a raw DELETE; otherwise Django's regular delete runs per batch.
+
+    Args:
+        queryset: Rows to delete. Its filters are re-applied to every batch.
+        batch_size (int): Rows per batch. Defaults to FIRE_CLEANUP_BATCH_SIZE.
+        pause (float): Seconds to sleep between batches. Defaults to
+            FIRE_CLEANUP_PAUSE_SECONDS.
+        archive_path (str): Optional gzip CSV file the rows are exported to.
+            Each batch's rows are read before they are deleted and written
+            once its transaction has committed; the file is only created
+            when there is a row to archive.
+        before_delete (callable): Optional function called with each batch's
+            queryset inside its transaction, just before the rows go.
+
+    Returns:
+        int: Number of rows deleted from the queryset's model.
+    """
+    batch_size = batch_size or settings.FIRE_CLEANUP_BATCH_SIZE
+    if pause is None:
+        pause = settings.FIRE_CLEANUP_PAUSE_SECONDS
+
+    model = queryset.model
+    db = queryset.db
+    queryset = queryset.order_by()
+
+    # Raw deletes skip the collector, so only use them when nothing cascades
+    fast_delete = Collector(using=db).can_fast_delete(queryset)
+
+    archive = None
+    writer = None
+    fields = [field.attname for field in model._meta.concrete_fields]
+
+    deleted_count = 0
+    last_pk = None
+
+    try:
+        while True:
+            pending = queryset
+            if last_pk is not None:
+                pending = pending.filter(pk__gt=last_pk)
+            pks = list(
+                pending.order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+
+            batch = queryset.filter(pk__gte=pks[0], pk__lte=pks[-1])
+
+            with transaction.atomic(using=db):
+                rows = list(batch.values_list(*fields)) if archive_path else []
+                if before_delete:
+                    before_delete(batch)
+                if fast_delete:
+                    count = batch._raw_delete(db)
+                else:
+                    count = batch.delete()[1].get(model._meta.label, 0)
+
+            # Only rows whose delete committed go to the archive
+            if rows:
+                if writer is None:
+                    archive = gzip.open(archive_path, "wt", newline="")
+                    writer = csv.writer(archive)
+                    writer.writerow(fields)
+                writer.writerows(rows)
+
+            deleted_count += count
+            last_pk = pks[-1]
+            logger.debug(f"Deleted {count} {model._meta.label} rows up to pk {last_pk}")
+
+            if len(pks) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+    finally:
+        if archive:
+            archive.close()
+
+    return deleted_count
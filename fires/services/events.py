@@ -0,0 +1,190 @@
+"""
+Push channel for fire changes, served to clients as server-sent events.
+
+Ingestion publishes one event per run with the created and updated
+fires, and the lifecycle task one with the fires whose status it changed
+(see fires.services.lifecycle). Events go through a Redis pub/sub channel when
+FIRE_EVENTS_REDIS_URL is set, otherwise they stay in the publishing
+process (enough when ingestion runs inline, as with
+CELERY_TASK_ALWAYS_EAGER). Each ASGI worker holds a single subscription
+and fans events out to its connected clients, so idle clients cost an
+open socket and a queue, and nothing between ingestions.
+"""
+from collections import deque
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from fires.api.serializers import WildfireListSerializer
+from fires.models import Wildfire
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "fires:events"
+
+# Events kept per worker for clients reconnecting with Last-Event-ID
+BACKLOG = 20
+
+# Events a client may fall behind by before it is disconnected
+CLIENT_QUEUE_SIZE = 16
+
+FIRE_LISTS = ("created", "updated", "status_changed")
+
+
+def encode(event_id, event, data):
+    """Frame one event in the text/event-stream format."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class Event:
+    """A published event, with its wire form encoded once for all clients."""
+
+    def __init__(self, event_id, event, data):
+        self.id = event_id
+        self.event = event
+        self.data = data
+        self.text = encode(event_id, event, data)
+
+    @classmethod
+    def from_message(cls, message):
+        message = json.loads(message)
+        return cls(message["id"], message["event"], message["data"])
+
+    def for_region(self, region):
+        """Wire form keeping only the fires of one region, or None when none are left."""
+        data = dict(self.data)
+        lists = [name for name in FIRE_LISTS if name in data]
+        for name in lists:
+            data[name] = [fire for fire in data[name] if fire.get("region") == region]
+        if lists and not any(data[name] for name in lists):
+            return None
+        return encode(self.id, self.event, data)
+
+
+class EventHub:
+    """Per-process fan-out of events to the connected clients' queues."""
+
+    def __init__(self):
+        self.queues = set()
+        self.backlog = deque(maxlen=BACKLOG)
+        self.loop = None
+        self.listener = None
+
+    def subscribe(self):
+        """Register a client; must be called on the event loop serving it."""
+        self.loop = asyncio.get_running_loop()
+        if settings.FIRE_EVENTS_REDIS_URL and (self.listener is None or self.listener.done()):
+            self.listener = self.loop.create_task(self._listen())
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+
+    def since(self, event_id):
+        """Backlog events published after ``event_id``."""
+        return [event for event in self.backlog if event.id > event_id]
+
+    def deliver(self, event):
+        """Hand an event to every client. Runs on the event loop."""
+        self.backlog.append(event)
+        for queue in list(self.queues):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too far behind: end its stream, the client reconnects
+                # and catches up from the backlog
+                self.queues.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def deliver_threadsafe(self, event):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.deliver, event)
+        else:
+            self.backlog.append(event)
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.Redis.from_url(settings.FIRE_EVENTS_REDIS_URL)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.deliver(Event.from_message(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Fire events subscription lost, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+hub = EventHub()
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _redis_client():
+    global _redis
+    with _redis_lock:
+        if _redis is None:
+            import redis
+
+            _redis = redis.Redis.from_url(settings.FIRE_EVENTS_REDIS_URL)
+        return _redis
+
+
+def publish(event, data):
+    """
+    Publish an event to every connected client.
+
+    Failures are logged and swallowed: clients also poll, so a lost event
+    must never fail the ingestion that produced it.
+    """
+    message = {"id": time.time_ns(), "event": event, "data": data}
+    try:
+        if settings.FIRE_EVENTS_REDIS_URL:
+            _redis_client().publish(CHANNEL, json.dumps(message, cls=DjangoJSONEncoder))
+        else:
+            hub.deliver_threadsafe(Event(message["id"], event, data))
+    except Exception as e:
+        logger.error(f"Could not publish {event} event: {e}")
+
+
+def _serialized(pks):
+    fires = []
+    for start in range(0, len(pks), 900):
+        queryset = Wildfire.objects.filter(pk__in=pks[start : start + 900]).only(
+            *WildfireListSerializer.Meta.fields
+        )
+        fires.extend(WildfireListSerializer(queryset, many=True).data)
+    return fires
+
+
+def publish_fire_changes(created=(), updated=(), status_changed=()):
+    """Publish a ``fires`` event with the given fires (pks), unless all are empty."""
+    if not (created or updated or status_changed):
+        return
+    publish(
+        "fires",
+        {
+            "created": _serialized(sorted(set(created))),
+            "updated": _serialized(sorted(set(updated))),
+            "status_changed": _serialized(sorted(set(status_changed))),
+        },
+    )
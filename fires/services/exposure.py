@@ -0,0 +1,187 @@
+from collections import defaultdict
+import logging
+import math
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from fires.models import AbandonedWell, FireWellExposure, Wildfire
+from fires.services.spatial import bearing_deg, filter_bbox, haversine_km, radius_bbox
+
+
+logger = logging.getLogger(__name__)
+
+# Fires are grouped into tiles of this size (degrees) so each tile needs one
+# wells query instead of one per fire
+TILE_DEGREES = 0.5
+
+
+def _tile_wells(south, west, north, east):
+    """Load the pk and coordinates of the wells inside a box as arrays."""
+    rows = list(
+        filter_bbox(AbandonedWell.objects.all(), south, west, north, east)
+        .order_by()
+        .values_list("id", "latitude", "longitude")
+    )
+    if not rows:
+        return None
+    return np.array(rows, dtype=np.float64)
+
+
+def _tile_fires(south, west, north, east):
+    """Load the pk and coordinates of the fires inside a box that are not OUT."""
+    rows = list(
+        filter_bbox(Wildfire.objects.all(), south, west, north, east)
+        .exclude(status="OUT")
+        .order_by()
+        .values_list("id", "latitude", "longitude")
+    )
+    if not rows:
+        return None
+    return np.array(rows, dtype=np.float64)
+
+
+def refresh_exposures(fire_ids, radius_km=None):
+    """
+    Recompute the exposures of the given fires.
+
+    Only these fires are joined against the wells; OUT fires simply lose
+    their exposures.
+
+    Returns:
+        int: Number of exposure rows written.
+    """
+    radius_km = radius_km or settings.EXPOSURE_RADIUS_KM
+    # A batch can hit the same fire twice (FIRMS ids are rounded coordinates)
+    fire_ids = sorted(set(fire_ids))
+    if not fire_ids:
+        return 0
+
+    fires = []
+    for start in range(0, len(fire_ids), 500):
+        fires.extend(
+            Wildfire.objects.filter(pk__in=fire_ids[start : start + 500])
+            .exclude(status="OUT")
+            .order_by()
+            .values_list("id", "latitude", "longitude")
+        )
+
+    tiles = defaultdict(list)
+    for fire in fires:
+        tile = (math.floor(fire[1] / TILE_DEGREES), math.floor(fire[2] / TILE_DEGREES))
+        tiles[tile].append(fire)
+
+    exposures = []
+    for fires_in_tile in tiles.values():
+        boxes = [radius_bbox(lat, lon, radius_km) for _, lat, lon in fires_in_tile]
+        wells = _tile_wells(
+            min(box[0] for box in boxes),
+            min(box[1] for box in boxes),
+            max(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+        if wells is None:
+            continue
+
+        for fire_pk, lat, lon in fires_in_tile:
+            distances = haversine_km(lat, lon, wells[:, 1], wells[:, 2])
+            nearby = distances <= radius_km
+            if not nearby.any():
+                continue
+            bearings = bearing_deg(lat, lon, wells[nearby, 1], wells[nearby, 2])
+            for well_pk, distance, bearing in zip(
+                wells[nearby, 0].astype(np.int64).tolist(),
+                distances[nearby].tolist(),
+                bearings.tolist(),
+            ):
+                exposures.append(
+                    FireWellExposure(
+                        fire_id=fire_pk,
+                        well_id=well_pk,
+                        distance_km=round(distance, 3),
+                        bearing_deg=round(bearing, 1),
+                    )
+                )
+
+    with transaction.atomic():
+        for start in range(0, len(fire_ids), 500):
+            FireWellExposure.objects.filter(
+                fire_id__in=fire_ids[start : start + 500]
+            ).delete()
+        FireWellExposure.objects.bulk_create(exposures, batch_size=2000)
+
+    logger.info(f"Refreshed exposures for {len(fires)} fires: {len(exposures)} wells within {radius_km} km")
+    return len(exposures)
+
+
+def drop_inactive_exposures():
+    """Remove the exposures of fires that are now OUT."""
+    deleted_count = FireWellExposure.objects.filter(fire__status="OUT").delete()[0]
+    if deleted_count:
+        logger.info(f"Dropped {deleted_count} exposures of fires that are out")
+    return deleted_count
+
+
+def refresh_exposures_for_wells(well_ids, radius_km=None):
+    """
+    Recompute the exposures of the fires near the given wells (by well_id).
+
+    Fires within the radius of a well's current position, and fires it was
+    exposed to before it moved, are refreshed; no other fire can have gained
+    or lost one of these wells.
+
+    Returns:
+        int: Number of exposure rows written.
+    """
+    radius_km = radius_km or settings.EXPOSURE_RADIUS_KM
+    well_ids = sorted(set(well_ids))
+
+    wells = []
+    for start in range(0, len(well_ids), 500):
+        wells.extend(
+            AbandonedWell.objects.filter(well_id__in=well_ids[start : start + 500])
+            .order_by()
+            .values_list("id", "latitude", "longitude")
+        )
+
+    fire_ids = set()
+    for start in range(0, len(wells), 500):
+        fire_ids.update(
+            FireWellExposure.objects.filter(
+                well_id__in=[well[0] for well in wells[start : start + 500]]
+            ).values_list("fire_id", flat=True)
+        )
+
+    tiles = defaultdict(list)
+    for well in wells:
+        tile = (math.floor(well[1] / TILE_DEGREES), math.floor(well[2] / TILE_DEGREES))
+        tiles[tile].append(well)
+
+    for wells_in_tile in tiles.values():
+        boxes = [radius_bbox(lat, lon, radius_km) for _, lat, lon in wells_in_tile]
+        fires = _tile_fires(
+            min(box[0] for box in boxes),
+            min(box[1] for box in boxes),
+            max(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+        if fires is None:
+            continue
+
+        tile_wells = np.array(wells_in_tile, dtype=np.float64)
+        for fire_pk, lat, lon in fires.tolist():
+            distances = haversine_km(lat, lon, tile_wells[:, 1], tile_wells[:, 2])
+            if (distances <= radius_km).any():
+                fire_ids.add(int(fire_pk))
+
+    logger.info(f"{len(fire_ids)} fires near {len(wells)} changed wells")
+    return refresh_exposures(sorted(fire_ids), radius_km)
+
+
+def refresh_all_exposures():
+    """Recompute exposures for every fire that is not OUT."""
+    fire_ids = list(
+        Wildfire.objects.exclude(status="OUT").order_by().values_list("id", flat=True)
+    )
+    return refresh_exposures(fire_ids)
@@ -4,28 +4,23 @@ from django.conf import settings
 from django.utils import timezone
 import logging
 
+import numpy as np
+
+from fires.services.regions import tag_regions
+
 
 logger = logging.getLogger(__name__)
 
 class FIRMSService:
     """Service to fetch wildfire data from NASA FIRMS API"""
 
-    BASE_URL = "https://firms.modaps.eosdis.nasa.gov/api/country/csv"
-
-    # Alberta bounding box coordinates
-    ALBERTA_BOUNDS = {
-        "north": 60.0,
-        "south": 48.0,
-        "east": -110.0,
-        "west": -120.0,
-    }
-
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, base_url=None):
         self.api_key = api_key or settings.FIRMS_API_KEY
+        self.base_url = (base_url or settings.FIRMS_BASE_URL).rstrip("/")
 
     def fetch_active_fires(self, days_back=1):
         """
-        Fetch active fires from FIRMS for Alberta region 
+        Fetch active fires from FIRMS for the configured regions
 
         Args:
             days_back (int): Number of days of historical data to fetch. Default is 1 day.
@@ -49,12 +44,14 @@ class FIRMSService:
             # Parse CSV response
             fires = self._parse_csv_response(response.text)
 
-            # filter to Alberta only
-            alberta_fires = self._filter_alberta_fires(fires)
+            # keep (and tag) detections inside the configured regions
+            region_fires = self._filter_regions(fires)
 
-            logger.info(f"Fetched {len(alberta_fires)} fires in Alberta")
+            logger.info(
+                f"Fetched {len(region_fires)} fires in {', '.join(settings.FIRE_REGIONS)}"
+            )
 
-            return alberta_fires
+            return region_fires
         
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching FIRMS data: {e}")
@@ -68,7 +65,7 @@ class FIRMSService:
         country = 'CAN' # Canada country code
         days = min(days_back, 10) # API max is 10 days
 
-        url = f"{self.BASE_URL}/{self.api_key}/{source}/{country}/{days}"
+        url = f"{self.base_url}/{self.api_key}/{source}/{country}/{days}"
 
         return url
     
@@ -92,25 +89,33 @@ class FIRMSService:
         
         return fires
     
-    def _filter_alberta_fires(self, fires):
-        """Filter fires to only those within Alberta bounds."""
-        alberta_fires = []
-        
-        for fire in fires:
+    def _filter_regions(self, fires):
+        """Keep fires inside the active regions, tagging each with its region code."""
+        coordinates = np.full((len(fires), 2), np.nan)
+        for i, fire in enumerate(fires):
             try:
-                lat = float(fire.get('latitude', 0))
-                lon = float(fire.get('longitude', 0))
-                
-                # Check if within Alberta bounds
-                if (self.ALBERTA_BOUNDS['south'] <= lat <= self.ALBERTA_BOUNDS['north'] and
-                    self.ALBERTA_BOUNDS['west'] <= lon <= self.ALBERTA_BOUNDS['east']):
-                    alberta_fires.append(fire)
-                    
+                coordinates[i] = float(fire.get('latitude')), float(fire.get('longitude'))
             except (ValueError, TypeError):
                 continue
-        
-        return alberta_fires
-    
+
+        codes = tag_regions(coordinates[:, 0], coordinates[:, 1])
+        region_fires = []
+        for fire, code in zip(fires, codes):
+            if code:
+                fire['region'] = code
+                region_fires.append(fire)
+
+        return region_fires
+
+    def fire_id_for(self, firms_data):
+        """
+        Unique fire ID of a FIRMS detection, from its date and rounded position.
+
+        Raises TypeError when the row has no latitude or longitude.
+        """
+        acq_date = firms_data.get('acq_date', '')
+        return f"FIRMS-{acq_date}-{firms_data.get('latitude')[:6]}-{firms_data.get('longitude')[:7]}"
+
     def transform_to_wildfire_model(self, firms_data):
         """
         Transform FIRMS data to match our Wildfire model fields.
@@ -141,18 +146,18 @@ class FIRMSService:
             )
             detected_datetime = timezone.make_aware(detected_datetime, timezone.utc)
             
-            # Generate unique fire ID
-            fire_id = f"FIRMS-{acq_date}-{firms_data.get('latitude')[:6]}-{firms_data.get('longitude')[:7]}"
-            
             return {
-                'fire_id': fire_id,
+                'fire_id': self.fire_id_for(firms_data),
                 'fire_name': f"Fire near {float(firms_data.get('latitude')):.2f}N {abs(float(firms_data.get('longitude'))):.2f}W",
                 'latitude': float(firms_data.get('latitude')),
                 'longitude': float(firms_data.get('longitude')),
                 'size_hectares': round(estimated_size, 2),
+                'scan_km': scan,
+                'track_km': track,
                 'status': 'ACTIVE',  # FIRMS only shows active fires
                 'detected_date': detected_datetime,
                 'data_source': 'NASA_FIRMS',
+                'region': firms_data.get('region', ''),
                 'cause': 'Unknown',
                 'location_description': f"Confidence: {firms_data.get('confidence', 'nominal')}"
             }
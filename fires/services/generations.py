@@ -0,0 +1,53 @@
+"""
+Generation counters for cached API responses.
+
+Each dataset has a counter in the default cache that writers bump after
+they change the data. Cached responses are keyed on the current
+generation, so a bump invalidates all of them at once without tracking
+individual keys. The generation also works as an ETag.
+
+Bumps happen in Celery tasks and are read by the web processes, so the
+counters need the shared Redis cache (REDIS_URL). With a per-process cache
+a worker's bump never reaches the web.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+
+# Cached responses outlive generations only until this timeout
+RESPONSE_TIMEOUT = 3600
+
+
+def _key(name):
+    return f"generation:{name}"
+
+
+def get_generation(name):
+    """Return the current generation of a dataset."""
+    generation = cache.get(_key(name))
+    if generation is None:
+        # Start from the clock, so a counter lost to eviction never reuses
+        # a generation that still has responses cached under it
+        cache.add(_key(name), time.time_ns(), None)
+        generation = cache.get(_key(name))
+    return generation
+
+
+def bump_generation(name):
+    """Invalidate everything cached for a dataset."""
+    try:
+        return cache.incr(_key(name))
+    except ValueError:
+        return get_generation(name)
+
+
+def response_key(name, generation, params):
+    """Cache key for one response, from the generation and the request parameters."""
+    digest = hashlib.sha1(repr(sorted(params.items())).encode()).hexdigest()[:16]
+    return f"response:{name}:{generation}:{digest}"
+
+
+def etag_for(key):
+    return f'"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
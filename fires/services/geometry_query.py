@@ -0,0 +1,147 @@
+"""
+Wells inside arbitrary GeoJSON geometries.
+
+Polygons are used as given; points and lines (or polygons) can be grown by
+a buffer in kilometres. Buffers are computed in an azimuthal equidistant
+projection centred on the geometry, so they are true distances rather than
+degrees. Candidates come from the geometry's bounding box, looked up in the
+spatial key order of the well arrays, and are then tested all at once,
+exactly only near the boundary.
+"""
+import logging
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+from fires.models import AbandonedWell
+from fires.services.spatial import bbox_key_ranges
+from fires.services.well_arrays import arrays_from_queryset, get_well_arrays
+
+
+logger = logging.getLogger(__name__)
+
+# Cells per side of the grid used to classify candidates before exact tests
+CLASSIFY_GRID = 64
+
+# Vertex budget for a request geometry, to bound parsing and preparation
+MAX_VERTICES = 100_000
+
+
+def _buffer_km(geometry, buffer_km):
+    from pyproj import Transformer
+
+    center = geometry.centroid
+    local = f"+proj=aeqd +lat_0={center.y} +lon_0={center.x} +units=km +ellps=WGS84"
+    forward = Transformer.from_crs("EPSG:4326", local, always_xy=True)
+    inverse = Transformer.from_crs(local, "EPSG:4326", always_xy=True)
+
+    projected = shapely.transform(geometry, lambda xy: np.column_stack(forward.transform(xy[:, 0], xy[:, 1])))
+    buffered = projected.buffer(buffer_km)
+    return shapely.transform(buffered, lambda xy: np.column_stack(inverse.transform(xy[:, 0], xy[:, 1])))
+
+
+def parse_geometry(geojson, buffer_km=0):
+    """
+    Build the query area from a GeoJSON geometry and optional buffer.
+
+    Raises:
+        ValueError: If the geometry is malformed, too large, or has no
+            area (a point or line without a buffer).
+    """
+    try:
+        geometry = shape(geojson)
+    except (AttributeError, KeyError, TypeError, ValueError, shapely.errors.GEOSException) as e:
+        raise ValueError(f"Invalid GeoJSON geometry: {e}")
+
+    if geometry.is_empty:
+        raise ValueError("Geometry is empty")
+    if shapely.get_num_coordinates(geometry) > MAX_VERTICES:
+        raise ValueError(f"Geometry has more than {MAX_VERTICES} vertices")
+    if not geometry.is_valid:
+        # Self-intersections are common in hand-drawn areas
+        geometry = shapely.make_valid(geometry)
+
+    if buffer_km:
+        geometry = _buffer_km(geometry, buffer_km)
+    if geometry.area == 0:
+        raise ValueError("Points and lines need a buffer_km greater than 0")
+    return geometry
+
+
+def points_in_geometry(geometry, xs, ys, grid=CLASSIFY_GRID):
+    """
+    Vectorized point-in-geometry test (boundary counts as inside).
+
+    The bounding box is split into grid cells that are classified against
+    the geometry first. Points in cells fully inside or fully outside are
+    decided by their cell, and only points in cells crossing the boundary
+    are tested against the prepared geometry. Points outside the bounding
+    box are outside.
+    """
+    if not len(xs):
+        return np.zeros(0, dtype=bool)
+
+    west, south, east, north = geometry.bounds
+    in_bounds = (xs >= west) & (xs <= east) & (ys >= south) & (ys <= north)
+    width = (east - west) / grid or 1.0
+    height = (north - south) / grid or 1.0
+    columns = np.clip(((xs - west) / width).astype(np.int64), 0, grid - 1)
+    rows = np.clip(((ys - south) / height).astype(np.int64), 0, grid - 1)
+
+    grid_x, grid_y = np.meshgrid(np.arange(grid), np.arange(grid))
+    grid_x, grid_y = grid_x.ravel(), grid_y.ravel()
+    cells = shapely.box(
+        west + grid_x * width,
+        south + grid_y * height,
+        west + (grid_x + 1) * width,
+        south + (grid_y + 1) * height,
+    )
+    shapely.prepare(geometry)
+    cell_inside = shapely.contains(geometry, cells)
+    cell_touched = shapely.intersects(geometry, cells)
+
+    # Cells are clipped, so points beyond the bounds land in edge cells
+    cell = rows * grid + columns
+    inside = cell_inside[cell] & in_bounds
+    boundary = np.flatnonzero(cell_touched[cell] & ~cell_inside[cell] & in_bounds)
+    inside[boundary] = shapely.intersects_xy(geometry, xs[boundary], ys[boundary])
+    return inside
+
+
+def wells_within(geometry, limit=1000):
+    """
+    Wells inside (or on the boundary of) a geometry.
+
+    Returns:
+        tuple: (count, pks) with the total number of wells inside and the
+        pks of the first ``limit`` of them in well_id order.
+    """
+    west, south, east, north = geometry.bounds
+
+    arrays = get_well_arrays()
+    if arrays is not None:
+        rows = np.sort(arrays.key_range_rows(bbox_key_ranges(south, west, north, east)))
+        # Key ranges cover whole cells, so trim them to the exact bounds
+        latitudes, longitudes = arrays.latitude[rows], arrays.longitude[rows]
+        rows = rows[
+            (latitudes >= south)
+            & (latitudes <= north)
+            & (longitudes >= west)
+            & (longitudes <= east)
+        ]
+    else:
+        arrays = arrays_from_queryset(
+            AbandonedWell.objects.filter(
+                latitude__gte=south,
+                latitude__lte=north,
+                longitude__gte=west,
+                longitude__lte=east,
+            )
+        )
+        rows = np.arange(len(arrays))
+
+    inside = rows[points_in_geometry(geometry, arrays.longitude[rows], arrays.latitude[rows])]
+
+    logger.debug(f"{len(inside)} of {len(rows)} candidate wells inside the query geometry")
+    return len(inside), arrays.pk[inside[:limit]].tolist()
@@ -0,0 +1,413 @@
+"""
+Fire incidents and their estimated perimeters.
+
+Detections that have not gone out are clustered with a grid union-find:
+two detections are linked when they are within FIRE_INCIDENT_LINK_KM, and
+each connected group is one incident. Existing incidents keep their ids as
+they grow, groups that bridge several incidents merge into the largest,
+and when an incident splits only one of its groups keeps the id. Each
+ingestion only clusters the neighbourhood of the detections it changed.
+
+An incident's perimeter is the concave hull of its detection pixel
+footprints (scan x track km around each detection). It is stored
+simplified at a few tolerances so map clients can fetch one suited to
+their zoom.
+"""
+from collections import Counter, defaultdict
+import logging
+import math
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from fires.models import FireIncident, FirePerimeter, Wildfire
+from fires.services.spatial import EARTH_RADIUS_KM, filter_bbox, haversine_km
+
+
+logger = logging.getLogger(__name__)
+
+# (min_zoom, tolerance_km) of the stored perimeter versions, finest first
+PERIMETER_LEVELS = ((12, 0.0), (9, 0.05), (6, 0.3), (0, 1.5))
+
+# Footprint used for detections stored before scan/track were kept
+DEFAULT_PIXEL_KM = 0.375
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Detections are looked up in tiles of this size (degrees) when growing the
+# neighbourhood of changed detections
+TILE_DEGREES = 0.5
+
+DETECTION_FIELDS = ("pk", "latitude", "longitude", "incident_id")
+
+
+def cluster_detections(latitudes, longitudes, link_km):
+    """
+    Label connected groups of points closer than ``link_km`` to each other.
+
+    Points are bucketed into grid cells at least ``link_km`` wide, so only
+    the 3x3 neighbouring cells need comparing.
+
+    Returns:
+        numpy.ndarray: A group label (root index) per point.
+    """
+    count = len(latitudes)
+    parent = np.arange(count)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if count == 0:
+        return parent
+
+    cell_lat = link_km / KM_PER_DEGREE
+    # Narrowest longitude degree in the data, so cells are wide enough everywhere
+    cos_max = max(math.cos(math.radians(max(abs(np.max(latitudes)), abs(np.min(latitudes))))), 0.01)
+    cell_lon = cell_lat / cos_max
+
+    rows = np.floor(np.asarray(latitudes) / cell_lat).astype(np.int64)
+    columns = np.floor(np.asarray(longitudes) / cell_lon).astype(np.int64)
+    cells = defaultdict(list)
+    for i, cell in enumerate(zip(rows.tolist(), columns.tolist())):
+        cells[cell].append(i)
+
+    for (row, column), members in cells.items():
+        neighbours = [
+            j
+            for d_row in (-1, 0, 1)
+            for d_column in (-1, 0, 1)
+            for j in cells.get((row + d_row, column + d_column), ())
+        ]
+        neighbours = np.array(neighbours)
+        for i in members:
+            distances = haversine_km(
+                latitudes[i], longitudes[i], latitudes[neighbours], longitudes[neighbours]
+            )
+            for j in neighbours[distances <= link_km].tolist():
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return np.array([find(i) for i in range(count)])
+
+
+def _in_reach(frontier, candidates, link_km):
+    """Candidates within about ``link_km`` of a frontier detection (never fewer)."""
+    cell_lat = link_km / KM_PER_DEGREE
+    top = max(abs(row[1]) for row in (*frontier, *candidates))
+    cell_lon = cell_lat / max(math.cos(math.radians(top)), 0.01)
+
+    def cell(row):
+        return math.floor(row[1] / cell_lat), math.floor(row[2] / cell_lon)
+
+    reached = {
+        (row + d_row, column + d_column)
+        for row, column in map(cell, frontier)
+        for d_row in (-1, 0, 1)
+        for d_column in (-1, 0, 1)
+    }
+    return [candidate for candidate in candidates if cell(candidate) in reached]
+
+
+def neighbourhood(changed_ids, link_km):
+    """
+    The detections (not OUT) that clustering the changed ones can involve.
+
+    Starting from the changed detections, detections within ``link_km``
+    and every detection of the incidents met are added until nothing new
+    is in reach. The result holds whole connected groups and whole
+    incidents, so clustering it gives the same groups as clustering every
+    detection.
+
+    Returns:
+        list: (pk, latitude, longitude, incident_id) per detection.
+    """
+    live = Wildfire.objects.exclude(status="OUT").order_by()
+    changed_ids = sorted(set(changed_ids))
+    frontier = []
+    for start in range(0, len(changed_ids), 900):
+        frontier.extend(
+            live.filter(pk__in=changed_ids[start : start + 900]).values_list(*DETECTION_FIELDS)
+        )
+
+    rows = {}
+    incidents = set()
+    margin = link_km / KM_PER_DEGREE
+    while frontier:
+        rows.update((row[0], row) for row in frontier)
+        found = []
+
+        tiles = defaultdict(list)
+        for row in frontier:
+            tiles[(math.floor(row[1] / TILE_DEGREES), math.floor(row[2] / TILE_DEGREES))].append(row)
+        for tile_rows in tiles.values():
+            lats = [row[1] for row in tile_rows]
+            lons = [row[2] for row in tile_rows]
+            margin_lon = margin / max(math.cos(math.radians(max(map(abs, lats)) + margin)), 0.01)
+            candidates = list(
+                filter_bbox(
+                    live,
+                    min(lats) - margin,
+                    min(lons) - margin_lon,
+                    max(lats) + margin,
+                    max(lons) + margin_lon,
+                ).values_list(*DETECTION_FIELDS)
+            )
+            found.extend(
+                _in_reach(tile_rows, [row for row in candidates if row[0] not in rows], link_km)
+            )
+
+        new_incidents = sorted({row[3] for row in frontier if row[3] is not None} - incidents)
+        incidents.update(new_incidents)
+        for start in range(0, len(new_incidents), 900):
+            found.extend(
+                live.filter(incident_id__in=new_incidents[start : start + 900]).values_list(
+                    *DETECTION_FIELDS
+                )
+            )
+
+        frontier = list({row[0]: row for row in found if row[0] not in rows}.values())
+
+    return list(rows.values())
+
+
+def update_incidents(changed_ids):
+    """
+    Cluster detections into incidents after an ingestion.
+
+    Only the neighbourhood of the changed detections is clustered. Groups
+    that contain a changed detection, span more than one incident or hold
+    part of a split incident are written, and their incidents get fresh
+    stats and perimeters.
+
+    Returns:
+        int: Number of incidents updated.
+    """
+    changed = set(changed_ids)
+    rows = neighbourhood(changed, settings.FIRE_INCIDENT_LINK_KM)
+    if not rows:
+        return 0
+
+    pks = [row[0] for row in rows]
+    latitudes = np.array([row[1] for row in rows], dtype=np.float64)
+    longitudes = np.array([row[2] for row in rows], dtype=np.float64)
+    incident_ids = [row[3] for row in rows]
+    labels = cluster_detections(latitudes, longitudes, settings.FIRE_INCIDENT_LINK_KM)
+
+    groups = defaultdict(list)
+    for index, label in enumerate(labels.tolist()):
+        groups[label].append(index)
+
+    # Groups an incident's detections fall into; more than one is a split
+    spans = Counter(
+        incident_id
+        for members in groups.values()
+        for incident_id in {incident_ids[i] for i in members}
+        if incident_id is not None
+    )
+
+    touched = set()
+    claimed = set()
+    now = timezone.now()
+    with transaction.atomic():
+        # Larger groups are served first, so the larger part of a split
+        # incident keeps its id
+        for members in sorted(groups.values(), key=len, reverse=True):
+            current = Counter(incident_ids[i] for i in members if incident_ids[i] is not None)
+            has_changes = any(pks[i] in changed for i in members)
+            if (
+                not has_changes
+                and len(current) == 1
+                and sum(current.values()) == len(members)
+                and spans[next(iter(current))] == 1
+            ):
+                claimed.update(current)
+                continue
+
+            # An incident already kept by another part of a split is not reused
+            available = {
+                incident_id: count
+                for incident_id, count in current.items()
+                if incident_id not in claimed
+            }
+            if available:
+                # Largest incident wins; ties go to the oldest
+                keep = max(available.items(), key=lambda item: (item[1], -item[0]))[0]
+                # Incidents merged whole bring their OUT detections along
+                merged = [
+                    incident_id
+                    for incident_id in current
+                    if incident_id != keep and spans[incident_id] == 1
+                ]
+                if merged:
+                    Wildfire.objects.filter(incident_id__in=merged, status="OUT").update(
+                        incident_id=keep, last_updated=now
+                    )
+            else:
+                first = min(members, key=lambda i: pks[i])
+                keep = FireIncident.objects.create(
+                    first_detected=now,
+                    last_detected=now,
+                    latitude=latitudes[first],
+                    longitude=longitudes[first],
+                    south=latitudes[first],
+                    west=longitudes[first],
+                    north=latitudes[first],
+                    east=longitudes[first],
+                ).pk
+
+            unassigned = [pks[i] for i in members if incident_ids[i] != keep]
+            for start in range(0, len(unassigned), 900):
+                Wildfire.objects.filter(pk__in=unassigned[start : start + 900]).update(
+                    incident_id=keep, last_updated=now
+                )
+            claimed.add(keep)
+            touched.add(keep)
+            # Incidents that lost detections to this group need new stats
+            touched.update(incident_id for incident_id in current if incident_id != keep)
+
+        # Incidents left without detections after merges or cleanup
+        FireIncident.objects.filter(detections__isnull=True).delete()
+
+    refresh_incidents(touched)
+
+    logger.info(f"Updated {len(touched)} fire incidents from {len(changed)} changed detections")
+    return len(touched)
+
+
+def _footprints(rows, lat0, lon0):
+    """Pixel footprint boxes of detections, in km around (lat0, lon0)."""
+    # None (unknown pixel size) becomes NaN
+    lats, lons, scans, tracks = (np.array(column, dtype=np.float64) for column in zip(*rows))
+    scans = np.where(np.isnan(scans), DEFAULT_PIXEL_KM, scans)
+    tracks = np.where(np.isnan(tracks), DEFAULT_PIXEL_KM, tracks)
+    x = (lons - lon0) * KM_PER_DEGREE * math.cos(math.radians(lat0))
+    y = (lats - lat0) * KM_PER_DEGREE
+    return shapely.box(x - scans / 2, y - tracks / 2, x + scans / 2, y + tracks / 2)
+
+
+def _to_degrees(geometry, lat0, lon0):
+    scale_x = KM_PER_DEGREE * math.cos(math.radians(lat0))
+    return shapely.transform(
+        geometry, lambda xy: np.column_stack([lon0 + xy[:, 0] / scale_x, lat0 + xy[:, 1] / KM_PER_DEGREE])
+    )
+
+
+def estimate_perimeter(rows, lat0, lon0):
+    """
+    Concave hull of the detection footprints, in km around (lat0, lon0).
+
+    Args:
+        rows (list): (latitude, longitude, scan_km, track_km) per detection;
+            missing pixel sizes fall back to the nominal VIIRS pixel.
+    """
+    boxes = _footprints(rows, lat0, lon0)
+    footprint = shapely.union_all(boxes)
+    hull = shapely.concave_hull(
+        shapely.multipoints(shapely.get_coordinates(boxes)), ratio=settings.FIRE_PERIMETER_CONCAVITY
+    )
+    # The hull runs through the box corners; the union keeps every pixel covered
+    return shapely.union_all([hull, footprint])
+
+
+def _perimeter_versions(incident_id, perimeter, lat0, lon0):
+    versions = []
+    for min_zoom, tolerance in PERIMETER_LEVELS:
+        simplified = perimeter.simplify(tolerance, preserve_topology=True) if tolerance else perimeter
+        geometry = _to_degrees(simplified, lat0, lon0)
+        versions.append(
+            FirePerimeter(
+                incident_id=incident_id,
+                min_zoom=min_zoom,
+                tolerance_km=tolerance,
+                geometry=mapping(geometry),
+                vertex_count=shapely.get_num_coordinates(geometry),
+            )
+        )
+    return versions
+
+
+def refresh_incidents(incident_ids):
+    """
+    Recompute the stats, extent and stored perimeters of several incidents.
+
+    Only detections that are not OUT count, since an OUT detection is no
+    longer part of what is burning. Incidents whose detections are all OUT
+    (the incident itself is out) keep the extent of everything they burned.
+    """
+    incident_ids = sorted(set(incident_ids))
+    detections = defaultdict(list)
+    out_detections = defaultdict(list)
+    for start in range(0, len(incident_ids), 900):
+        rows = (
+            Wildfire.objects.filter(incident_id__in=incident_ids[start : start + 900])
+            .order_by()
+            .values_list(
+                "incident_id", "latitude", "longitude", "scan_km", "track_km", "detected_date", "status"
+            )
+        )
+        for incident_id, *row, status in rows:
+            (out_detections if status == "OUT" else detections)[incident_id].append(row)
+    for incident_id, rows in out_detections.items():
+        detections.setdefault(incident_id, rows)
+
+    incidents = []
+    perimeters = []
+    now = timezone.now()
+    for incident in FireIncident.objects.filter(pk__in=list(detections)):
+        rows = detections[incident.pk]
+        lats = [row[0] for row in rows]
+        lons = [row[1] for row in rows]
+        dates = [row[4] for row in rows]
+        lat0 = sum(lats) / len(rows)
+        lon0 = sum(lons) / len(rows)
+        perimeter = estimate_perimeter([row[:4] for row in rows], lat0, lon0)
+
+        incident.detection_count = len(rows)
+        incident.first_detected = min(dates)
+        incident.last_detected = max(dates)
+        incident.latitude, incident.longitude = lat0, lon0
+        incident.south, incident.north = min(lats), max(lats)
+        incident.west, incident.east = min(lons), max(lons)
+        incident.area_hectares = round(perimeter.area * 100, 2)
+        # bulk_update does not apply auto_now
+        incident.updated_at = now
+        incidents.append(incident)
+        perimeters.extend(_perimeter_versions(incident.pk, perimeter, lat0, lon0))
+
+    with transaction.atomic():
+        FireIncident.objects.bulk_update(
+            incidents,
+            [
+                "detection_count",
+                "first_detected",
+                "last_detected",
+                "latitude",
+                "longitude",
+                "south",
+                "west",
+                "north",
+                "east",
+                "area_hectares",
+                "updated_at",
+            ],
+            batch_size=500,
+        )
+        FirePerimeter.objects.filter(incident_id__in=[incident.pk for incident in incidents]).delete()
+        FirePerimeter.objects.bulk_create(perimeters, batch_size=500)
+    return len(incidents)
+
+
+def perimeter_level(zoom):
+    """min_zoom of the stored perimeter version to serve at a map zoom."""
+    for min_zoom, _ in PERIMETER_LEVELS:
+        if zoom >= min_zoom:
+            return min_zoom
+    return PERIMETER_LEVELS[-1][0]
@@ -0,0 +1,254 @@
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from config.routers import pin_primary
+from fires.models import Wildfire
+from fires.services.spatial import morton_key
+
+
+logger = logging.getLogger(__name__)
+
+# Generation bumped whenever an ingestion finishes
+GENERATION = "fires"
+
+# Progress of pipeline jobs is kept in the cache for this long
+PROGRESS_TIMEOUT = 24 * 3600
+LATEST_JOB_KEY = "ingest:latest-job"
+PROGRESS_COUNTERS = ("done_chunks", "created", "updated", "errors")
+
+
+def _existing_fires(fire_ids, fields):
+    """Map fire_id -> stored ``fields`` (and the pk) of the fires already stored."""
+    existing = {}
+    for start in range(0, len(fire_ids), 500):
+        rows = Wildfire.objects.filter(fire_id__in=fire_ids[start : start + 500]).values(
+            "pk", *fields
+        )
+        existing.update({row["fire_id"]: row for row in rows})
+    return existing
+
+
+def save_fire_detections(service, firms_data):
+    """
+    Transform FIRMS rows and upsert them into the Wildfire table.
+
+    Every fetch overlaps the previous ones, so most rows come back
+    unchanged. Those are not written at all: saving them would move their
+    last_updated and put them back in the change feed.
+
+    Returns:
+        dict: Counts of created, updated, unchanged and failed rows, plus
+        ``changed_ids``, the pks of fires that are new or whose location
+        moved, and ``touched_days``, the local dates (ISO strings) of the
+        detections. ``created_ids`` and ``updated_ids`` split the pks of
+        the rows written by what happened.
+    """
+    transformed_rows = []
+    error_count = 0
+    for fire_data in firms_data:
+        transformed = service.transform_to_wildfire_model(fire_data)
+        if not transformed:
+            error_count += 1
+            continue
+        transformed_rows.append(transformed)
+
+    # New fires start ACTIVE; after that the lifecycle task owns the status
+    fields = [key for key in transformed_rows[0] if key != "status"] if transformed_rows else []
+    existing = _existing_fires([row["fire_id"] for row in transformed_rows], fields)
+
+    created_count = 0
+    updated_count = 0
+    unchanged_count = 0
+    changed_ids = []
+    created_ids = []
+    updated_ids = []
+    now = timezone.now()
+
+    for transformed in transformed_rows:
+        try:
+            values = {key: value for key, value in transformed.items() if key != "status"}
+            stored = existing.get(transformed["fire_id"])
+
+            if stored is None:
+                wildfire = Wildfire.objects.create(**transformed)
+                # The same detection can come twice in one fetch
+                existing[wildfire.fire_id] = {"pk": wildfire.pk, **values}
+                created_count += 1
+                changed_ids.append(wildfire.pk)
+                created_ids.append(wildfire.pk)
+                logger.debug(f"Created: {wildfire.fire_id}")
+                continue
+
+            changes = {key: value for key, value in values.items() if stored[key] != value}
+            if not changes:
+                unchanged_count += 1
+                continue
+
+            if "latitude" in changes or "longitude" in changes:
+                # update() skips SpatialKeyMixin.save
+                changes["spatial_key"] = morton_key(values["latitude"], values["longitude"])
+                changed_ids.append(stored["pk"])
+            # update() skips auto_now as well
+            Wildfire.objects.filter(pk=stored["pk"]).update(**changes, last_updated=now)
+            stored.update(changes)
+            updated_count += 1
+            updated_ids.append(stored["pk"])
+            logger.debug(f"Updated: {transformed['fire_id']}")
+
+        except Exception as e:
+            error_count += 1
+            logger.error(f"Error saving fire {transformed.get('fire_id')}: {e}")
+
+    # Let readers see the new rows before the replica catches up
+    pin_primary()
+
+    return {
+        "created": created_count,
+        "updated": updated_count,
+        "unchanged": unchanged_count,
+        "errors": error_count,
+        "changed_ids": changed_ids,
+        "created_ids": created_ids,
+        "updated_ids": updated_ids,
+        "touched_days": sorted(
+            {timezone.localdate(row["detected_date"]).isoformat() for row in transformed_rows}
+        ),
+    }
+
+
+def run_post_ingest(results):
+    """
+    Bring derived data up to date after an ingestion.
+
+    Args:
+        results (list): Result dicts from save_fire_detections.
+    """
+    from fires.services.activity import refresh_activity
+    from fires.services.events import publish_fire_changes
+    from fires.services.exposure import drop_inactive_exposures, refresh_exposures
+    from fires.services.generations import bump_generation
+    from fires.services.incidents import update_incidents
+
+    changed_ids = sorted({pk for result in results for pk in result["changed_ids"]})
+    touched_days = {day for result in results for day in result["touched_days"]}
+
+    refresh_exposures(changed_ids)
+    drop_inactive_exposures()
+    refresh_activity(touched_days)
+    update_incidents(changed_ids)
+
+    # Drop cached responses built from the fire table
+    bump_generation(GENERATION)
+
+    refresh_snapshots()
+
+    # Push the changed fires to clients following the events stream
+    publish_fire_changes(
+        created=[pk for result in results for pk in result.get("created_ids", [])],
+        updated=[pk for result in results for pk in result.get("updated_ids", [])],
+    )
+
+
+def refresh_snapshots():
+    """Rewrite the static API snapshots; a failure only leaves the previous ones in place."""
+    from fires.services.snapshots import write_snapshots
+
+    try:
+        write_snapshots()
+    except Exception as e:
+        logger.error(f"Could not write API snapshots: {e}")
+
+
+def chunk_detections(service, firms_data, chunk_size=None):
+    """
+    Split FIRMS rows into chunks for parallel ingestion.
+
+    Rows that map to the same fire_id always land in the same chunk, so
+    parallel chunks never race to create the same fire. Only the fire_id is
+    derived here; the rows are transformed once, by the chunk that saves them.
+    """
+    chunk_size = chunk_size or settings.FIRE_INGEST_CHUNK_SIZE
+    groups = {}
+    for index, row in enumerate(firms_data):
+        try:
+            key = service.fire_id_for(row)
+        except TypeError:
+            key = f"invalid-{index}"
+        groups.setdefault(key, []).append(row)
+
+    chunks, current = [], []
+    for rows in groups.values():
+        if current and len(current) + len(rows) > chunk_size:
+            chunks.append(current)
+            current = []
+        current.extend(rows)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _progress_key(job_id, field):
+    return f"ingest:{job_id}:{field}"
+
+
+def start_progress(total_chunks, detections):
+    """Register a new pipeline job and return its id."""
+    job_id = uuid.uuid4().hex
+    cache.set_many(
+        {
+            _progress_key(job_id, "state"): "RUNNING",
+            _progress_key(job_id, "total_chunks"): total_chunks,
+            _progress_key(job_id, "detections"): detections,
+            _progress_key(job_id, "started_at"): timezone.now().isoformat(),
+            **{_progress_key(job_id, counter): 0 for counter in PROGRESS_COUNTERS},
+        },
+        PROGRESS_TIMEOUT,
+    )
+    cache.set(LATEST_JOB_KEY, job_id, PROGRESS_TIMEOUT)
+    return job_id
+
+
+def record_chunk(job_id, result):
+    """Add one finished chunk to a job's counters (atomic per counter)."""
+    cache.incr(_progress_key(job_id, "done_chunks"))
+    for counter in ("created", "updated", "errors"):
+        if result[counter]:
+            cache.incr(_progress_key(job_id, counter), result[counter])
+
+
+def finish_progress(job_id, state, error=""):
+    cache.set_many(
+        {
+            _progress_key(job_id, "state"): state,
+            _progress_key(job_id, "finished_at"): timezone.now().isoformat(),
+            _progress_key(job_id, "error"): error,
+        },
+        PROGRESS_TIMEOUT,
+    )
+
+
+def get_progress(job_id=None):
+    """Progress of a pipeline job (the latest one by default), or None if unknown."""
+    job_id = job_id or cache.get(LATEST_JOB_KEY)
+    if not job_id:
+        return None
+    fields = (
+        "state",
+        "total_chunks",
+        "detections",
+        "started_at",
+        "finished_at",
+        "error",
+        *PROGRESS_COUNTERS,
+    )
+    values = cache.get_many([_progress_key(job_id, field) for field in fields])
+    if not values:
+        return None
+    progress = {"job_id": job_id}
+    for field in fields:
+        progress[field] = values.get(_progress_key(job_id, field))
+    return progress
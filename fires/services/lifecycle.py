@@ -0,0 +1,125 @@
+"""
+Status lifecycle of fires: ACTIVE -> CONTAINED -> OUT.
+
+FIRMS only reports detections, never that a fire is over, so statuses are
+aged by rule. An incident is CONTAINED once none of its pixels has been
+re-detected for FIRE_CONTAINED_AFTER_HOURS, and OUT after
+FIRE_OUT_AFTER_HOURS. A new detection joining a contained incident moves
+its last detection forward and makes it ACTIVE again; OUT is final, and
+later detections nearby start a new incident. Detections follow their
+incident, and the few that have none yet are aged by their own detection
+time.
+
+Every transition is one set-based UPDATE, so a run costs a handful of
+statements however many fires change, and the ACTIVE set stays limited to
+fires that are still burning. The detection UPDATEs return the pks they
+changed (UPDATE ... RETURNING) for the events stream and the exposures.
+"""
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from fires.models import FireIncident, Wildfire
+
+
+logger = logging.getLogger(__name__)
+
+
+def _move_detections(queryset, status, now, changed_ids):
+    """
+    Give the detections in ``queryset`` a new status with one UPDATE.
+
+    The pks of the rows it changed are added to ``changed_ids``. Must run in
+    a transaction.
+    """
+    connection = connections[queryset.db]
+    # The same feature flag tells whether UPDATE ... RETURNING works
+    if not connection.features.can_return_rows_from_bulk_insert:
+        pks = list(queryset.values_list("pk", flat=True))
+        queryset.update(status=status, last_updated=now)
+        changed_ids.extend(pks)
+        return len(pks)
+
+    quote = connection.ops.quote_name
+    subquery, params = (
+        queryset.order_by().values("pk").query.get_compiler(connection=connection).as_sql()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {quote(Wildfire._meta.db_table)} "
+            f"SET {quote('status')} = %s, {quote('last_updated')} = %s "
+            f"WHERE {quote('id')} IN ({subquery}) RETURNING {quote('id')}",
+            [status, connection.ops.adapt_datetimefield_value(now), *params],
+        )
+        pks = [row[0] for row in cursor.fetchall()]
+    changed_ids.extend(pks)
+    return len(pks)
+
+
+def _follow_incidents(status, from_statuses, now, changed_ids):
+    """Give the detections of incidents in ``status`` the same status."""
+    return _move_detections(
+        Wildfire.objects.filter(
+            incident_id__in=FireIncident.objects.filter(status=status).values("id"),
+            status__in=from_statuses,
+        ),
+        status,
+        now,
+        changed_ids,
+    )
+
+
+def age_fires(now=None):
+    """
+    Apply the lifecycle rules to every fire that is not OUT.
+
+    Returns:
+        dict: Counts of incidents and detections moved to each status, and
+        ``changed_ids``, the pks of the detections whose status changed.
+    """
+    now = now or timezone.now()
+    contained_before = now - timedelta(hours=settings.FIRE_CONTAINED_AFTER_HOURS)
+    out_before = now - timedelta(hours=settings.FIRE_OUT_AFTER_HOURS)
+    changed_ids = []
+
+    with transaction.atomic():
+        incidents = {
+            "reactivated": FireIncident.objects.filter(
+                status="CONTAINED", last_detected__gte=contained_before
+            ).update(status="ACTIVE", updated_at=now),
+            "out": FireIncident.objects.exclude(status="OUT")
+            .filter(last_detected__lt=out_before)
+            .update(status="OUT", updated_at=now),
+            "contained": FireIncident.objects.filter(
+                status="ACTIVE", last_detected__lt=contained_before
+            ).update(status="CONTAINED", updated_at=now),
+        }
+
+        detections = {
+            "reactivated": _follow_incidents("ACTIVE", ["CONTAINED"], now, changed_ids),
+            "out": _follow_incidents(
+                "OUT", ["ACTIVE", "CONTAINED", "UNDER_CONTROL"], now, changed_ids
+            ),
+            "contained": _follow_incidents("CONTAINED", ["ACTIVE"], now, changed_ids),
+        }
+
+        # Detections not clustered into an incident yet
+        unclustered = Wildfire.objects.filter(incident__isnull=True)
+        detections["out"] += _move_detections(
+            unclustered.exclude(status="OUT").filter(detected_date__lt=out_before),
+            "OUT",
+            now,
+            changed_ids,
+        )
+        detections["contained"] += _move_detections(
+            unclustered.filter(status="ACTIVE", detected_date__lt=contained_before),
+            "CONTAINED",
+            now,
+            changed_ids,
+        )
+
+    logger.info(f"Fire lifecycle: incidents {incidents}, detections {detections}")
+    return {"incidents": incidents, "detections": detections, "changed_ids": sorted(set(changed_ids))}
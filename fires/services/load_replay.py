@@ -0,0 +1,314 @@
+"""
+Replay of map sessions against a running server, for load testing.
+
+A session is what one map client does: open the map, then pan and zoom,
+requesting wells (or clusters when zoomed out), viewport stats and now and
+then the active fires, with pauses in between. Sessions are generated
+from a seed or read from a JSON lines trace. They are replayed at a chosen
+concurrency, optionally while ingestion runs against a local FIRMS stub.
+Results are summarized per endpoint and can be saved as a baseline that
+later runs are compared against.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# Center and extent of the area sessions wander over (Alberta)
+MAP_BOUNDS = {"south": 49.0, "west": -120.0, "north": 60.0, "east": -110.0}
+
+# Below this zoom the map asks for clusters instead of individual wells
+CLUSTER_MAX_ZOOM = 10
+
+INGEST_ENDPOINT = "ingest (FIRMS stub)"
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _viewport(lat, lon, zoom):
+    # A map about 1000 px wide shows roughly 1400 km / 2^(zoom - 4) of width
+    width = 360 / 2 ** zoom * 4
+    height = width * 0.6
+    south = max(MAP_BOUNDS["south"], lat - height / 2)
+    west = max(MAP_BOUNDS["west"], lon - width / 2)
+    return (
+        round(south, 4),
+        round(west, 4),
+        round(min(MAP_BOUNDS["north"], south + height), 4),
+        round(min(MAP_BOUNDS["east"], west + width), 4),
+    )
+
+
+def synthetic_sessions(count, steps=20, seed=42):
+    """
+    Generate map sessions: a random start, then pans and zooms.
+
+    Returns:
+        list: Sessions, each a list of {"path", "think"} steps where
+        ``think`` is the pause in seconds before the request.
+    """
+    rng = random.Random(seed)
+    sessions = []
+    for _ in range(count):
+        lat = rng.uniform(MAP_BOUNDS["south"] + 1, MAP_BOUNDS["north"] - 1)
+        lon = rng.uniform(MAP_BOUNDS["west"] + 1, MAP_BOUNDS["east"] - 1)
+        zoom = rng.choice([6, 7, 8])
+        session = [
+            {"path": "/api/v1/fires/active/", "think": 0.0},
+            {"path": "/api/v1/stats/today/", "think": 0.0},
+        ]
+        for step in range(steps):
+            move = rng.random()
+            if move < 0.6:
+                # Pan by up to half a screen
+                width = 360 / 2 ** zoom * 4
+                lat += rng.uniform(-0.5, 0.5) * width * 0.6
+                lon += rng.uniform(-0.5, 0.5) * width
+            elif move < 0.85:
+                zoom = min(zoom + 1, 14)
+            else:
+                zoom = max(zoom - 1, 5)
+            lat = min(max(lat, MAP_BOUNDS["south"]), MAP_BOUNDS["north"])
+            lon = min(max(lon, MAP_BOUNDS["west"]), MAP_BOUNDS["east"])
+
+            s, w, n, e = _viewport(lat, lon, zoom)
+            bbox = f"south={s}&west={w}&north={n}&east={e}"
+            think = round(rng.uniform(0.3, 2.0), 2)
+            if zoom <= CLUSTER_MAX_ZOOM:
+                path = f"/api/v1/energy-wells/clusters/?{bbox}&zoom={zoom}"
+            else:
+                path = f"/api/v1/energy-wells/?{bbox}&limit=1000"
+            session.append({"path": path, "think": think})
+            # The stats panel refreshes with every move
+            session.append({"path": f"/api/v1/energy-wells/stats/?{bbox}", "think": 0.0})
+            if step % 5 == 4:
+                session.append({"path": "/api/v1/fires/active/", "think": 0.0})
+        sessions.append(session)
+    return sessions
+
+
+def read_trace(path):
+    """Read sessions from a JSON lines file, one {"steps": [...]} per line."""
+    with open(path) as f:
+        return [json.loads(line)["steps"] for line in f if line.strip()]
+
+
+def write_trace(path, sessions):
+    with open(path, "w") as f:
+        for session in sessions:
+            f.write(json.dumps({"steps": session}) + "\n")
+
+
+def endpoint_of(path):
+    return path.split("?")[0]
+
+
+class Recorder:
+    """Thread-safe collection of latencies and errors per endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, elapsed, ok):
+        with self.lock:
+            if ok:
+                self.latencies.setdefault(endpoint, []).append(elapsed)
+            else:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, duration):
+        endpoints = {}
+        for endpoint in sorted(set(self.latencies) | set(self.errors)):
+            values = self.latencies.get(endpoint, [])
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput": round(len(values) / duration, 2) if duration else 0,
+                "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+                "p95_ms": round(percentile(values, 95) * 1000, 2) if values else None,
+                "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None,
+                "max_ms": round(max(values) * 1000, 2) if values else None,
+            }
+        requests_done = sum(
+            stats["requests"] for name, stats in endpoints.items() if name != INGEST_ENDPOINT
+        )
+        return {
+            "duration_s": round(duration, 2),
+            "requests": requests_done,
+            "errors": sum(self.errors.values()),
+            "throughput": round(requests_done / duration, 2) if duration else 0,
+            "endpoints": endpoints,
+        }
+
+
+def replay(base_url, sessions, concurrency, think_scale=1.0, recorder=None):
+    """
+    Replay sessions with up to ``concurrency`` of them running at once.
+
+    Each session runs on its own keep-alive connection, pausing ``think``
+    seconds (times ``think_scale``) before each step.
+    """
+    base_url = base_url.rstrip("/")
+    recorder = recorder or Recorder()
+
+    def run(session):
+        with requests.Session() as http:
+            for step in session:
+                if step.get("think") and think_scale:
+                    time.sleep(step["think"] * think_scale)
+                started = time.perf_counter()
+                try:
+                    ok = http.get(base_url + step["path"], timeout=60).status_code == 200
+                except requests.RequestException:
+                    ok = False
+                recorder.record(endpoint_of(step["path"]), time.perf_counter() - started, ok)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, sessions))
+    return recorder
+
+
+class FirmsStubServer:
+    """
+    Local HTTP server that answers FIRMS country CSV requests.
+
+    Every response holds ``detections`` synthetic detections for today,
+    about a quarter of them repeats of the previous response, so ingestion
+    sees both new fires and updates.
+    """
+
+    HEADER = (
+        "latitude,longitude,bright_ti4,scan,track,acq_date,acq_time,"
+        "satellite,instrument,confidence,version,bright_ti5,frp,daynight"
+    )
+
+    def __init__(self, detections=500, seed=0):
+        self.detections = detections
+        self.rng = random.Random(seed)
+        self.previous = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = stub.csv().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        """URL to use as FIRMS_BASE_URL."""
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/api/country/csv"
+
+    def csv(self):
+        with self.lock:
+            day = timezone.now().strftime("%Y-%m-%d")
+            repeats = self.previous[: self.detections // 4]
+            rows = list(repeats)
+            while len(rows) < self.detections:
+                rows.append(
+                    f"{self.rng.uniform(49, 60):.5f},{self.rng.uniform(-120, -110):.5f},"
+                    f"330.1,{self.rng.uniform(0.32, 0.6):.2f},{self.rng.uniform(0.36, 0.6):.2f},"
+                    f"{day},{self.rng.randint(0, 23):02d}{self.rng.randint(0, 59):02d},"
+                    f"N,VIIRS,n,2.0NRT,290.1,3.2,D"
+                )
+            self.rng.shuffle(rows)
+            self.previous = rows
+            return "\n".join([self.HEADER, *rows])
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def ingest_loop(stub, interval, stop, recorder):
+    """Run an ingestion from the stub every ``interval`` seconds until stopped."""
+    from django.db import close_old_connections
+
+    from fires.services.firms_services import FIRMSService
+    from fires.services.ingest import run_post_ingest, save_fire_detections
+
+    service = FIRMSService(api_key="stub", base_url=stub.base_url)
+    while not stop.wait(interval):
+        started = time.perf_counter()
+        try:
+            results = save_fire_detections(service, service.fetch_active_fires(days_back=1) or [])
+            run_post_ingest([results])
+            ok = True
+        except Exception as e:
+            logger.error(f"Stub ingestion failed: {e}")
+            ok = False
+        finally:
+            close_old_connections()
+        recorder.record(INGEST_ENDPOINT, time.perf_counter() - started, ok)
+
+
+def compare(summary, baseline, tolerance, slack_ms):
+    """
+    Regressions of a run against a baseline summary.
+
+    An endpoint regresses when its p95 grows by more than ``tolerance``
+    (a fraction) plus ``slack_ms``, or when it starts failing. Overall
+    throughput regresses when it drops by more than ``tolerance``.
+
+    Returns:
+        list: Human readable descriptions, empty when nothing regressed.
+    """
+    problems = []
+    for endpoint, before in baseline["endpoints"].items():
+        after = summary["endpoints"].get(endpoint)
+        if endpoint == INGEST_ENDPOINT or after is None or before["p95_ms"] is None:
+            continue
+        if after["errors"] > before["errors"]:
+            problems.append(f"{endpoint}: {after['errors']} errors (baseline {before['errors']})")
+        if after["p95_ms"] is None:
+            continue
+        limit = before["p95_ms"] * (1 + tolerance) + slack_ms
+        if after["p95_ms"] > limit:
+            problems.append(
+                f"{endpoint}: p95 {after['p95_ms']:.1f} ms vs baseline {before['p95_ms']:.1f} ms "
+                f"(limit {limit:.1f} ms)"
+            )
+
+    floor = baseline["throughput"] * (1 - tolerance)
+    if baseline["throughput"] and summary["throughput"] < floor:
+        problems.append(
+            f"throughput {summary['throughput']:.1f} req/s vs baseline "
+            f"{baseline['throughput']:.1f} req/s (floor {floor:.1f})"
+        )
+    return problems
+
+
+def same_workload(summary, baseline):
+    """True when both runs replayed the same workload parameters."""
+    return summary.get("workload") == baseline.get("workload")
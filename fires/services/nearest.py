@@ -0,0 +1,90 @@
+"""
+k-nearest abandoned wells to a point.
+
+An expanding-ring search: wells are gathered from the box around a circle,
+and the circle grows until it holds at least k wells. Every well within the
+radius is inside the box, so once k of them are found the k closest are
+exact. With a well arrays snapshot the box is answered from the sorted
+spatial keys without touching the database. Otherwise each ring is one
+bbox query.
+"""
+import logging
+import math
+
+import numpy as np
+
+from fires.models import AbandonedWell
+from fires.services.spatial import bbox_key_ranges, bearing_deg, haversine_km, radius_bbox
+from fires.services.well_arrays import get_well_arrays
+
+
+logger = logging.getLogger(__name__)
+
+INITIAL_RADIUS_KM = 2.0
+
+# Search stops growing here; whatever was found is returned
+MAX_RADIUS_KM = 1000.0
+
+MAX_K = 100
+
+
+def _snapshot_candidates(arrays):
+    def candidates(south, west, north, east):
+        rows = arrays.key_range_rows(bbox_key_ranges(south, west, north, east))
+        return arrays.pk[rows], arrays.latitude[rows], arrays.longitude[rows]
+
+    return candidates
+
+
+def _db_candidates(south, west, north, east):
+    rows = list(
+        AbandonedWell.objects.filter(
+            latitude__gte=south,
+            latitude__lte=north,
+            longitude__gte=west,
+            longitude__lte=east,
+        )
+        .order_by()
+        .values_list("pk", "latitude", "longitude")
+    )
+    if not rows:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty
+    pks, lats, lons = (np.array(column) for column in zip(*rows))
+    return pks, lats.astype(np.float64), lons.astype(np.float64)
+
+
+def nearest_wells(latitude, longitude, k=20):
+    """
+    Find the k wells closest to a point by great-circle distance.
+
+    Returns:
+        list: (pk, distance_km, bearing_deg) tuples, nearest first. Fewer
+        than k when fewer wells lie within MAX_RADIUS_KM.
+    """
+    arrays = get_well_arrays()
+    candidates = _snapshot_candidates(arrays) if arrays is not None else _db_candidates
+
+    radius = INITIAL_RADIUS_KM
+    rings = 0
+    while True:
+        rings += 1
+        pks, lats, lons = candidates(*radius_bbox(latitude, longitude, radius))
+        distances = haversine_km(latitude, longitude, lats, lons)
+        within = np.flatnonzero(distances <= radius)
+
+        if len(within) >= k or radius >= MAX_RADIUS_KM:
+            break
+        # Grow by the area needed for k wells at the density seen so far
+        growth = math.sqrt(k / max(len(within), 1))
+        radius = min(radius * max(2.0, growth), MAX_RADIUS_KM)
+
+    closest = within[np.argsort(distances[within], kind="stable")[:k]]
+    bearings = bearing_deg(latitude, longitude, lats[closest], lons[closest])
+    logger.debug(
+        f"Nearest {k} wells to ({latitude}, {longitude}): {rings} rings, "
+        f"final radius {radius:.1f} km, {len(pks)} candidates"
+    )
+    return list(
+        zip(pks[closest].tolist(), distances[closest].tolist(), bearings.tolist())
+    )
@@ -0,0 +1,115 @@
+"""
+Regions (provinces) that FIRMS detections are tagged with.
+
+Regions are read from a GeoJSON FeatureCollection (FIRE_REGIONS_FILE) whose
+features carry a ``code`` and ``name``. Detections are tagged in bulk: each
+region's bounding box picks the candidate points, and only those are tested
+against the prepared polygon. Only regions listed in FIRE_REGIONS are kept
+by ingestion.
+"""
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+from shapely.geometry import shape
+
+from django.conf import settings
+
+from fires.services.geometry_query import points_in_geometry
+
+
+logger = logging.getLogger(__name__)
+
+
+class Region:
+    """One named boundary polygon."""
+
+    def __init__(self, code, name, geometry):
+        self.code = code
+        self.name = name
+        self.geometry = geometry
+        self.bounds = geometry.bounds
+
+    def __repr__(self):
+        return f"Region({self.code!r})"
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def load_regions(path=None):
+    """
+    Parse the regions file, cached per path and modification time.
+
+    Returns:
+        list: Region objects in file order.
+    """
+    path = path or settings.FIRE_REGIONS_FILE
+    stamp = (path, os.path.getmtime(path))
+    with _lock:
+        if stamp not in _loaded:
+            with open(path) as f:
+                collection = json.load(f)
+            regions = [
+                Region(
+                    feature["properties"]["code"],
+                    feature["properties"].get("name", feature["properties"]["code"]),
+                    shape(feature["geometry"]),
+                )
+                for feature in collection["features"]
+            ]
+            _loaded.clear()
+            _loaded[stamp] = regions
+            logger.info(f"Loaded {len(regions)} fire regions from {path}")
+        return _loaded[stamp]
+
+
+def active_regions():
+    """Regions listed in FIRE_REGIONS, in file order."""
+    wanted = set(settings.FIRE_REGIONS)
+    return [region for region in load_regions() if region.code in wanted]
+
+
+def region_codes():
+    """Codes of all defined regions."""
+    return [region.code for region in load_regions()]
+
+
+def tag_regions(latitudes, longitudes, regions=None):
+    """
+    Region code of each point, or "" for points outside every region.
+
+    Points on a border shared by two regions get the first one in file
+    order.
+
+    Args:
+        regions (list): Regions to test. Defaults to the active ones.
+
+    Returns:
+        numpy.ndarray: Object array of codes, one per point.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    codes = np.full(len(latitudes), "", dtype=object)
+    untagged = np.ones(len(latitudes), dtype=bool)
+
+    for region in active_regions() if regions is None else regions:
+        west, south, east, north = region.bounds
+        candidates = np.flatnonzero(
+            untagged
+            & (latitudes >= south)
+            & (latitudes <= north)
+            & (longitudes >= west)
+            & (longitudes <= east)
+        )
+        if not len(candidates):
+            continue
+        inside = candidates[
+            points_in_geometry(region.geometry, longitudes[candidates], latitudes[candidates])
+        ]
+        codes[inside] = region.code
+        untagged[inside] = False
+    return codes
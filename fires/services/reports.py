@@ -0,0 +1,108 @@
+from datetime import datetime, time, timedelta
+import logging
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from config.routers import read_from_replica
+from fires.models import DailyReport, Wildfire
+
+
+logger = logging.getLogger(__name__)
+
+STATUSES = [choice for choice, _ in Wildfire._meta.get_field("status").choices]
+
+
+def day_bounds(date):
+    """Return the aware [start, end) datetimes of a local calendar day."""
+    start = timezone.make_aware(datetime.combine(date, time.min))
+    end = timezone.make_aware(datetime.combine(date + timedelta(days=1), time.min))
+    return start, end
+
+
+def build_daily_report(date=None):
+    """
+    Compute and store the report for one day.
+
+    The day's detections are aggregated after a detected_date range filter,
+    so only that day's rows are read through the index. The status figures
+    describe the whole table and come from one grouped query.
+    """
+    date = date or timezone.localdate()
+    start, end = day_bounds(date)
+
+    # The scans can run on the replica; only the report row goes to the primary
+    with read_from_replica():
+        detected = Wildfire.objects.filter(detected_date__gte=start, detected_date__lt=end).aggregate(
+            new_fires=Count("id"), new_hectares=Sum("size_hectares")
+        )
+        by_status = {
+            row["status"]: row
+            for row in Wildfire.objects.order_by()
+            .values("status")
+            .annotate(fires=Count("id"), hectares=Sum("size_hectares"))
+        }
+
+    active = by_status.get("ACTIVE", {})
+    report, _ = DailyReport.objects.update_or_create(
+        date=date,
+        defaults={
+            "active_fires": active.get("fires", 0),
+            "total_hectares": active.get("hectares") or 0,
+            "fires_by_status": {
+                status: by_status[status]["fires"] for status in STATUSES if status in by_status
+            },
+            "new_fires": detected["new_fires"],
+            "new_hectares": detected["new_hectares"] or 0,
+        },
+    )
+    return report
+
+
+def backfill_daily_reports(start_date, end_date):
+    """
+    Fill in detection figures for every day in [start_date, end_date].
+
+    All days come from one grouped query. Existing reports only have their
+    detection figures refreshed, so snapshots taken on the day are kept.
+
+    Returns:
+        int: Number of days written.
+    """
+    start, _ = day_bounds(start_date)
+    _, end = day_bounds(end_date)
+
+    rows = (
+        Wildfire.objects.filter(detected_date__gte=start, detected_date__lt=end)
+        .annotate(day=TruncDate("detected_date"))
+        .order_by()
+        .values("day")
+        .annotate(new_fires=Count("id"), new_hectares=Sum("size_hectares"))
+    )
+    with read_from_replica():
+        by_day = {row["day"]: row for row in rows}
+
+    reports = []
+    day = start_date
+    while day <= end_date:
+        row = by_day.get(day, {})
+        reports.append(
+            DailyReport(
+                date=day,
+                new_fires=row.get("new_fires", 0),
+                new_hectares=row.get("new_hectares") or 0,
+            )
+        )
+        day += timedelta(days=1)
+
+    DailyReport.objects.bulk_create(
+        reports,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["date"],
+        update_fields=["new_fires", "new_hectares", "updated_at"],
+    )
+
+    logger.info(f"Backfilled {len(reports)} daily reports from {start_date} to {end_date}")
+    return len(reports)
@@ -0,0 +1,240 @@
+"""
+Precompressed static snapshots of the hottest API responses.
+
+Between ingestions the active fires list, today's stats and the
+province-wide well clusters are the same for every client. After each
+ingestion they are rendered once, through the API views themselves so the
+bodies match the endpoints byte for byte, and written to SNAPSHOT_DIR with
+gzip and brotli variants. WhiteNoise serves that directory under
+SNAPSHOT_URL (see config.middleware), so these requests never reach a view
+or the database.
+
+Snapshot names carry a hash of their content and are cached forever by
+clients and CDNs. ``manifest.json`` maps each dataset to its current file
+and is revalidated on every request. Files are written under a temporary
+name and renamed into place, compressed variants first, so a reader never
+sees a partial file or a file without its variants.
+
+The manifest records the generations of the fire and well data it was
+rendered from, and the local date (today's stats change at midnight without
+any write). The web processes compare them with the current ones when the
+manifest is requested and rewrite stale snapshots themselves, so
+SNAPSHOT_DIR does not have to be a volume shared with the Celery workers.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.urls import resolve
+from django.utils import timezone
+
+from fires.services.generations import get_generation
+from fires.services.ingest import GENERATION as FIRES_GENERATION
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Dataset name -> API path whose response it snapshots
+DATASETS = {
+    "active-fires": "/api/v1/fires/active/",
+    "stats-today": "/api/v1/stats/today/",
+    "well-clusters": "/api/v1/energy-wells/clusters/",
+}
+
+# Older versions kept for clients still holding a previous manifest
+KEEP_VERSIONS = 3
+
+# Generation bumped after each wells import (see fires.signals)
+WELLS_GENERATION = "wells"
+
+# Generations of the data behind the snapshots
+SOURCE_GENERATIONS = (FIRES_GENERATION, WELLS_GENERATION)
+
+# Only one process rewrites stale snapshots at a time
+REFRESH_LOCK_KEY = "snapshots:refresh"
+REFRESH_LOCK_SECONDS = 300
+
+_VERSIONED_NAME = re.compile(r"^(?P<dataset>[a-z0-9-]+)\.[0-9a-f]{12}\.(?P<extension>json|geojson)$")
+
+
+def render_api(path):
+    """Body of a GET to one of the API endpoints, rendered in-process."""
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = path
+    request.META.update(
+        {"REQUEST_METHOD": "GET", "SERVER_NAME": "localhost", "SERVER_PORT": "80"}
+    )
+    match = resolve(path)
+    view = match.func
+    if iscoroutinefunction(view):
+        # The async versions of the endpoints (ASYNC_API_VIEWS)
+        view = async_to_sync(view)
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f"{path} answered {response.status_code}")
+    return response.content
+
+
+def active_fires_geojson(fires):
+    """GeoJSON FeatureCollection of the active fires list."""
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [fire["longitude"], fire["latitude"]]},
+            "properties": {
+                key: value for key, value in fire.items() if key not in ("latitude", "longitude")
+            },
+        }
+        for fire in fires
+    ]
+    return json.dumps(
+        {"type": "FeatureCollection", "features": features}, separators=(",", ":")
+    ).encode()
+
+
+def _write_atomic(path, data):
+    staging = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        with open(staging, "wb") as f:
+            f.write(data)
+        os.replace(staging, path)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+
+def write_file(root, dataset, extension, content):
+    """Write one versioned snapshot with its compressed variants; return its name."""
+    name = f"{dataset}.{hashlib.sha256(content).hexdigest()[:12]}.{extension}"
+    path = os.path.join(root, name)
+    if not os.path.exists(path):
+        _write_atomic(f"{path}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _write_atomic(f"{path}.br", brotli.compress(content))
+        _write_atomic(path, content)
+    return name
+
+
+def _prune(root, current):
+    """Remove all but the newest KEEP_VERSIONS files of each dataset."""
+    versions = {}
+    for name in os.listdir(root):
+        match = _VERSIONED_NAME.match(name)
+        if match and name not in current:
+            versions.setdefault(match.group("dataset", "extension"), []).append(name)
+    for names in versions.values():
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(root, name)), reverse=True)
+        for name in names[KEEP_VERSIONS - 1 :]:
+            for suffix in ("", ".gz", ".br"):
+                try:
+                    os.remove(os.path.join(root, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+
+def current_generations():
+    return {name: get_generation(name) for name in SOURCE_GENERATIONS}
+
+
+def is_stale(manifest):
+    """Whether the data or the local date changed since a manifest was written."""
+    return (
+        manifest is None
+        or manifest.get("generations") != current_generations()
+        or manifest.get("date") != timezone.localdate().isoformat()
+    )
+
+
+def read_manifest():
+    """The published manifest, or None when there is none yet."""
+    try:
+        with open(os.path.join(settings.SNAPSHOT_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_snapshots():
+    """
+    Render every dataset to SNAPSHOT_DIR and publish a new manifest.
+
+    Returns:
+        dict: The manifest, or None when SNAPSHOT_DIR is empty.
+    """
+    root = settings.SNAPSHOT_DIR
+    if not root:
+        return None
+    os.makedirs(root, exist_ok=True)
+    # Read first: a bump during rendering leaves the manifest stale, not
+    # falsely fresh
+    generations = current_generations()
+    date = timezone.localdate().isoformat()
+
+    files = {}
+    for dataset, path in DATASETS.items():
+        content = render_api(path)
+        files[dataset] = write_file(root, dataset, "json", content)
+        if dataset == "active-fires":
+            files["active-fires-geojson"] = write_file(
+                root, "active-fires", "geojson", active_fires_geojson(json.loads(content))
+            )
+
+    manifest = {
+        "generated": timezone.now().isoformat(),
+        "generations": generations,
+        "date": date,
+        "snapshots": {
+            dataset: {
+                "url": settings.SNAPSHOT_URL + name,
+                "bytes": os.path.getsize(os.path.join(root, name)),
+            }
+            for dataset, name in files.items()
+        },
+    }
+    _write_atomic(os.path.join(root, MANIFEST), json.dumps(manifest, indent=1).encode())
+    _prune(root, set(files.values()))
+    logger.info(f"Wrote {len(files)} snapshots to {root}")
+    return manifest
+
+
+def refresh_stale_snapshots():
+    """
+    Rewrite the snapshots when the data or the local date changed since the
+    manifest was written.
+
+    Returns:
+        dict: The new manifest, or None when the snapshots were current,
+        another process is rewriting them, or rendering failed (the
+        previous files stay in place).
+    """
+    if not settings.SNAPSHOT_DIR:
+        return None
+    if not is_stale(read_manifest()):
+        return None
+    if not cache.add(REFRESH_LOCK_KEY, True, REFRESH_LOCK_SECONDS):
+        return None
+    try:
+        return write_snapshots()
+    except Exception as e:
+        logger.error(f"Could not rewrite stale API snapshots: {e}")
+        return None
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
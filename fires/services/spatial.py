@@ -0,0 +1,146 @@
+import numpy as np
+from django.db.models import Q
+
+
+# Bits of precision per axis. 24 bits gives cells of about 2 m, and the
+# interleaved key (48 bits) fits comfortably in a BigIntegerField.
+KEY_BITS = 24
+_CELLS = 1 << KEY_BITS
+
+# Upper bound on cells enumerated when turning a bbox into key ranges
+MAX_BBOX_CELLS = 64
+
+
+def _to_cells(values, low, high):
+    """Quantize coordinates to integer cells along one axis."""
+    values = np.asarray(values, dtype=np.float64)
+    cells = np.floor((values - low) / (high - low) * _CELLS)
+    return np.clip(cells, 0, _CELLS - 1).astype(np.uint64)
+
+
+def _spread_bits(cells):
+    """Insert a zero bit between each of the low 32 bits of every value."""
+    x = np.asarray(cells, dtype=np.uint64)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x3333333333333333)
+    x = (x | (x << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return x
+
+
+def _interleave(x_cells, y_cells):
+    """Combine longitude and latitude cells into Z-order keys."""
+    return (_spread_bits(x_cells) | (_spread_bits(y_cells) << np.uint64(1))).astype(np.int64)
+
+
+def morton_keys(latitudes, longitudes):
+    """
+    Compute Z-order (Morton) keys for arrays of coordinates.
+
+    Nearby points share long key prefixes, so a single B-tree index on the
+    key can answer bounding box queries as a handful of range scans.
+    """
+    x_cells = _to_cells(longitudes, -180.0, 180.0)
+    y_cells = _to_cells(latitudes, -90.0, 90.0)
+    return _interleave(x_cells, y_cells)
+
+
+def morton_key(latitude, longitude):
+    """Compute the Z-order key of a single point, or None without coordinates."""
+    if latitude is None or longitude is None:
+        return None
+    return int(morton_keys([latitude], [longitude])[0])
+
+
+def bbox_key_ranges(south, west, north, east, max_cells=MAX_BBOX_CELLS):
+    """
+    Decompose a bounding box into a small set of inclusive key ranges.
+
+    The box is covered by the finest grid level that needs at most
+    ``max_cells`` cells; each cell is one contiguous key range, and touching
+    ranges are merged. The cover can be slightly larger than the box, so
+    callers still apply the exact latitude/longitude filter.
+
+    Returns:
+        list: Sorted (low, high) key tuples.
+    """
+    x0, x1 = (int(c) for c in _to_cells([west, east], -180.0, 180.0))
+    y0, y1 = (int(c) for c in _to_cells([south, north], -90.0, 90.0))
+    if x0 > x1 or y0 > y1:
+        return []
+
+    level = 0
+    while ((x1 >> level) - (x0 >> level) + 1) * ((y1 >> level) - (y0 >> level) + 1) > max_cells:
+        level += 1
+
+    cells_x = np.arange(x0 >> level, (x1 >> level) + 1, dtype=np.uint64) << np.uint64(level)
+    cells_y = np.arange(y0 >> level, (y1 >> level) + 1, dtype=np.uint64) << np.uint64(level)
+    grid_x, grid_y = np.meshgrid(cells_x, cells_y)
+    starts = np.sort(_interleave(grid_x.ravel(), grid_y.ravel()))
+    span = (1 << (2 * level)) - 1
+
+    ranges = []
+    for start in starts.tolist():
+        if ranges and start == ranges[-1][1] + 1:
+            ranges[-1][1] = start + span
+        else:
+            ranges.append([start, start + span])
+    return [tuple(r) for r in ranges]
+
+
+def filter_bbox(queryset, south, west, north, east):
+    """
+    Restrict a queryset of a model with ``spatial_key`` to a bounding box.
+
+    The key ranges let the database seek on the spatial_key index, and the
+    exact coordinate filter trims what the cell cover over-fetches.
+    """
+    ranges = Q()
+    for low, high in bbox_key_ranges(south, west, north, east):
+        ranges |= Q(spatial_key__gte=low, spatial_key__lte=high)
+
+    return queryset.filter(
+        ranges,
+        latitude__gte=south,
+        latitude__lte=north,
+        longitude__gte=west,
+        longitude__lte=east,
+    )
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle distance in km from one point to arrays of points."""
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(longitudes, dtype=np.float64) - longitude)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bearing_deg(latitude, longitude, latitudes, longitudes):
+    """Initial bearing in degrees clockwise from north, from one point to arrays of points."""
+    lat1 = np.radians(latitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    dlon = np.radians(np.asarray(longitudes, dtype=np.float64) - longitude)
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return (np.degrees(np.arctan2(x, y)) + 360.0) % 360.0
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """
+    Return the (south, west, north, east) box enclosing a circle around a point.
+
+    The longitude span is the circle's widest extent, which lies slightly
+    poleward of the centre, so no point within ``radius_km`` falls outside.
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = float(np.degrees(angle))
+    ratio = np.sin(angle) / max(np.cos(np.radians(latitude)), 1e-12)
+    dlon = 180.0 if ratio >= 1 else float(np.degrees(np.arcsin(ratio)))
+    return latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
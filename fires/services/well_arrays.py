@@ -0,0 +1,359 @@
+"""
+Compact in-memory arrays of the abandoned wells, shared across workers.
+
+A snapshot is a directory of .npy files (one per column) plus a labels file
+for the dictionary-encoded text columns. Snapshots are published by
+atomically replacing a CURRENT file that names the active version. Workers
+memory-map the arrays, so every process on the host shares one copy through
+the page cache. They re-check CURRENT at most once a second and switch to
+a new snapshot after a re-import without restarting.
+
+Requests only ever read CURRENT. Snapshots are built outside them: after a
+wells import or an admin edit (the wells_changed signal), at server start,
+and by the refresh_well_arrays task, which compares the snapshot with the
+wells table to catch changes made any other way.
+"""
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from fires.models import AbandonedWell
+
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+LABELS_FILE = "labels.json"
+
+# Seconds between checks of CURRENT for a newer snapshot
+CHECK_INTERVAL = 1.0
+
+# Only one process rebuilds a stale snapshot at a time
+REBUILD_LOCK_KEY = "well-arrays:rebuild"
+REBUILD_LOCK_SECONDS = 300
+
+# Old snapshot directories kept around for workers still mapping them
+KEEP_VERSIONS = 2
+
+# Dictionary-encoded text columns and the integer type of their codes
+ENCODED_COLUMNS = {"well_type": np.int16, "licensee": np.int32}
+
+
+class WellArrays:
+    """One loaded snapshot of the wells, ordered by well_id."""
+
+    def __init__(self, version, columns, labels, meta):
+        self.version = version
+        self.pk = columns["pk"]
+        self.latitude = columns["latitude"]
+        self.longitude = columns["longitude"]
+        self.spatial_key = columns["spatial_key"]
+        self.well_type = columns["well_type"]
+        self.licensee = columns["licensee"]
+        # Distinct licence numbers (upper-case, sorted) and their well counts
+        self.license_keys = columns.get("license_keys")
+        self.license_counts = columns.get("license_counts")
+        # Row indices in spatial key order, for range lookups on the keys
+        self.key_order = columns.get("key_order")
+        if self.key_order is None:
+            self.key_order = np.argsort(self.spatial_key, kind="stable")
+        self.sorted_keys = columns.get("sorted_keys")
+        if self.sorted_keys is None:
+            self.sorted_keys = self.spatial_key[self.key_order]
+        self.labels = labels
+        self.meta = meta
+
+    def __len__(self):
+        return len(self.pk)
+
+    def bbox_mask(self, south, west, north, east):
+        """Boolean mask of the wells inside a bounding box (edges included)."""
+        return (
+            (self.latitude >= south)
+            & (self.latitude <= north)
+            & (self.longitude >= west)
+            & (self.longitude <= east)
+        )
+
+    def key_range_rows(self, ranges):
+        """Row indices of the wells whose spatial key falls in any inclusive (low, high) range."""
+        if not ranges:
+            return np.empty(0, dtype=np.int64)
+        lows, highs = np.array(ranges, dtype=np.int64).T
+        starts = np.searchsorted(self.sorted_keys, lows, side="left")
+        ends = np.searchsorted(self.sorted_keys, highs, side="right")
+        return np.concatenate(
+            [self.key_order[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+        )
+
+    def grid_clusters(self, south, west, north, east, grid_size):
+        """Same output as api.v1.views.grid_clusters, computed from the arrays."""
+        rows = math.ceil((north - south) / grid_size)
+        columns = math.ceil((east - west) / grid_size)
+
+        mask = (
+            (self.latitude >= south)
+            & (self.latitude < south + rows * grid_size)
+            & (self.longitude >= west)
+            & (self.longitude < west + columns * grid_size)
+        )
+        row = np.floor((self.latitude[mask] - south) / grid_size).astype(np.int64)
+        column = np.floor((self.longitude[mask] - west) / grid_size).astype(np.int64)
+        # Guard against float rounding at the far edges
+        row = np.clip(row, 0, rows - 1)
+        column = np.clip(column, 0, columns - 1)
+
+        counts = np.bincount(row * columns + column, minlength=rows * columns)
+        clusters = []
+        for cell in np.flatnonzero(counts).tolist():
+            cell_row, cell_column = divmod(cell, columns)
+            clusters.append(
+                {
+                    "center": {
+                        "lat": south + cell_row * grid_size + grid_size / 2,
+                        "lng": west + cell_column * grid_size + grid_size / 2,
+                    },
+                    "count": int(counts[cell]),
+                }
+            )
+        return clusters
+
+    def summary(self, mask=None, top=5):
+        """Well count, top licensees and counts by type, optionally within a mask."""
+        well_types = self.well_type if mask is None else self.well_type[mask]
+        licensees = self.licensee if mask is None else self.licensee[mask]
+
+        type_counts = np.bincount(well_types, minlength=len(self.labels["well_type"]))
+        licensee_counts = np.bincount(licensees, minlength=len(self.labels["licensee"]))
+        top_codes = np.argsort(-licensee_counts, kind="stable")[:top]
+
+        return {
+            "total": int(len(well_types)),
+            "top_licensees": [
+                {"licensee": self.labels["licensee"][code], "count": int(licensee_counts[code])}
+                for code in top_codes.tolist()
+                if licensee_counts[code]
+            ],
+            "by_type": {
+                self.labels["well_type"][code]: int(type_counts[code])
+                for code in np.flatnonzero(type_counts).tolist()
+            },
+        }
+
+
+def _snapshot_root():
+    return settings.WELL_ARRAYS_DIR
+
+
+def _read_current():
+    try:
+        with open(os.path.join(_snapshot_root(), CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _read_meta(version):
+    with open(os.path.join(_snapshot_root(), version, LABELS_FILE)) as f:
+        return json.load(f)["meta"]
+
+
+def _load(version):
+    path = os.path.join(_snapshot_root(), version)
+    with open(os.path.join(path, LABELS_FILE)) as f:
+        stored = json.load(f)
+    columns = {
+        name[:-4]: np.load(os.path.join(path, name), mmap_mode="r")
+        for name in os.listdir(path)
+        if name.endswith(".npy")
+    }
+    return WellArrays(version, columns, stored["labels"], stored["meta"])
+
+
+def data_fingerprint():
+    """Cheap summary of the wells table used to tell whether a snapshot is stale."""
+    summary = AbandonedWell.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+    updated = summary["updated"].isoformat() if summary["updated"] else ""
+    return f"{summary['count']}:{updated}"
+
+
+def _columns_from_queryset(queryset):
+    """Array columns and encoding labels for the wells of a queryset, by well_id."""
+    rows = queryset.order_by("well_id").values_list(
+        "id", "latitude", "longitude", "spatial_key", "well_type", "licensee", "license_number"
+    )
+    pks, latitudes, longitudes, keys, well_types, licensees, licenses = [], [], [], [], [], [], []
+    for pk, lat, lon, key, well_type, licensee, license_number in rows.iterator(chunk_size=20000):
+        pks.append(pk)
+        latitudes.append(lat)
+        longitudes.append(lon)
+        keys.append(key if key is not None else -1)
+        well_types.append(well_type)
+        licensees.append(licensee)
+        licenses.append(license_number.strip().upper())
+
+    columns = {
+        "pk": np.array(pks, dtype=np.int64),
+        "latitude": np.array(latitudes, dtype=np.float64),
+        "longitude": np.array(longitudes, dtype=np.float64),
+        "spatial_key": np.array(keys, dtype=np.int64),
+    }
+    labels = {}
+    for name, values in (("well_type", well_types), ("licensee", licensees)):
+        # Sorted labels, so codes follow alphabetical order
+        uniques, codes = np.unique(np.array(values, dtype=str), return_inverse=True)
+        labels[name] = uniques.tolist()
+        columns[name] = codes.astype(ENCODED_COLUMNS[name])
+
+    license_keys, license_counts = np.unique(np.array(licenses, dtype=str), return_counts=True)
+    columns["license_keys"] = license_keys
+    columns["license_counts"] = license_counts.astype(np.int32)
+
+    columns["key_order"] = np.argsort(columns["spatial_key"], kind="stable")
+    columns["sorted_keys"] = columns["spatial_key"][columns["key_order"]]
+    return columns, labels
+
+
+def arrays_from_queryset(queryset):
+    """Build in-memory arrays for a subset of wells, without publishing a snapshot."""
+    columns, labels = _columns_from_queryset(queryset)
+    return WellArrays(None, columns, labels, {})
+
+
+def build_snapshot():
+    """
+    Build a new snapshot from the database and make it current.
+
+    Returns:
+        str: The new version stamp.
+    """
+    started = time.perf_counter()
+    fingerprint = data_fingerprint()
+
+    columns, labels = _columns_from_queryset(AbandonedWell.objects.all())
+    count = len(columns["pk"])
+
+    root = _snapshot_root()
+    os.makedirs(root, exist_ok=True)
+    version = f"{time.time_ns()}-{count}"
+    staging = os.path.join(root, f".{version}.tmp")
+    os.makedirs(staging)
+    for name, array in columns.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+    with open(os.path.join(staging, LABELS_FILE), "w") as f:
+        json.dump({"labels": labels, "meta": {"fingerprint": fingerprint}}, f)
+    os.rename(staging, os.path.join(root, version))
+
+    # Publish atomically, then drop snapshots nobody should still be loading
+    pointer = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(pointer, "w") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+    _prune(root, version)
+
+    logger.info(
+        f"Built well arrays snapshot {version} ({count} wells) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return version
+
+
+def _prune(root, current):
+    versions = sorted(
+        (name for name in os.listdir(root) if not name.startswith(".") and name != CURRENT_FILE),
+        key=lambda name: int(name.split("-")[0]),
+    )
+    for name in versions[:-KEEP_VERSIONS]:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+
+def refresh_well_arrays():
+    """
+    Rebuild the snapshot if the wells table changed since it was taken.
+
+    Never called from a request: it runs a query over the whole table and
+    possibly a full rebuild.
+
+    Returns:
+        str: The current version, or None when another process is
+        already rebuilding.
+    """
+    fingerprint = data_fingerprint()
+    version = _read_current()
+    if version is not None:
+        try:
+            if _read_meta(version).get("fingerprint") == fingerprint:
+                return version
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read well arrays snapshot {version}: {e}")
+
+    # Workers keep serving the stale snapshot until the new one is published
+    if not cache.add(REBUILD_LOCK_KEY, True, REBUILD_LOCK_SECONDS):
+        return None
+    try:
+        logger.info(f"Well arrays snapshot {version} is stale, rebuilding")
+        return build_snapshot()
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+
+
+def get_well_arrays():
+    """
+    Return the current snapshot for this process, or None if none is built.
+
+    Picks up a newly published snapshot within CHECK_INTERVAL seconds. Only
+    reads the snapshot directory, never the database.
+    """
+    global _snapshot, _checked_at
+
+    now = time.monotonic()
+    if _snapshot is not None and now - _checked_at < CHECK_INTERVAL:
+        return _snapshot
+
+    with _lock:
+        _checked_at = now
+        version = _read_current()
+        if version is None:
+            _snapshot = None
+        elif _snapshot is None or _snapshot.version != version:
+            try:
+                _snapshot = _load(version)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Could not load well arrays snapshot {version}: {e}")
+        return _snapshot
+
+
+def prewarm_well_arrays():
+    """
+    Make sure a fresh snapshot exists and is mapped into this process.
+
+    Run at server start, before workers fork. A snapshot is only rebuilt
+    when the wells table changed since it was taken.
+    """
+    global _checked_at
+
+    refresh_well_arrays()
+    # Load what refresh_well_arrays published, not a snapshot checked earlier
+    _checked_at = 0.0
+    arrays = get_well_arrays()
+
+    if arrays is not None:
+        # Touch the pages so the first request does not pay for the disk reads
+        for column in (arrays.latitude, arrays.longitude, arrays.well_type, arrays.licensee):
+            np.sum(column)
+    return arrays
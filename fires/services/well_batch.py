@@ -0,0 +1,115 @@
+"""
+Answer several map viewports of wells in one pass.
+
+The wells in the union of all bboxes are selected once, from the shared
+well arrays when a snapshot is loaded or with a single query otherwise.
+Each viewport is then filtered out of that candidate set in memory. The
+attributes of every selected well are fetched once, however many viewports
+it appears in.
+"""
+import logging
+
+import numpy as np
+
+from fires.models import AbandonedWell
+from fires.services.well_arrays import arrays_from_queryset, get_well_arrays
+
+
+logger = logging.getLogger(__name__)
+
+# Keeps pk__in lists under SQLite's bound parameter limit
+FETCH_CHUNK_SIZE = 900
+
+
+def _union_bbox(viewports):
+    return (
+        min(v["south"] for v in viewports),
+        min(v["west"] for v in viewports),
+        max(v["north"] for v in viewports),
+        max(v["east"] for v in viewports),
+    )
+
+
+def _fetch_rows(pks, fields):
+    """Requested fields of the given wells, keyed by pk."""
+    rows = {}
+    pks = sorted(pks)
+    for start in range(0, len(pks), FETCH_CHUNK_SIZE):
+        chunk = pks[start : start + FETCH_CHUNK_SIZE]
+        for row in AbandonedWell.objects.filter(pk__in=chunk).values("pk", *fields):
+            rows[row.pop("pk")] = row
+    return rows
+
+
+def query_viewports(viewports):
+    """
+    Wells and optional stats for each viewport.
+
+    Args:
+        viewports (list): Validated ViewportSerializer data.
+
+    Returns:
+        list: One dict per viewport with its bbox, the number of wells in it,
+        up to ``limit`` wells (ordered by well_id, like the list endpoint)
+        and, when asked for, the same stats as the stats endpoint.
+    """
+    union = _union_bbox(viewports)
+
+    arrays = get_well_arrays()
+    if arrays is None:
+        south, west, north, east = union
+        arrays = arrays_from_queryset(
+            AbandonedWell.objects.filter(
+                latitude__gte=south,
+                latitude__lte=north,
+                longitude__gte=west,
+                longitude__lte=east,
+            )
+        )
+
+    candidates = np.flatnonzero(arrays.bbox_mask(*union))
+    latitudes = arrays.latitude[candidates]
+    longitudes = arrays.longitude[candidates]
+
+    selections = []
+    wanted = set()
+    for viewport in viewports:
+        inside = candidates[
+            (latitudes >= viewport["south"])
+            & (latitudes <= viewport["north"])
+            & (longitudes >= viewport["west"])
+            & (longitudes <= viewport["east"])
+        ]
+        pks = arrays.pk[inside[: viewport["limit"]]].tolist()
+        wanted.update(pks)
+        selections.append((inside, pks))
+
+    fields = sorted({field for viewport in viewports for field in viewport["fields"]})
+    rows = _fetch_rows(wanted, fields)
+
+    results = []
+    for viewport, (inside, pks) in zip(viewports, selections):
+        result = {
+            "bbox": [viewport["south"], viewport["west"], viewport["north"], viewport["east"]],
+            "count": len(inside),
+            "wells": [
+                {field: rows[pk][field] for field in viewport["fields"]}
+                for pk in pks
+                # A well deleted since the snapshot was taken is skipped
+                if pk in rows
+            ],
+        }
+        if viewport["stats"]:
+            summary = arrays.summary(inside)
+            result["stats"] = {
+                "total_wells": summary["total"],
+                "top_licensees": summary["top_licensees"],
+                "wells_by_type": summary["by_type"],
+            }
+        results.append(result)
+
+    logger.debug(
+        f"Answered {len(viewports)} viewports from {len(candidates)} candidate wells, "
+        f"fetching {len(rows)} rows"
+    )
+    return results
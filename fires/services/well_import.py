@@ -0,0 +1,157 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from config.routers import pin_primary
+from fires.models import AbandonedWell
+
+
+logger = logging.getLogger(__name__)
+
+# Shapefile column -> model field for the text attributes
+TEXT_COLUMNS = {
+    "license_number": "LICENCE_NO",
+    "well_name": "WELL_NAME",
+    "well_type": "WELL_TYPE",
+    "licensee": "LICENSEE",
+    "surface_location": "SURFACE_LO",
+}
+
+# Shapefile column -> model field for the numeric attributes
+NUMERIC_COLUMNS = {
+    "ground_elevation": "GROUND_ELE",
+    "total_depth": "TOTAL_DEPT",
+}
+
+# Fields that make up a well's content hash
+HASHED_FIELDS = [
+    "well_id",
+    "latitude",
+    "longitude",
+    *TEXT_COLUMNS,
+    *NUMERIC_COLUMNS,
+]
+
+# Fields rewritten when a well's content changes
+UPDATE_FIELDS = [field for field in HASHED_FIELDS if field != "well_id"] + [
+    "content_hash",
+    "updated_at",
+]
+
+
+def build_well_frame(gdf):
+    """
+    Map a WGS84 wells GeoDataFrame to model fields, column by column.
+
+    Rows without a geometry are dropped. If a well_id appears more than once
+    the last row wins, as it did with update_or_create.
+
+    Returns:
+        tuple: (DataFrame of model fields with a content_hash column,
+        number of rows skipped for having no geometry).
+    """
+    has_geometry = gdf.geometry.notna() & ~gdf.geometry.is_empty
+    skipped = int((~has_geometry).sum())
+    gdf = gdf[has_geometry]
+
+    frame = pd.DataFrame(index=gdf.index)
+    if "WELL_ID" in gdf.columns:
+        frame["well_id"] = gdf["WELL_ID"].astype(str)
+    else:
+        frame["well_id"] = "UNK-" + gdf.index.astype(str)
+
+    # Rounded so reprojection noise does not show up as a change
+    frame["latitude"] = gdf.geometry.y.round(7)
+    frame["longitude"] = gdf.geometry.x.round(7)
+
+    for field, column in TEXT_COLUMNS.items():
+        if column in gdf.columns:
+            frame[field] = gdf[column].fillna("").astype(str)
+        else:
+            frame[field] = ""
+
+    for field, column in NUMERIC_COLUMNS.items():
+        if column in gdf.columns:
+            values = pd.to_numeric(gdf[column], errors="coerce")
+            # Zero means "not recorded" in the AER data
+            frame[field] = values.where(values != 0)
+        else:
+            frame[field] = np.nan
+
+    frame = frame.drop_duplicates("well_id", keep="last").reset_index(drop=True)
+
+    frame["content_hash"] = content_hashes(frame)
+    return frame, skipped
+
+
+def content_hashes(frame):
+    """Hash the source attributes of every row into a 16 character hex string."""
+    hashes = pd.util.hash_pandas_object(frame[HASHED_FIELDS], index=False)
+    return hashes.map("{:016x}".format)
+
+
+def existing_well_frame():
+    """Load the pk, well_id and content hash of every stored well."""
+    rows = AbandonedWell.objects.order_by().values_list("id", "well_id", "content_hash")
+    return pd.DataFrame.from_records(
+        rows.iterator(chunk_size=10000), columns=["id", "well_id", "content_hash"]
+    )
+
+
+def diff_wells(frame, existing):
+    """
+    Compare an imported frame against the stored wells.
+
+    Returns:
+        tuple: (new rows, changed rows with their stored ``id``, well_ids
+        of removed wells).
+    """
+    merged = frame.merge(
+        existing.rename(columns={"content_hash": "stored_hash"}),
+        on="well_id",
+        how="outer",
+        indicator=True,
+    )
+
+    new = merged[merged["_merge"] == "left_only"]
+    both = merged[merged["_merge"] == "both"]
+    changed = both[both["content_hash"] != both["stored_hash"]]
+    removed = merged.loc[merged["_merge"] == "right_only", "well_id"]
+
+    columns = list(frame.columns)
+    return new[columns], changed[columns + ["id"]], removed.tolist()
+
+
+def _to_wells(frame, with_pk=False):
+    """Build unsaved AbandonedWell objects from a frame."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    wells = []
+    for record in frame.to_dict("records"):
+        pk = record.pop("id", None)
+        well = AbandonedWell(**record)
+        if with_pk:
+            well.pk = int(pk)
+        wells.append(well)
+    return wells
+
+
+def apply_well_diff(new, changed, removed, batch_size=2000):
+    """Write only the delta: insert new wells, update changed, delete removed."""
+    if len(new):
+        AbandonedWell.objects.bulk_create(_to_wells(new), batch_size=batch_size)
+
+    if len(changed):
+        # bulk_update does not apply auto_now, so stamp the rows here
+        now = timezone.now()
+        wells = _to_wells(changed, with_pk=True)
+        for well in wells:
+            well.updated_at = now
+        AbandonedWell.objects.bulk_update(wells, UPDATE_FIELDS, batch_size=batch_size // 2)
+
+    for start in range(0, len(removed), batch_size):
+        AbandonedWell.objects.filter(well_id__in=removed[start : start + batch_size]).delete()
+
+    if len(new) or len(changed) or len(removed):
+        pin_primary()
@@ -0,0 +1,36 @@
+from django.dispatch import Signal, receiver
+
+
+# Sent after a wells import commits, with the well_id lists that were
+# ``created``, ``updated`` and ``removed`` so caches and indexes can refresh
+# only what changed.
+wells_changed = Signal()
+
+
+@receiver(wells_changed)
+def refresh_exposures_for_wells(sender, created=(), updated=(), removed=(), **kwargs):
+    """Re-run the exposure join for the fires near wells that were added or moved."""
+    # Removed wells take their exposures with them via the cascade
+    if created or updated:
+        from fires.services.exposure import refresh_exposures_for_wells
+
+        refresh_exposures_for_wells([*created, *updated])
+
+
+@receiver(wells_changed)
+def rebuild_well_arrays(sender, created=(), updated=(), removed=(), **kwargs):
+    """Publish a fresh well arrays snapshot; workers pick it up on their next request."""
+    if created or updated or removed:
+        from fires.services.well_arrays import build_snapshot
+
+        build_snapshot()
+
+
+@receiver(wells_changed)
+def bump_wells_generation(sender, created=(), updated=(), removed=(), **kwargs):
+    """Mark the snapshots built from the wells stale; the web rewrites them."""
+    if created or updated or removed:
+        from fires.services.generations import bump_generation
+        from fires.services.snapshots import WELLS_GENERATION
+
+        bump_generation(WELLS_GENERATION)
@@ -1,63 +1,184 @@
 from celery import shared_task
-from django.core.management import call_command
 from django.utils import timezone
 from django.core.cache import cache
+from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+FETCH_LOCK_KEY = "fetch_fires_lock"
+
+
 @shared_task(name="fetch_latest_fires")
-def fetch_latest_fires():
+def fetch_latest_fires(days=2):
     """
     Fetch latest fire data from FIRMS API.
     This task should run every 2-4 hours.
+
+    Downloads and parses the data here, then fans it out as chunks to
+    ingest_fire_chunk tasks that run in parallel on the workers. A chord
+    callback (finalize_fire_ingest) runs the post-processing once every
+    chunk is saved and releases the lock.
     """
+    from celery import chord
+
+    from fires.services.firms_services import FIRMSService
+    from fires.services.ingest import chunk_detections, start_progress
+
+    job_id = None
     try:
-        # Prevent multiple simultaneous fetches
-        lock_key = "fetch_fires_lock"
-        if cache.get(lock_key):
+        # Prevent multiple simultaneous fetches; the lock outlives this
+        # task and is released by the chord callback
+        if not cache.add(FETCH_LOCK_KEY, True, settings.FIRE_INGEST_LOCK_SECONDS):
             logger.info("Fire fetch already in progress, skipping...")
             return "Skipped - already running"
 
-        # Set lock for 10 minutes
-        cache.set(lock_key, True, 600)
-
         logger.info("Starting scheduled fire data fetch...")
 
         # Fetch last 2 days of data to ensure we don't miss anything
-        call_command("fetch_firms_data", days=2)
+        service = FIRMSService()
+        firms_data = service.fetch_active_fires(days_back=days)
+        if not firms_data:
+            cache.delete(FETCH_LOCK_KEY)
+            logger.info("No fire data retrieved from FIRMS")
+            return "Success - no data"
+
+        chunks = chunk_detections(service, firms_data)
+        job_id = start_progress(len(chunks), len(firms_data))
 
-        # Clear the lock
-        cache.delete(lock_key)
+        callback = finalize_fire_ingest.s(job_id).on_error(fail_fire_ingest.si(job_id))
+        chord(ingest_fire_chunk.s(job_id, chunk) for chunk in chunks)(callback)
 
-        logger.info("Scheduled fire data fetch completed")
-        return f"Success - fetched at {timezone.now()}"
+        logger.info(f"Dispatched {len(firms_data)} detections in {len(chunks)} chunks (job {job_id})")
+        return job_id
 
     except Exception as e:
         logger.error(f"Error in scheduled fire fetch: {e}")
-        cache.delete(lock_key)
+        if job_id:
+            # Chords run inline (eager) raise here instead of calling the
+            # error callback
+            fail_fire_ingest(job_id)
+        else:
+            cache.delete(FETCH_LOCK_KEY)
+        raise
+
+
+@shared_task(name="ingest_fire_chunk")
+def ingest_fire_chunk(job_id, firms_data):
+    """Transform and upsert one chunk of FIRMS rows."""
+    from fires.services.firms_services import FIRMSService
+    from fires.services.ingest import record_chunk, save_fire_detections
+
+    result = save_fire_detections(FIRMSService(), firms_data)
+    record_chunk(job_id, result)
+    return result
+
+
+@shared_task(name="finalize_fire_ingest")
+def finalize_fire_ingest(results, job_id):
+    """Chord callback: refresh derived data once all chunks are saved."""
+    from fires.services.ingest import finish_progress, run_post_ingest
+
+    try:
+        run_post_ingest(results)
+        finish_progress(job_id, "SUCCESS")
+        logger.info(f"Fire ingest {job_id} completed")
+        return {
+            "job_id": job_id,
+            "created": sum(result["created"] for result in results),
+            "updated": sum(result["updated"] for result in results),
+            "errors": sum(result["errors"] for result in results),
+        }
+    except Exception as e:
+        finish_progress(job_id, "FAILURE", str(e))
         raise
+    finally:
+        cache.delete(FETCH_LOCK_KEY)
+
+
+@shared_task(name="fail_fire_ingest")
+def fail_fire_ingest(job_id):
+    """Error callback of the chord: a chunk or the callback itself failed."""
+    from fires.services.ingest import finish_progress, get_progress
+
+    # A failing callback has already recorded its own error
+    progress = get_progress(job_id)
+    if progress is None or progress["state"] == "RUNNING":
+        finish_progress(job_id, "FAILURE", "A chunk failed")
+    cache.delete(FETCH_LOCK_KEY)
+
+
+@shared_task(name="update_fire_lifecycle")
+def update_fire_lifecycle():
+    """
+    Age fires that are no longer re-detected to CONTAINED, then OUT.
+    This task should run hourly.
+    """
+    from fires.services.events import publish_fire_changes
+    from fires.services.exposure import drop_inactive_exposures
+    from fires.services.generations import bump_generation
+    from fires.services.ingest import GENERATION, refresh_snapshots
+    from fires.services.lifecycle import age_fires
+
+    result = age_fires()
+    if result["changed_ids"]:
+        drop_inactive_exposures()
+        bump_generation(GENERATION)
+        refresh_snapshots()
+        publish_fire_changes(status_changed=result["changed_ids"])
+    return {"incidents": result["incidents"], "detections": result["detections"]}
+
+
+@shared_task(name="refresh_well_arrays")
+def refresh_well_arrays():
+    """
+    Rebuild the well arrays snapshot if wells changed without a rebuild,
+    e.g. from a shell or another host. Imports and admin edits rebuild it
+    themselves. This task should run every few minutes.
+    """
+    from fires.services.well_arrays import refresh_well_arrays as refresh
+
+    return refresh()
 
 
 @shared_task(name="cleanup_old_fires")
-def cleanup_old_fires():
+def cleanup_old_fires(days=30, batch_size=None, pause=None, archive=None):
     """
-    Clean up fires older than 30 days that are marked as 'OUT'.
+    Clean up fires older than 30 days (by default) that are marked as 'OUT'.
+    Rows are deleted in bounded primary-key batches so the table is never
+    locked for long. When FIRE_ARCHIVE_DIR is set (or archive=True) the rows
+    are exported to a gzip CSV there (var/archive if it is empty) before they
+    are removed, and each deleted fire leaves a tombstone for the change feed.
     This task should run daily.
     """
     from fires.models import Wildfire
+    from fires.services.changes import prune_tombstones, record_tombstones
+    from fires.services.cleanup import archive_path_for, delete_in_batches
     from datetime import timedelta
 
     try:
-        cutoff_date = timezone.now() - timedelta(days=30)
+        cutoff_date = timezone.now() - timedelta(days=days)
 
-        # Delete old fires that are out
-        deleted_count = Wildfire.objects.filter(
-            status="OUT", last_updated__lt=cutoff_date
-        ).delete()[0]
+        if archive is None:
+            archive = bool(settings.FIRE_ARCHIVE_DIR)
+        archive_path = archive_path_for("wildfires") if archive else None
 
-        logger.info(f"Cleaned up {deleted_count} old fire records")
+        # Delete old fires that are out
+        deleted_count = delete_in_batches(
+            Wildfire.objects.filter(status="OUT", last_updated__lt=cutoff_date).exclude(
+                data_source__in=settings.FIRE_CLEANUP_KEEP_SOURCES
+            ),
+            batch_size=batch_size,
+            pause=pause,
+            archive_path=archive_path,
+            before_delete=record_tombstones,
+        )
+        pruned = prune_tombstones()
+
+        if archive_path and deleted_count:
+            logger.info(f"Archived deleted fires to {archive_path}")
+        logger.info(f"Cleaned up {deleted_count} old fire records and {pruned} expired tombstones")
         return f"Deleted {deleted_count} old fires"
 
     except Exception as e:
@@ -68,33 +189,18 @@ def cleanup_old_fires():
 @shared_task(name="generate_daily_report")
 def generate_daily_report():
     """
-    Generate daily statistics report.
+    Generate daily statistics report and store it as a DailyReport.
     This task should run once per day.
     """
-    from fires.models import Wildfire
-    from django.db.models import Count, Sum
+    from fires.api.serializers import DailyReportSerializer
+    from fires.services.reports import build_daily_report
 
     try:
-        stats = {
-            "date": timezone.now().date(),
-            "active_fires": Wildfire.objects.filter(status="ACTIVE").count(),
-            "total_hectares": Wildfire.objects.filter(status="ACTIVE").aggregate(
-                Sum("size_hectares")
-            )["size_hectares__sum"]
-            or 0,
-            "new_fires_today": Wildfire.objects.filter(
-                detected_date__date=timezone.now().date()
-            ).count(),
-            "fires_by_status": dict(
-                Wildfire.objects.values("status")
-                .annotate(count=Count("id"))
-                .values_list("status", "count")
-            ),
-        }
+        report = build_daily_report()
+        stats = DailyReportSerializer(report).data
 
         logger.info(f"Daily report: {stats}")
 
-        # You could email this, save to a model, or send to a monitoring service
         return stats
 
     except Exception as e:
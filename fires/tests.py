@@ -1,3 +1,1233 @@
-from django.test import TestCase
+import asyncio
+import csv
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+import gzip
+from io import StringIO
+import json
+from multiprocessing import get_context
+import os
+import random
+import shutil
+import tempfile
+from unittest import mock
+import zipfile
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.v1.async_views import FireEventsView
+from config.celery import app as celery_app
+from fires.api.serializers import WellBatchQuerySerializer
+from config.routers import pin_primary
+from fires.models import (
+    AbandonedWell,
+    DailyReport,
+    FireIncident,
+    FireWellExposure,
+    Wildfire,
+    WildfireTombstone,
+)
+from fires.services import well_arrays
+from fires.services.autocomplete import autocomplete
+from fires.services.backfill import (
+    ARCHIVE_SOURCE,
+    INSERT_FIELDS,
+    BackfillState,
+    backfill_file,
+    ordered_rows,
+    worker_pool,
+)
+from fires.services.cleanup import delete_in_batches
+from fires.services.changes import (
+    InvalidCursor,
+    changes_since,
+    current_cursor,
+    decode_cursor,
+    encode_cursor,
+)
+from fires.services.firms_services import FIRMSService
+from fires.services.geometry_query import parse_geometry, wells_within
+from fires.services.incidents import refresh_incidents, update_incidents
+from fires.services import snapshots
+from fires.services.events import BACKLOG, Event, EventHub
+from fires.services.exposure import drop_inactive_exposures, refresh_exposures
+from fires.services.generations import bump_generation
+from fires.services import nearest
+from fires.services.lifecycle import age_fires
+from fires.services.nearest import nearest_wells
+from fires.services.well_batch import query_viewports
+from fires.services.reports import backfill_daily_reports, build_daily_report, day_bounds
+from fires.services.spatial import KEY_BITS, bbox_key_ranges, filter_bbox, haversine_km
+from fires.services.ingest import chunk_detections, get_progress, save_fire_detections
+from fires.tasks import FETCH_LOCK_KEY, cleanup_old_fires, fetch_latest_fires
+
+
+def firms_row(latitude, longitude, acq_date="2026-07-01", acq_time="1200"):
+    return {
+        "latitude": f"{latitude:.4f}",
+        "longitude": f"{longitude:.4f}",
+        "scan": "0.4",
+        "track": "0.4",
+        "acq_date": acq_date,
+        "acq_time": acq_time,
+        "confidence": "n",
+        "region": "AB",
+    }
+
+
+@override_settings(FIRE_INGEST_CHUNK_SIZE=2, SNAPSHOT_DIR="")
+class FetchLatestFiresTests(TestCase):
+    """The ingestion chord, run inline as with CELERY_TASK_ALWAYS_EAGER."""
+
+    rows = [firms_row(54.0 + i * 0.1, -115.0 - i * 0.1) for i in range(5)]
+
+    def setUp(self):
+        cache.clear()
+        # The Celery app reads Django settings under their CELERY_ names
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.CELERY_TASK_ALWAYS_EAGER = True
+        self.addCleanup(setattr, celery_app.conf, "CELERY_TASK_ALWAYS_EAGER", eager)
+        patcher = mock.patch(
+            "fires.services.firms_services.FIRMSService.fetch_active_fires",
+            return_value=self.rows,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chunks_are_saved_and_counted(self):
+        job_id = fetch_latest_fires()
+
+        progress = get_progress()
+        self.assertEqual(progress["job_id"], job_id)
+        self.assertEqual(progress["state"], "SUCCESS")
+        self.assertEqual(progress["total_chunks"], 3)
+        self.assertEqual(progress["done_chunks"], 3)
+        self.assertEqual(progress["detections"], 5)
+        self.assertEqual(progress["created"], 5)
+        self.assertEqual(Wildfire.objects.count(), 5)
+        # The callback released the lock
+        self.assertTrue(cache.add(FETCH_LOCK_KEY, True))
+
+    def test_failed_chunk_marks_the_job_failed(self):
+        with mock.patch(
+            "fires.services.ingest.save_fire_detections", side_effect=RuntimeError("boom")
+        ):
+            with self.assertRaises(RuntimeError):
+                fetch_latest_fires()
+
+        progress = get_progress()
+        self.assertEqual(progress["state"], "FAILURE")
+        self.assertEqual(progress["error"], "A chunk failed")
+        self.assertEqual(progress["done_chunks"], 0)
+        self.assertTrue(cache.add(FETCH_LOCK_KEY, True))
+
+    def test_running_fetch_is_skipped(self):
+        cache.add(FETCH_LOCK_KEY, True)
+        self.assertEqual(fetch_latest_fires(), "Skipped - already running")
+        self.assertFalse(Wildfire.objects.exists())
+
+
+class SaveFireDetectionsTests(TestCase):
+    rows = [firms_row(54.0, -115.0), firms_row(54.1, -115.1)]
+
+    def save(self, rows):
+        return save_fire_detections(FIRMSService(), rows)
+
+    def test_unchanged_detections_are_not_written_again(self):
+        first = self.save(self.rows)
+        self.assertEqual((first["created"], first["updated"]), (2, 0))
+        stamps = dict(Wildfire.objects.values_list("fire_id", "last_updated"))
+
+        again = self.save(self.rows)
+
+        self.assertEqual((again["created"], again["updated"], again["unchanged"]), (0, 0, 2))
+        self.assertEqual((again["changed_ids"], again["updated_ids"]), ([], []))
+        self.assertEqual(dict(Wildfire.objects.values_list("fire_id", "last_updated")), stamps)
+
+    def test_changed_detection_is_updated(self):
+        self.save(self.rows)
+        fire = Wildfire.objects.get(fire_id__startswith="FIRMS-2026-07-01-54.000")
+        Wildfire.objects.filter(pk=fire.pk).update(status="CONTAINED")
+        grown = dict(self.rows[0], scan="0.8")
+
+        result = self.save([grown, self.rows[1]])
+
+        self.assertEqual((result["updated"], result["unchanged"]), (1, 1))
+        self.assertEqual(result["updated_ids"], [fire.pk])
+        # Same location, so nothing to re-cluster
+        self.assertEqual(result["changed_ids"], [])
+        updated = Wildfire.objects.get(pk=fire.pk)
+        self.assertEqual(updated.size_hectares, 0.04)
+        self.assertGreater(updated.last_updated, fire.last_updated)
+        # The lifecycle owns the status of stored fires
+        self.assertEqual(updated.status, "CONTAINED")
+
+    def test_repeated_detection_in_one_fetch_is_created_once(self):
+        result = self.save([self.rows[0], self.rows[0]])
+        self.assertEqual((result["created"], result["unchanged"], result["errors"]), (1, 1, 0))
+        self.assertEqual(Wildfire.objects.count(), 1)
+
+
+@override_settings(FIRE_CHANGES_LAG_SECONDS=0, FIRE_TOMBSTONE_DAYS=30)
+class ChunkDetectionsTests(TestCase):
+    def test_rows_of_one_fire_share_a_chunk(self):
+        rows = [
+            firms_row(54.0, -115.0),
+            firms_row(55.0, -116.0),
+            {"acq_date": "2026-07-01"},
+            firms_row(54.0, -115.0, acq_time="1300"),
+        ]
+
+        with mock.patch.object(
+            FIRMSService, "transform_to_wildfire_model", side_effect=AssertionError
+        ):
+            chunks = chunk_detections(FIRMSService(), rows, chunk_size=2)
+
+        self.assertEqual(chunks, [[rows[0], rows[3]], [rows[1], rows[2]]])
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.start = timezone.now() - timedelta(hours=2)
+
+    def add_fire(self, fire_id, updated, **fields):
+        fire = Wildfire.objects.create(
+            fire_id=fire_id, latitude=54.0, longitude=-115.0, region="AB", **fields
+        )
+        # auto_now only applies to save()
+        Wildfire.objects.filter(pk=fire.pk).update(created_at=updated, last_updated=updated)
+        return fire
+
+    def fire_ids(self, page):
+        return [fire["fire_id"] for fire in page["created"] + page["updated"]]
+
+    def test_cursor_round_trip(self):
+        moment = timezone.now().replace(microsecond=123456)
+        cursor = encode_cursor(moment, 42, 7)
+        self.assertEqual(decode_cursor(cursor), (moment, 42, 7))
+
+    def test_invalid_cursor(self):
+        for cursor in ("", "abc", "1-2", "1-2-3-4", "1-x-3"):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_pages_split_ties_on_id(self):
+        tied = self.start + timedelta(minutes=30)
+        for index in range(5):
+            self.add_fire(f"TIED-{index}", tied)
+        self.add_fire("LATER", tied + timedelta(minutes=1))
+
+        seen = []
+        cursor = encode_cursor(self.start, 0, 0)
+        while True:
+            page = changes_since(cursor, limit=2)
+            seen.extend(self.fire_ids(page))
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+
+        self.assertEqual(seen, [f"TIED-{index}" for index in range(5)] + ["LATER"])
+        # Nothing is returned again once the client has caught up
+        self.assertEqual(self.fire_ids(changes_since(cursor)), [])
+
+    def test_created_and_updated_are_split_by_the_cursor(self):
+        old = self.add_fire("OLD", self.start - timedelta(hours=1))
+        self.add_fire("NEW", self.start + timedelta(minutes=5))
+        Wildfire.objects.filter(pk=old.pk).update(
+            last_updated=self.start + timedelta(minutes=10)
+        )
+
+        page = changes_since(encode_cursor(self.start, 0, 0))
+
+        self.assertEqual([fire["fire_id"] for fire in page["created"]], ["NEW"])
+        self.assertEqual([fire["fire_id"] for fire in page["updated"]], ["OLD"])
+
+    def test_cleanup_leaves_tombstones(self):
+        cursor = current_cursor()
+        self.add_fire("GONE", timezone.now() - timedelta(days=40), status="OUT")
+        self.add_fire("KEPT", timezone.now() - timedelta(days=40), status="ACTIVE")
+
+        cleanup_old_fires(days=30, pause=0, archive=False)
+
+        page = changes_since(cursor)
+        self.assertEqual([row["fire_id"] for row in page["deleted"]], ["GONE"])
+        self.assertEqual(WildfireTombstone.objects.count(), 1)
+        # The next cursor is past the tombstone
+        self.assertEqual(changes_since(page["cursor"])["deleted"], [])
+
+
+class CleanupTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.fires = [
+            Wildfire.objects.create(
+                fire_id=f"F-{index}", latitude=54.0, longitude=-115.0, detected_date=timezone.now()
+            )
+            for index in range(5)
+        ]
+
+    def archived(self, path):
+        with gzip.open(path, "rt", newline="") as archive:
+            rows = list(csv.DictReader(archive))
+        return [row["fire_id"] for row in rows]
+
+    def test_deletes_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            deleted = delete_in_batches(
+                Wildfire.objects.exclude(fire_id="F-2"), batch_size=2, pause=0
+            )
+
+        self.assertEqual(deleted, 4)
+        self.assertEqual(list(Wildfire.objects.values_list("fire_id", flat=True)), ["F-2"])
+        deletes = [
+            query for query in queries
+            if query["sql"].startswith(f'DELETE FROM "{Wildfire._meta.db_table}"')
+        ]
+        self.assertEqual(len(deletes), 2)
+
+    def test_collector_deletes_cascades(self):
+        well = AbandonedWell.objects.create(well_id="W-1", latitude=54.0, longitude=-115.0)
+        FireWellExposure.objects.create(
+            fire=self.fires[0], well=well, distance_km=1.0, bearing_deg=0.0
+        )
+
+        with mock.patch.object(
+            QuerySet, "delete", autospec=True, side_effect=QuerySet.delete
+        ) as delete:
+            self.assertEqual(delete_in_batches(Wildfire.objects.all(), batch_size=2, pause=0), 5)
+
+        self.assertEqual(delete.call_count, 3)
+        self.assertFalse(FireWellExposure.objects.exists())
+
+    def test_fast_delete_without_cascades(self):
+        for fire in self.fires:
+            WildfireTombstone.objects.create(fire_id=fire.fire_id)
+
+        with mock.patch.object(QuerySet, "delete", side_effect=AssertionError):
+            deleted = delete_in_batches(WildfireTombstone.objects.all(), batch_size=2, pause=0)
+
+        self.assertEqual(deleted, 5)
+        self.assertFalse(WildfireTombstone.objects.exists())
+
+    def test_archives_only_committed_batches(self):
+        path = os.path.join(self.root, "fires.csv.gz")
+        batches = []
+
+        def before_delete(batch):
+            batches.append(batch)
+            if len(batches) == 2:
+                raise RuntimeError("Interrupted")
+
+        with self.assertRaises(RuntimeError):
+            delete_in_batches(
+                Wildfire.objects.all(), batch_size=2, pause=0, archive_path=path,
+                before_delete=before_delete,
+            )
+
+        self.assertEqual(self.archived(path), ["F-0", "F-1"])
+        self.assertEqual(Wildfire.objects.count(), 3)
+
+    def test_no_archive_file_when_nothing_matches(self):
+        path = os.path.join(self.root, "fires.csv.gz")
+
+        self.assertEqual(
+            delete_in_batches(Wildfire.objects.filter(status="OUT"), archive_path=path), 0
+        )
+        self.assertFalse(os.path.exists(path))
+
+    def test_archive_falls_back_to_var_archive(self):
+        Wildfire.objects.update(status="OUT", last_updated=timezone.now() - timedelta(days=40))
+
+        with override_settings(FIRE_ARCHIVE_DIR="", BASE_DIR=self.root):
+            cleanup_old_fires(days=30, pause=0, archive=True)
+
+        archive_dir = os.path.join(self.root, "var", "archive")
+        [filename] = os.listdir(archive_dir)
+        self.assertTrue(filename.startswith("wildfires-"))
+        self.assertEqual(
+            self.archived(os.path.join(archive_dir, filename)),
+            [fire.fire_id for fire in self.fires],
+        )
+
+
+class DailyReportTests(TestCase):
+    def setUp(self):
+        pin_primary()
+        self.day = date(2026, 7, 1)
+        # 23:30 and 00:30 Mountain Daylight Time, on either side of midnight
+        for index, (hour, status) in enumerate([(5, "ACTIVE"), (6, "OUT"), (7, "ACTIVE")]):
+            Wildfire.objects.create(
+                fire_id=f"F-{index}",
+                latitude=54.0,
+                longitude=-115.0,
+                size_hectares=1.5,
+                status=status,
+                detected_date=datetime(2026, 7, 2, hour, 30, tzinfo=dt_timezone.utc),
+            )
+
+    def test_day_bounds_are_local(self):
+        start, end = day_bounds(self.day)
+        self.assertEqual(start, datetime(2026, 7, 1, 6, tzinfo=dt_timezone.utc))
+        self.assertEqual(end, datetime(2026, 7, 2, 6, tzinfo=dt_timezone.utc))
+
+    def test_build_daily_report(self):
+        report = build_daily_report(self.day)
+
+        self.assertEqual(report.new_fires, 1)
+        self.assertEqual(report.new_hectares, 1.5)
+        self.assertEqual(report.active_fires, 2)
+        self.assertEqual(report.total_hectares, 3.0)
+        self.assertEqual(report.fires_by_status, {"ACTIVE": 2, "OUT": 1})
+
+        # Building it again updates the same row
+        Wildfire.objects.filter(fire_id="F-0").update(status="OUT")
+        self.assertEqual(build_daily_report(self.day).pk, report.pk)
+        self.assertEqual(DailyReport.objects.get().fires_by_status, {"ACTIVE": 1, "OUT": 2})
+
+    def test_backfill_daily_reports(self):
+        snapshot = build_daily_report(self.day)
+        DailyReport.objects.filter(pk=snapshot.pk).update(new_fires=0)
+
+        written = backfill_daily_reports(self.day - timedelta(days=1), self.day + timedelta(days=1))
+
+        self.assertEqual(written, 3)
+        reports = {report.date: report for report in DailyReport.objects.all()}
+        self.assertEqual(
+            [reports[self.day + timedelta(days=offset)].new_fires for offset in (-1, 0, 1)],
+            [0, 1, 2],
+        )
+        # The snapshot taken on the day is kept, backfilled days have none
+        self.assertEqual(reports[self.day].active_fires, 2)
+        self.assertIsNone(reports[self.day + timedelta(days=1)].active_fires)
+
+
+class ImportWellsTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def import_wells(self, wells, *args):
+        """Run the import command on a zipped shapefile of (well_id, lon, lat, licensee)."""
+        import geopandas as gpd
+        from shapely.geometry import Point
+
+        gdf = gpd.GeoDataFrame(
+            {
+                "WELL_ID": [well_id for well_id, _, _, _ in wells],
+                "LICENSEE": [licensee for _, _, _, licensee in wells],
+            },
+            geometry=[Point(lon, lat) for _, lon, lat, _ in wells],
+            crs="EPSG:4326",
+        )
+        shp_dir = tempfile.mkdtemp(dir=self.root)
+        gdf.to_file(os.path.join(shp_dir, "wells.shp"))
+        path = os.path.join(self.root, "wells.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            for name in os.listdir(shp_dir):
+                archive.write(os.path.join(shp_dir, name), name)
+
+        out = StringIO()
+        call_command("import_abandoned_wells", path, *args, stdout=out)
+        return out.getvalue()
+
+    def stored(self):
+        return dict(AbandonedWell.objects.values_list("well_id", "licensee"))
+
+    def test_only_the_diff_is_written(self):
+        self.import_wells([("W-1", -115.0, 54.0, "A"), ("W-2", -115.1, 54.1, "B")])
+        untouched = AbandonedWell.objects.get(well_id="W-1").updated_at
+
+        out = self.import_wells(
+            [("W-1", -115.0, 54.0, "A"), ("W-2", -115.1, 54.1, "C"), ("W-3", -115.2, 54.2, "D")]
+        )
+
+        self.assertIn("Diff: 1 new, 1 changed, 0 removed, 1 unchanged", out)
+        self.assertEqual(self.stored(), {"W-1": "A", "W-2": "C", "W-3": "D"})
+        self.assertEqual(AbandonedWell.objects.get(well_id="W-1").updated_at, untouched)
+
+        out = self.import_wells([("W-3", -115.2, 54.2, "D")])
+
+        self.assertIn("Diff: 0 new, 0 changed, 2 removed, 1 unchanged", out)
+        self.assertEqual(self.stored(), {"W-3": "D"})
+
+    def test_clear_rewrites_every_well(self):
+        wells = [("W-1", -115.0, 54.0, "A"), ("W-2", -115.1, 54.1, "B")]
+        self.import_wells(wells)
+        hashes = dict(AbandonedWell.objects.values_list("well_id", "content_hash"))
+        imported = AbandonedWell.objects.get(well_id="W-1").updated_at
+
+        out = self.import_wells(wells[:1], "--clear")
+
+        self.assertIn("Diff: 0 new, 1 changed, 1 removed, 0 unchanged", out)
+        self.assertGreater(AbandonedWell.objects.get(well_id="W-1").updated_at, imported)
+        # The blanked hashes are only used for the diff; the rewrite stores them again
+        self.assertEqual(
+            dict(AbandonedWell.objects.values_list("well_id", "content_hash")),
+            {"W-1": hashes["W-1"]},
+        )
+
+
+@override_settings(EXPOSURE_RADIUS_KM=10.0)
+class ExposureTests(TestCase):
+    def setUp(self):
+        random.seed(30)
+        # Wells scattered across four 0.5 degree tiles
+        self.wells = [
+            create_well(f"W-{index}", random.uniform(54.2, 54.8), random.uniform(-115.3, -114.7))
+            for index in range(200)
+        ]
+        self.fires = [
+            Wildfire.objects.create(
+                fire_id=f"F-{index}",
+                latitude=latitude,
+                longitude=longitude,
+                detected_date=timezone.now(),
+            )
+            # One fire just south of a tile edge, one in another tile
+            for index, (latitude, longitude) in enumerate([(54.49, -115.01), (54.7, -114.8)])
+        ]
+
+    def expected(self, fire):
+        return {
+            well.pk
+            for well in self.wells
+            if haversine_km(fire.latitude, fire.longitude, well.latitude, well.longitude) <= 10.0
+        }
+
+    def exposed(self, fire):
+        return set(FireWellExposure.objects.filter(fire=fire).values_list("well_id", flat=True))
+
+    def test_refresh_exposures_per_tile(self):
+        written = refresh_exposures([fire.pk for fire in self.fires] * 2)
+
+        for fire in self.fires:
+            expected = self.expected(fire)
+            self.assertTrue(expected)
+            self.assertEqual(self.exposed(fire), expected)
+        self.assertEqual(written, FireWellExposure.objects.count())
+
+        # Wells across the tile edge count too
+        fire = self.fires[0]
+        self.assertTrue(
+            FireWellExposure.objects.filter(fire=fire, well__latitude__gte=54.5).exists()
+        )
+
+    def test_refresh_replaces_and_out_fires_lose_exposures(self):
+        refresh_exposures([fire.pk for fire in self.fires])
+        moved, out = self.fires
+        Wildfire.objects.filter(pk=moved.pk).update(latitude=54.7, longitude=-114.8)
+        Wildfire.objects.filter(pk=out.pk).update(status="OUT")
+
+        refresh_exposures([moved.pk])
+        moved.refresh_from_db()
+        self.assertEqual(self.exposed(moved), self.expected(moved))
+        # Not refreshed, so the OUT fire still has its exposures until dropped
+        self.assertTrue(self.exposed(out))
+
+        self.assertEqual(drop_inactive_exposures(), len(self.expected(out)))
+        self.assertEqual(self.exposed(out), set())
+        self.assertEqual(self.exposed(moved), self.expected(moved))
+
+
+@override_settings(FIRE_EVENTS_REDIS_URL="", FIRE_EVENTS_MAX_AGE=60, FIRE_EVENTS_HEARTBEAT=60)
+class EventHubTests(TestCase):
+    def setUp(self):
+        self.hub = EventHub()
+        patcher = mock.patch("api.v1.async_views.hub", self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fires_event(self, event_id, *regions):
+        fires = [{"fire_id": f"F-{event_id}-{region}", "region": region} for region in regions]
+        return Event(event_id, "fires", {"created": fires, "updated": [], "status_changed": []})
+
+    def stream(self, last_event_id, region=None, count=1, live=()):
+        """
+        The first ``count`` events a client reconnecting with Last-Event-ID
+        gets, with ``live`` events published once it has subscribed.
+        """
+
+        async def read():
+            stream = FireEventsView().stream(region, last_event_id)
+            self.assertTrue((await anext(stream)).startswith("retry:"))
+            for event in live:
+                asyncio.get_running_loop().call_soon(self.hub.deliver, event)
+            texts = [await anext(stream) for _ in range(count)]
+            await stream.aclose()
+            return texts
+
+        return async_to_sync(read)()
+
+    def ids(self, texts):
+        return [int(text.split("\n")[0].removeprefix("id: ")) for text in texts]
+
+    def test_since_keeps_the_latest_backlog(self):
+        for event_id in range(1, BACKLOG + 6):
+            self.hub.deliver(self.fires_event(event_id, "AB"))
+
+        self.assertEqual([event.id for event in self.hub.since(0)], list(range(6, BACKLOG + 6)))
+        self.assertEqual(
+            [event.id for event in self.hub.since(BACKLOG + 3)], [BACKLOG + 4, BACKLOG + 5]
+        )
+
+    def test_reconnect_replays_missed_events(self):
+        for event_id in (1, 2, 3):
+            self.hub.deliver(self.fires_event(event_id, "AB"))
+
+        texts = self.stream(1, count=3, live=[self.fires_event(4, "AB")])
+
+        # The missed events come first, then the stream carries on live
+        self.assertEqual(self.ids(texts), [2, 3, 4])
+        self.assertEqual(self.hub.queues, set())
+
+    def test_replay_is_filtered_by_region(self):
+        self.hub.deliver(self.fires_event(1, "BC"))
+        self.hub.deliver(self.fires_event(2, "AB", "BC"))
+        self.hub.deliver(self.fires_event(3, "AB"))
+
+        texts = self.stream(0, region="AB", count=2)
+
+        self.assertEqual(self.ids(texts), [2, 3])
+        self.assertNotIn('"region":"BC"', texts[0])
+
+
+class WellArraysTestMixin:
+    """Give each test its own well arrays directory and a fresh process snapshot."""
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        overrides = override_settings(WELL_ARRAYS_DIR=root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.reset_well_arrays()
+        self.addCleanup(self.reset_well_arrays)
+
+    def reset_well_arrays(self):
+        well_arrays._snapshot = None
+        well_arrays._checked_at = 0.0
+
+
+def create_well(well_id, latitude, longitude, **fields):
+    return AbandonedWell.objects.create(
+        well_id=well_id, latitude=latitude, longitude=longitude, **fields
+    )
+
+
+class QueryViewportsTests(WellArraysTestMixin, TestCase):
+    viewports = [
+        {"south": 54.0, "west": -115.5, "north": 54.3, "east": -115.0, "stats": True},
+        # Overlaps the first one
+        {"south": 54.2, "west": -115.2, "north": 54.6, "east": -114.8, "limit": 5},
+        # Far from both, so the union bbox holds wells in none of them
+        {"south": 55.5, "west": -113.5, "north": 55.8, "east": -113.0, "stats": True},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        random.seed(36)
+        for index in range(300):
+            create_well(
+                f"W-{index:03d}",
+                random.uniform(54.0, 56.0),
+                random.uniform(-116.0, -113.0),
+                licensee=f"Licensee {index % 4}",
+                well_type=["Gas", "Oil"][index % 2],
+            )
+
+    def expected(self, viewport):
+        wells = AbandonedWell.objects.filter(
+            latitude__gte=viewport["south"],
+            latitude__lte=viewport["north"],
+            longitude__gte=viewport["west"],
+            longitude__lte=viewport["east"],
+        )
+        result = {
+            "count": wells.count(),
+            "well_ids": list(wells.values_list("well_id", flat=True)[: viewport["limit"]]),
+        }
+        if viewport["stats"]:
+            result["by_type"] = dict(
+                wells.values("well_type")
+                .annotate(count=Count("id"))
+                .values_list("well_type", "count")
+            )
+        return result
+
+    def assert_split(self):
+        viewports = WellBatchQuerySerializer(data={"viewports": self.viewports})
+        viewports.is_valid(raise_exception=True)
+        viewports = viewports.validated_data["viewports"]
+
+        results = query_viewports(viewports)
+
+        self.assertEqual(len(results), len(viewports))
+        for viewport, result in zip(viewports, results):
+            expected = self.expected(viewport)
+            self.assertTrue(expected["count"])
+            self.assertEqual(
+                result["bbox"],
+                [viewport["south"], viewport["west"], viewport["north"], viewport["east"]],
+            )
+            self.assertEqual(result["count"], expected["count"])
+            self.assertEqual([well["well_id"] for well in result["wells"]], expected["well_ids"])
+            if viewport["stats"]:
+                self.assertEqual(result["stats"]["total_wells"], expected["count"])
+                self.assertEqual(result["stats"]["wells_by_type"], expected["by_type"])
+            else:
+                self.assertNotIn("stats", result)
+
+    def test_split_from_the_database(self):
+        self.assert_split()
+
+    def test_split_from_the_well_arrays(self):
+        well_arrays.refresh_well_arrays()
+        self.assert_split()
+
+
+class NearestWellsTests(WellArraysTestMixin, TestCase):
+    origin = (54.0, -115.0)
+
+    def setUp(self):
+        super().setUp()
+        pin_primary()
+        random.seed(37)
+        # A few wells close by, the rest spread over a few hundred km
+        self.wells = [
+            create_well(
+                f"N-{index}",
+                54.0 + random.uniform(-0.01, 0.01),
+                -115.0 + random.uniform(-0.01, 0.01),
+            )
+            for index in range(5)
+        ] + [
+            create_well(f"W-{index}", random.uniform(52.0, 56.0), random.uniform(-118.0, -112.0))
+            for index in range(200)
+        ]
+
+    def brute_force(self, k):
+        distances = sorted(
+            (haversine_km(*self.origin, well.latitude, well.longitude), well.pk)
+            for well in self.wells
+        )
+        return [pk for _, pk in distances[:k]]
+
+    def test_matches_a_full_scan(self):
+        for k in (1, 5, 30):
+            with self.subTest(k=k):
+                found = nearest_wells(*self.origin, k)
+                self.assertEqual([pk for pk, _, _ in found], self.brute_force(k))
+
+        well_arrays.refresh_well_arrays()
+        self.assertEqual([pk for pk, _, _ in nearest_wells(*self.origin, 30)], self.brute_force(30))
+
+    def test_rings_stop_once_k_wells_are_within(self):
+        with mock.patch(
+            "fires.services.nearest._db_candidates", wraps=nearest._db_candidates
+        ) as candidates:
+            found = nearest_wells(*self.origin, 5)
+
+        # The five wells close by are all inside the first 2 km ring
+        self.assertEqual(candidates.call_count, 1)
+        self.assertEqual(len(found), 5)
+
+        with mock.patch(
+            "fires.services.nearest._db_candidates", wraps=nearest._db_candidates
+        ) as candidates:
+            found = nearest_wells(*self.origin, 6)
+
+        self.assertGreater(candidates.call_count, 1)
+        self.assertEqual(len(found), 6)
+
+    def test_k_is_capped(self):
+        response = self.client.get(
+            "/api/v1/energy-wells/nearest/", {"lat": 54.0, "lon": -115.0, "k": 1000}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["k"], nearest.MAX_K)
+        self.assertEqual(len(response.json()["wells"]), nearest.MAX_K)
+
+
+class WellsWithinTests(WellArraysTestMixin, TestCase):
+    rectangle = {
+        "type": "Polygon",
+        "coordinates": [
+            [[-115.5, 54.0], [-115.0, 54.0], [-115.0, 54.5], [-115.5, 54.5], [-115.5, 54.0]]
+        ],
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.inside = [
+            create_well("IN-1", 54.25, -115.25),
+            create_well("IN-2", 54.0, -115.5),
+        ]
+        # Close enough to share spatial key cells with the rectangle
+        create_well("OUT-EAST", 54.25, -114.99)
+        create_well("OUT-NORTH", 54.51, -115.25)
+        create_well("OUT-FAR", 50.0, -110.0)
+
+    def query(self):
+        return wells_within(parse_geometry(self.rectangle))
+
+    def test_rectangle_from_snapshot(self):
+        well_arrays.build_snapshot()
+        self.assertIsNotNone(well_arrays.get_well_arrays())
+        self.assertEqual(self.query(), (2, sorted(well.pk for well in self.inside)))
+
+    def test_rectangle_from_database(self):
+        self.assertIsNone(well_arrays.get_well_arrays())
+        self.assertEqual(self.query(), (2, sorted(well.pk for well in self.inside)))
+
+
+class FilterBboxTests(TestCase):
+    """The spatial key ranges never change which rows a bounding box selects."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.random = random.Random(29)
+        latitudes = [cls.random.uniform(49.0, 60.0) for _ in range(1500)]
+        longitudes = [cls.random.uniform(-120.0, -110.0) for _ in range(1500)]
+        # Wells exactly on cell edges of several grid levels
+        for level in (0, 4, 8, 12, 16):
+            for step in range(10):
+                latitudes.append(cls.cell_edge(54.0 + step * 0.01, level, -90.0, 180.0))
+                longitudes.append(cls.cell_edge(-115.0 + step * 0.01, level, -180.0, 360.0))
+        AbandonedWell.objects.bulk_create(
+            AbandonedWell(well_id=f"W-{index}", latitude=latitude, longitude=longitude)
+            for index, (latitude, longitude) in enumerate(zip(latitudes, longitudes))
+        )
+
+    @staticmethod
+    def cell_edge(value, level, low, span):
+        """The lower edge of the level-``level`` cell containing a coordinate."""
+        size = span / (1 << KEY_BITS) * (1 << level)
+        return low + ((value - low) // size) * size
+
+    def assert_same_wells(self, south, west, north, east):
+        plain = AbandonedWell.objects.filter(
+            latitude__gte=south, latitude__lte=north, longitude__gte=west, longitude__lte=east
+        )
+        keyed = filter_bbox(AbandonedWell.objects.all(), south, west, north, east)
+        self.assertEqual(
+            set(keyed.values_list("pk", flat=True)),
+            set(plain.values_list("pk", flat=True)),
+            (south, west, north, east),
+        )
+
+    def test_random_boxes(self):
+        for _ in range(150):
+            size = self.random.choice([0.001, 0.05, 0.5, 3.0, 15.0])
+            south = self.random.uniform(48.0, 60.0)
+            west = self.random.uniform(-121.0, -110.0)
+            self.assert_same_wells(south, west, south + size, west + size * 1.5)
+
+    def test_boxes_on_well_coordinates_and_cell_edges(self):
+        wells = AbandonedWell.objects.order_by("pk").values_list("latitude", "longitude")[1500:]
+        for latitude, longitude in wells[::3]:
+            # Edges exactly on wells, which sit on cell edges
+            self.assert_same_wells(latitude, longitude, latitude + 0.01, longitude + 0.01)
+            self.assert_same_wells(latitude - 0.01, longitude - 0.01, latitude, longitude)
+            self.assert_same_wells(latitude, longitude, latitude, longitude)
+
+    def test_ranges_cover_the_box_with_few_cells(self):
+        ranges = bbox_key_ranges(49.0, -120.0, 60.0, -110.0)
+        self.assertLessEqual(len(ranges), 64)
+        self.assertEqual(ranges, sorted(ranges))
+        self.assertEqual(bbox_key_ranges(60.0, -110.0, 49.0, -120.0), [])
+
+
+class WellArraysStalenessTests(WellArraysTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.well = create_well("W-1", 54.0, -115.0, licensee="Old Co")
+        well_arrays.prewarm_well_arrays()
+
+    def expire_checks(self):
+        well_arrays._checked_at = 0.0
+
+    def test_requests_do_not_query_or_rebuild(self):
+        before = well_arrays.get_well_arrays()
+        # Saved without wells_changed, e.g. from a shell
+        self.well.licensee = "New Co"
+        self.well.save()
+
+        self.expire_checks()
+        with self.assertNumQueries(0):
+            self.assertIs(well_arrays.get_well_arrays(), before)
+
+    def test_refresh_rebuilds_a_stale_snapshot(self):
+        before = well_arrays.get_well_arrays()
+        self.well.licensee = "New Co"
+        self.well.save()
+
+        version = well_arrays.refresh_well_arrays()
+
+        self.assertNotEqual(version, before.version)
+        self.expire_checks()
+        after = well_arrays.get_well_arrays()
+        self.assertEqual(after.version, version)
+        self.assertEqual(after.labels["licensee"], ["New Co"])
+
+    def test_refresh_keeps_an_unchanged_snapshot(self):
+        before = well_arrays.get_well_arrays()
+        self.assertEqual(well_arrays.refresh_well_arrays(), before.version)
+
+    def test_admin_edit_rebuilds_once_committed(self):
+        before = well_arrays.get_well_arrays()
+        model_admin = site._registry[AbandonedWell]
+        self.well.licensee = "New Co"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            model_admin.save_model(None, self.well, None, change=True)
+
+        self.expire_checks()
+        after = well_arrays.get_well_arrays()
+        self.assertNotEqual(after.version, before.version)
+        self.assertEqual(after.labels["licensee"], ["New Co"])
+
+
+class AutocompleteTests(WellArraysTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        create_well("W-1", 54.0, -115.0, licensee="Acme Energy Ltd.")
+        create_well("W-2", 54.1, -115.0, licensee="Acme Energy Ltd.")
+        create_well("W-3", 54.2, -115.0, licensee="Birch Oil")
+
+    def test_mixed_case_licensee_from_database(self):
+        self.assertIsNone(well_arrays.get_well_arrays())
+        self.assertEqual(
+            autocomplete("licensee", "acme"),
+            [{"value": "Acme Energy Ltd.", "well_count": 2}],
+        )
+
+    def test_mixed_case_licensee_from_snapshot(self):
+        well_arrays.build_snapshot()
+        self.assertEqual(
+            autocomplete("licensee", "ACME"),
+            [{"value": "Acme Energy Ltd.", "well_count": 2}],
+        )
+
+
+# The admin pages link static files that tests never collect
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class AdminSearchTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "x"))
+        create_well("00/06-12-055-14W5/0", 54.0, -115.0, licensee="Acme Energy Ltd.")
+        create_well("00/07-12-055-14W5/0", 54.1, -115.0, licensee="Birch Oil")
+
+    def search(self, term):
+        response = self.client.get("/admin/fires/abandonedwell/", {"q": term})
+        self.assertEqual(response.status_code, 200)
+        return [well.licensee for well in response.context["cl"].result_list]
+
+    def test_licensee_prefix_in_any_case(self):
+        for term in ("acme", "ACME", "aCmE"):
+            self.assertEqual(self.search(term), ["Acme Energy Ltd."])
+
+    def test_well_id_prefix(self):
+        self.assertEqual(self.search("00/07"), ["Birch Oil"])
+
+
+@override_settings(FIRE_INCIDENT_LINK_KM=1.0)
+class IncidentTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.incident = FireIncident.objects.create(
+            first_detected=now,
+            last_detected=now,
+            latitude=54.0,
+            longitude=-115.0,
+            south=54.0,
+            west=-115.0,
+            north=54.0,
+            east=-115.0,
+        )
+
+    def detection(self, fire_id, latitude, status="ACTIVE"):
+        return Wildfire.objects.create(
+            fire_id=fire_id,
+            latitude=latitude,
+            longitude=-115.0,
+            detected_date=timezone.now(),
+            status=status,
+            incident=self.incident,
+        )
+
+    def test_split_incident_keeps_its_id_in_one_part_only(self):
+        # About 0.78 km apart in a chain, so the bridge holds the two ends together
+        west = [self.detection("A-1", 54.0), self.detection("A-2", 54.005)]
+        bridge = self.detection("BRIDGE", 54.012)
+        east = self.detection("B-1", 54.019)
+
+        bridge.latitude = 55.0
+        bridge.save()
+        update_incidents([bridge.pk])
+
+        incidents = {fire.fire_id: fire.incident_id for fire in Wildfire.objects.all()}
+        # The larger part keeps the incident, the others get new ones
+        self.assertEqual(incidents["A-1"], self.incident.pk)
+        self.assertEqual(incidents["A-2"], self.incident.pk)
+        self.assertNotEqual(incidents[east.fire_id], self.incident.pk)
+        self.assertNotEqual(incidents["BRIDGE"], self.incident.pk)
+        self.assertNotEqual(incidents[east.fire_id], incidents["BRIDGE"])
+        self.incident.refresh_from_db()
+        self.assertEqual(self.incident.detection_count, len(west))
+
+    def test_out_detections_are_left_out_of_the_perimeter(self):
+        self.detection("A-1", 54.0)
+        self.detection("A-2", 54.005)
+        self.detection("OLD", 54.5, status="OUT")
+
+        refresh_incidents([self.incident.pk])
+
+        self.incident.refresh_from_db()
+        self.assertEqual(self.incident.detection_count, 2)
+        self.assertEqual(self.incident.north, 54.005)
+
+
+@override_settings(FIRE_CONTAINED_AFTER_HOURS=24, FIRE_OUT_AFTER_HOURS=72)
+class AgeFiresTests(TestCase):
+    def test_changed_ids_are_the_rows_it_moved(self):
+        now = timezone.now()
+        stale = Wildfire.objects.create(
+            fire_id="STALE",
+            latitude=54.0,
+            longitude=-115.0,
+            detected_date=now - timedelta(hours=30),
+        )
+        fresh = Wildfire.objects.create(
+            fire_id="FRESH", latitude=54.0, longitude=-115.1, detected_date=now
+        )
+        # Written elsewhere at the same instant, but not by the lifecycle
+        Wildfire.objects.filter(pk=fresh.pk).update(last_updated=now)
+
+        result = age_fires(now)
+
+        self.assertEqual(result["changed_ids"], [stale.pk])
+        self.assertEqual(result["detections"]["contained"], 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "CONTAINED")
+        self.assertEqual(stale.last_updated, now)
+
+    def test_detections_follow_their_incident(self):
+        now = timezone.now()
+        incident = FireIncident.objects.create(
+            first_detected=now - timedelta(hours=100),
+            last_detected=now - timedelta(hours=80),
+            latitude=54.0,
+            longitude=-115.0,
+            south=54.0,
+            west=-115.0,
+            north=54.0,
+            east=-115.0,
+        )
+        # Detected recently, but its incident has not been for 80 hours
+        fires = [
+            Wildfire.objects.create(
+                fire_id=f"F-{index}",
+                latitude=54.0,
+                longitude=-115.0,
+                detected_date=now,
+                incident=incident,
+                status=status,
+            )
+            for index, status in enumerate(["ACTIVE", "CONTAINED", "OUT"])
+        ]
+
+        result = age_fires(now)
+
+        self.assertEqual(result["incidents"]["out"], 1)
+        self.assertEqual(result["detections"]["out"], 2)
+        self.assertEqual(result["changed_ids"], [fire.pk for fire in fires[:2]])
+        self.assertEqual(set(Wildfire.objects.values_list("status", flat=True)), {"OUT"})
+
+    def test_without_returning(self):
+        now = timezone.now()
+        stale = Wildfire.objects.create(
+            fire_id="STALE", latitude=54.0, longitude=-115.0, detected_date=now - timedelta(hours=100)
+        )
+        features = type(connection.features)
+        with mock.patch.object(features, "can_return_rows_from_bulk_insert", False):
+            result = age_fires(now)
+
+        self.assertEqual(result["changed_ids"], [stale.pk])
+        self.assertEqual(Wildfire.objects.get(pk=stale.pk).status, "OUT")
+
+
+class BackfillRowsTests(TestCase):
+    def test_rows_follow_the_model_fields(self):
+        values = {name: [name] for name in INSERT_FIELDS}
+        self.assertEqual(ordered_rows(values), [tuple(INSERT_FIELDS)])
+        self.assertIn("last_updated", INSERT_FIELDS)
+        self.assertNotIn("incident", INSERT_FIELDS)
+
+    def test_missing_field_fails_loudly(self):
+        values = {name: [name] for name in INSERT_FIELDS if name != "region"}
+        with self.assertRaisesMessage(ValueError, "missing ['region']"):
+            ordered_rows(values)
+
+
+class BackfillFileTests(TestCase):
+    header = "latitude,longitude,bright_ti4,scan,track,acq_date,acq_time,satellite,confidence\n"
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        overrides = override_settings(FIRMS_BACKFILL_STATE_DIR=os.path.join(root, "state"))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.path = os.path.join(root, "archive.csv")
+
+    def line(self, latitude, longitude, acq_time="1200"):
+        return f"{latitude:.4f},{longitude:.4f},330.1,0.4,0.4,2019-07-01,{acq_time},N,n\n"
+
+    def write_archive(self, lines):
+        with open(self.path, "w") as f:
+            f.write(self.header + "".join(lines))
+
+    def backfill(self):
+        # Spawned workers, as on macOS, do not inherit a configured Django
+        with worker_pool(1, get_context("spawn")) as executor:
+            return backfill_file(self.path, executor, range_bytes=100, in_flight=2)
+
+    def test_load_skips_duplicates_and_finishes_the_file(self):
+        lines = [self.line(54.0 + i * 0.1, -115.0) for i in range(5)]
+        # Outside the active regions
+        lines.append(self.line(40.0, -75.0))
+        # Repeated in the file, and already stored by the live ingestion
+        lines.append(lines[1])
+        Wildfire.objects.create(fire_id="FIRMS-2019-07-01-54.000--115.00", latitude=54.0, longitude=-115.0)
+        self.write_archive(lines)
+
+        result = self.backfill()
+
+        self.assertEqual((result["rows_read"], result["rows_loaded"]), (7, 4))
+        self.assertEqual(Wildfire.objects.filter(data_source=ARCHIVE_SOURCE).count(), 4)
+        self.assertEqual(result["days"], ["2019-07-01"])
+        state = BackfillState(self.path)
+        self.assertEqual(state.data["offset"], os.path.getsize(self.path))
+        self.assertTrue(state.done)
+
+        again = self.backfill()
+        self.assertTrue(again["skipped"])
+        self.assertEqual(Wildfire.objects.count(), 5)
+
+    def test_interrupted_file_resumes_at_the_saved_offset(self):
+        lines = [self.line(54.0 + i * 0.1, -115.0) for i in range(6)]
+        self.write_archive(lines)
+        # As if the first three rows were inserted before the run stopped
+        BackfillState(self.path).advance(len(self.header) + len("".join(lines[:3])), 3, 3, set())
+
+        result = self.backfill()
+
+        self.assertEqual((result["rows_read"], result["rows_loaded"]), (3, 3))
+        self.assertEqual(
+            sorted(Wildfire.objects.values_list("latitude", flat=True)), [54.3, 54.4, 54.5]
+        )
+        self.assertEqual(BackfillState(self.path).data["rows_read"], 6)
+
+
+class SnapshotTests(WellArraysTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # The API renders read from the replica otherwise
+        pin_primary()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        overrides = override_settings(SNAPSHOT_DIR=self.root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        Wildfire.objects.create(
+            fire_id="F-1", latitude=54.0, longitude=-115.0, detected_date=timezone.now()
+        )
+
+    def files(self):
+        return sorted(os.listdir(self.root))
+
+    def test_atomic_write_leaves_no_partial_file(self):
+        path = os.path.join(self.root, "data.json")
+        snapshots._write_atomic(path, b"old")
+
+        with mock.patch("fires.services.snapshots.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                snapshots._write_atomic(path, b"new")
+
+        self.assertEqual(self.files(), ["data.json"])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"old")
+
+    def test_versioned_files_come_with_their_variants(self):
+        name = snapshots.write_file(self.root, "active-fires", "json", b"[]")
+        self.assertRegex(name, r"^active-fires\.[0-9a-f]{12}\.json$")
+        self.assertIn(f"{name}.gz", self.files())
+        # Same content, same name, nothing rewritten
+        self.assertEqual(snapshots.write_file(self.root, "active-fires", "json", b"[]"), name)
+
+    def test_prune_keeps_the_newest_versions_of_each_dataset(self):
+        names = []
+        for index in range(snapshots.KEEP_VERSIONS + 2):
+            name = snapshots.write_file(self.root, "active-fires", "json", f"[{index}]".encode())
+            os.utime(os.path.join(self.root, name), (index, index))
+            names.append(name)
+        other = snapshots.write_file(self.root, "stats-today", "json", b"{}")
+
+        snapshots._prune(self.root, {names[-1], other})
+
+        kept = [name for name in self.files() if name.endswith(".json")]
+        self.assertEqual(sorted(kept), sorted(names[-snapshots.KEEP_VERSIONS :] + [other]))
+        self.assertNotIn(f"{names[0]}.gz", self.files())
+
+    def test_manifest_records_what_it_was_built_from(self):
+        manifest = snapshots.write_snapshots()
+
+        self.assertEqual(manifest, snapshots.read_manifest())
+        self.assertEqual(manifest["generations"], snapshots.current_generations())
+        self.assertEqual(manifest["date"], timezone.localdate().isoformat())
+        self.assertEqual(
+            set(manifest["snapshots"]), {*snapshots.DATASETS, "active-fires-geojson"}
+        )
+        self.assertFalse([name for name in self.files() if name.endswith(".tmp")])
+        # Rendered like a real request to the endpoint
+        for dataset, path in snapshots.DATASETS.items():
+            name = manifest["snapshots"][dataset]["url"].rsplit("/", 1)[1]
+            with open(os.path.join(self.root, name), "rb") as f:
+                snapshot = json.load(f)
+            response = self.client.get(path).json()
+            if dataset == "stats-today":
+                # Stamped with the time it was rendered
+                del snapshot["last_updated"], response["last_updated"]
+            self.assertEqual(snapshot, response, dataset)
+
+    def test_stale_snapshots_are_rewritten(self):
+        snapshots.write_snapshots()
+        self.assertIsNone(snapshots.refresh_stale_snapshots())
+
+        bump_generation(snapshots.WELLS_GENERATION)
+        manifest = snapshots.refresh_stale_snapshots()
+        self.assertEqual(manifest["generations"], snapshots.current_generations())
+        self.assertIsNone(snapshots.refresh_stale_snapshots())
+
+    def test_snapshots_are_rewritten_after_midnight(self):
+        snapshots.write_snapshots()
+        tomorrow = timezone.localdate() + timedelta(days=1)
+
+        with mock.patch("fires.services.snapshots.timezone.localdate", return_value=tomorrow):
+            manifest = snapshots.refresh_stale_snapshots()
+
+        self.assertEqual(manifest["date"], tomorrow.isoformat())